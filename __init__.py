@@ -26,9 +26,26 @@ Integration Agent protocol and use the DAW integration mode of Komplete Kontrol
 """
 
 # List of submodules
+# None of them is imported until it's used for the first time (as nihia.mixer, from nihia import mixer...), so loading the layer
+# on FL Studio's script load stays cheap no matter how many submodules there are
+_SUBMODULES = ("acceleration", "backends", "buttons", "connection", "events", "instances", "mixer", "meters", "metrics", "names", "outputs", "profiles", "readouts", "recorder", "scheduler", "surface", "window")
+
+# Names taken by "from nihia import *", as scripts usually do
+# Kept to the original submodules, so a star import doesn't load every submodule nor shadow the modules of FL Studio's API
 __all__ = ["buttons", "mixer"]
 
-import device
+import importlib
+import sys
+
+def __getattr__(name: str):
+    """ Imports the submodules the first time they are accessed as attributes of the package. """
+    if name in _SUBMODULES:
+        return importlib.import_module("." + name, __name__)
+
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+def __dir__():
+    return sorted(set(globals()) | set(_SUBMODULES))
 
 ###########################################################################################################################################
 # Dictionaries and constants
@@ -37,6 +54,25 @@ import device
 # List of bytes that every SysEx message for the keyboard begins with
 SYSEX_HEADER = [240, 0, 33, 9, 0, 0, 68, 67, 1, 0]
 
+# FL Studio's device module, imported when the first message is sent rather than when the layer is loaded
+_device = None
+
+def _host():
+    """ Imports the device module of FL Studio's MIDI Scripting API and keeps it for the next messages. """
+    global _device
+
+    import device
+    _device = device
+
+    return device
+
+# Backend from nihia.backends messages are written to instead of FL Studio's device module, if set
+_backend = None
+
+# Function that receives every outgoing message as a full MIDI message in bytes instead of the device, if set
+# Used by the submodules that need to hold, reorder or inspect the messages before they reach the device, like the output scheduler
+_sink = None
+
 ###########################################################################################################################################
 # Methods and functions
 ###########################################################################################################################################
@@ -52,24 +88,88 @@ def dataOut(data1: int or hex, data2: int or hex):
     data1, data2 -- Corresponding bytes of the MIDI message."""
     
     # Composes the MIDI message and sends it
-    device.midiOutMsg(191, 0, data1, data2)
+    if _sink is not None:
+        _sink(bytes((191, data1, data2)))
+    elif _backend is not None:
+        _backend.write((bytes((191, data1, data2)), ))
+    else:
+        (_device or _host()).midiOutMsg(191, 0, data1, data2)
+
+def sysexOut(msg: bytes):
+    """ Sends an already built SysEx message to the device. Every SysEx message of the layer goes through here, so it
+    can be caught on its way to the device the same way as the ones sent by `dataOut`.
+
+    msg -- Full SysEx message, from the 240 byte to the 247 byte."""
+
+    if _sink is not None:
+        _sink(msg)
+    elif _backend is not None:
+        _backend.write((msg, ))
+    else:
+        (_device or _host()).midiOutSysex(msg)
+
+def framesOut(frames):
+    """ Sends a batch of already built MIDI messages to the device in order. Like `dataOut` and `sysexOut`, each message is given to the
+    sink instead if there's one.
+
+    frames -- Sequence of full MIDI messages in bytes."""
+
+    if _sink is not None:
+        for frame in frames:
+            _sink(frame)
+    else:
+        writeFrames(frames)
+
+def writeFrames(frames):
+    """ Writes a batch of already built MIDI messages straight to the device, without going through any sink.
+    
+    frames -- Sequence of full MIDI messages in bytes. SysEx messages start with the 240 byte and the rest are
+    three byte long "BF XX XX" messages."""
+
+    if _backend is not None:
+        _backend.write(frames)
+    else:
+        _deviceOut(frames)
+
+def _deviceOut(frames):
+    """ Writes a batch of already built MIDI messages through FL Studio's device module. Also used by `nihia.backends.FLStudioBackend`. """
+    device = _device or _host()
+
+    for frame in frames:
+        if frame[0] == 240:
+            device.midiOutSysex(frame)
+        else:
+            device.midiOutMsg(frame[0], 0, frame[1], frame[2])
 
 # Method to enable the deep integration features on the device
 def handShake():
     """ Acknowledges the device that a compatible host has been launched, wakes it up from MIDI mode and activates the deep
-    integration features of the device. TODO: Then waits for the answer of the device in order to confirm if the handshake 
-    was successful and returns True if affirmative."""
+    integration features of the device. It doesn't wait for the answer of the device: use `nihia.connection.connect()` instead
+    to know when the device is ready and hold every update until then.
+    
+    The message goes straight to the device, even if the output scheduler is holding the rest of them."""
+
+    # Sends the MIDI message that initiates the handshake: BF 01 03
+    writeFrames([bytes((191, 1, 3))])
 
-    # Sends the MIDI message that initiates the handshake: BF 01 01
-    dataOut(1, 3)
+    # The device doesn't show the arrows nor the lights anymore, so they have to be sent again even if they didn't change
+    # If the submodules weren't imported yet, there's nothing to forget
+    mixer = sys.modules.get(__name__ + ".mixer")
+    if mixer is not None:
+        mixer._forgetGraphs()
+
+    buttons = sys.modules.get(__name__ + ".buttons")
+    if buttons is not None:
+        buttons.forgetLights()
 
-    # TODO: Waits and reads the handshake confirmation message
-   
 
 # Method to deactivate the deep integration mode. Intended to be executed on close.
 def goodBye():
     """ Sends the goodbye message to the device and exits it from deep integration mode. 
-    Intended to be executed before FL Studio closes."""
+    Intended to be executed before FL Studio closes.
+    
+    The message goes straight to the device, even if the output scheduler is holding the rest of them, so the device
+    leaves the deep integration mode right away."""
 
     # Sends the goodbye message: BF 02 01
-    dataOut(2, 1)
+    writeFrames([bytes((191, 2, 1))])
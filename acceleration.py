@@ -0,0 +1,160 @@
+# MIT License
+
+# Copyright (c) 2024 Pablo Peral
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Submodule of flmidi-nihia that turns the speed-sensitive knob messages of Komplete Kontrol keyboards into accelerated deltas, merging all
+the turns of a knob that arrive during the same tick into a single change.
+"""
+
+import math
+
+from nihia import events, mixer
+
+###########################################################################################################################################
+# Acceleration curves
+###########################################################################################################################################
+
+# Each curve goes from the speed (0-63) reported on a KnobEvent to the size of the step for that speed, being `minStep` the step at the slowest
+# speed and `maxStep` the step at the fastest one
+
+def linearCurve(minStep: float, maxStep: float) -> tuple:
+    """ Step grows at the same rate as the speed. """
+    return tuple(minStep + (maxStep - minStep) * speed / 63 for speed in range(64))
+
+def exponentialCurve(minStep: float, maxStep: float, exponent: float = 3.0) -> tuple:
+    """ Step grows slowly at low speeds, for fine adjustments, and quickly at high speeds, for sweeps.
+
+    ### Arguments
+     - exponent (float): The higher it is, the longer the curve stays close to `minStep`.
+    """
+    # Normalised so the curve starts at 0 and finishes at 1
+    span = math.expm1(exponent)
+    return tuple(minStep + (maxStep - minStep) * math.expm1(exponent * speed / 63) / span for speed in range(64))
+
+def tableCurve(steps) -> tuple:
+    """ Step for each speed is taken from a list of points spread evenly across the 0-63 range, interpolating linearly between them.
+
+    ### Arguments
+     - steps: At least two step sizes, from the slowest speed to the fastest one.
+    """
+    steps = tuple(steps)
+    last = len(steps) - 1
+
+    curve = []
+    for speed in range(64):
+        position = speed * last / 63
+        index = min(int(position), last - 1)
+        curve.append(steps[index] + (steps[index + 1] - steps[index]) * (position - index))
+
+    return tuple(curve)
+
+###########################################################################################################################################
+# Knob engine
+###########################################################################################################################################
+
+# Series whose knobs report how fast they are turned
+# A-Series and M-Series devices send the same DATA2 byte for every turn, so their knobs move by the slowest step of the curve
+SPEED_SENSITIVE_SERIES = ("S", )
+
+class KnobEngine:
+    """ Accumulates knob turns and hands them over as one net delta per knob and mode.
+
+    Feed it with `feed()` (or register it on `nihia.events` with `attach()`) while the messages arrive, and then call `drain()` once per tick,
+    for example from OnIdle, to get the total change of each knob since the last time.
+
+    The curve is only used with the series of `SPEED_SENSITIVE_SERIES`, taken from `nihia.events.getSeries()` (set by `nihia.profiles`).
+    On any other series, every turn moves by the first step of the curve.
+
+    ### Arguments
+     - curve: Tuple of 64 step sizes, as made by `linearCurve`, `exponentialCurve` or `tableCurve`. By default, an exponential curve that goes
+       from 1/127 to 8/127, so a slow turn moves a fader by one position of the device and a fast spin crosses the range in a few turns.
+    """
+
+    def __init__(self, curve: tuple = None):
+        self.setCurve(curve if curve is not None else exponentialCurve(1 / 127, 8 / 127))
+        self._deltas = {}
+
+    def setCurve(self, curve: tuple):
+        """ Changes the acceleration curve. It has to have a step size for each of the 64 speeds. """
+        if len(curve) != 64:
+            raise ValueError("An acceleration curve needs 64 steps, got %d" % len(curve))
+
+        # Lookup table that goes from the DATA2 byte of a knob message straight to its signed delta
+        # 0-63 are clockwise turns and 64-127 counterclockwise turns, with the same speeds `nihia.events` decodes them with
+        self._table = tuple(curve[speed] if data2 < 64 else -curve[speed] for data2, speed in enumerate(events.SPEEDS))
+        self._flatTable = (curve[0], ) * 64 + (-curve[0], ) * 64
+        self._curve = tuple(curve)
+
+    def _activeTable(self) -> tuple:
+        return self._table if events.getSeries() in SPEED_SENSITIVE_SERIES else self._flatTable
+
+    def delta(self, data2: int) -> float:
+        """ Returns the signed step a single knob message stands for, given its DATA2 byte. """
+        return self._activeTable()[data2]
+
+    def feed(self, event: events.KnobEvent):
+        """ Adds a knob turn to the total of its knob. """
+        step = self._curve[event.speed] if events.getSeries() in SPEED_SENSITIVE_SERIES else self._curve[0]
+        if event.direction < 0:
+            step = -step
+
+        key = (event.knob, event.mode)
+        self._deltas[key] = self._deltas.get(key, 0.0) + step
+
+    def feedRaw(self, data1: int, data2: int) -> bool:
+        """ Adds a knob turn to the total of its knob straight from the bytes of the message.
+
+        ### Returns
+         - bool: True if the message was a knob message.
+        """
+        if data1 in _KNOB_IDS:
+            key = _KNOB_IDS[data1]
+            self._deltas[key] = self._deltas.get(key, 0.0) + self._activeTable()[data2]
+            return True
+
+        return False
+
+    def drain(self) -> dict:
+        """ Returns the net change of every knob turned since the last call and starts over.
+
+        ### Returns
+         - dict: Goes from (knob, mode) to the total delta, leaving out the knobs whose turns cancelled each other.
+        """
+        deltas = {key: delta for key, delta in self._deltas.items() if delta}
+        self._deltas.clear()
+
+        return deltas
+
+    def attach(self):
+        """ Registers the engine on `nihia.events`, so every decoded knob event is fed to it. """
+        events.addHandler(events.KnobEvent, self.feed)
+
+    def detach(self):
+        """ Unregisters the engine from `nihia.events`. """
+        events.removeHandler(events.KnobEvent, self.feed)
+
+# Goes from the DATA1 byte of a knob message to its (knob, mode) key
+_KNOB_IDS = {}
+for _knob, _data1 in enumerate(mixer.knobs[0]):
+    _KNOB_IDS[_data1] = (_knob, "VOLUME")
+for _knob, _data1 in enumerate(mixer.knobs[1]):
+    _KNOB_IDS[_data1] = (_knob, "PAN")
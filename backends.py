@@ -0,0 +1,199 @@
+# MIT License
+
+# Copyright (c) 2024 Pablo Peral
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Submodule of flmidi-nihia with the backends the layer can write its messages to. By default, messages go to FL Studio through its `device`
+module, but the same API can drive Komplete Kontrol keyboards from outside of FL Studio by switching to another backend.
+"""
+
+import glob
+import os
+import re
+
+import nihia
+
+###########################################################################################################################################
+# Backends
+###########################################################################################################################################
+
+class Backend:
+    """ Base class of the backends. Every backend takes the messages in batches of already built frames, so it can write them the
+    fastest way it has. """
+
+    def write(self, frames):
+        """ Writes a batch of messages, in order.
+
+        ### Arguments
+         - frames: Sequence of full MIDI messages in bytes.
+        """
+        raise NotImplementedError
+
+    def read(self) -> bytes:
+        """ Returns whatever the device has sent since the last call, or empty bytes if there's nothing new or the backend can't read. """
+        return b""
+
+    def close(self):
+        """ Releases whatever the backend has open. """
+
+class FLStudioBackend(Backend):
+    """ Writes the messages through the `device` module of FL Studio's MIDI Scripting API. It's what the layer does when no backend is set.
+    Incoming messages reach the script through its OnMidiMsg function instead. """
+
+    def write(self, frames):
+        nihia._deviceOut(frames)
+
+class FileBackend(Backend):
+    """ Writes the raw bytes of the messages to a file or a pipe, one batch per write.
+
+    ### Arguments
+     - target: Path to open for writing or a binary file object that's already open.
+    """
+
+    def __init__(self, target):
+        if isinstance(target, (str, bytes, os.PathLike)):
+            self._file = open(target, "ab", buffering=0)
+            self._owned = True
+        else:
+            self._file = target
+            self._owned = False
+
+    def write(self, frames):
+        self._file.write(b"".join(frames))
+        self._file.flush()
+
+    def close(self):
+        if self._owned:
+            self._file.close()
+
+class RawMidiBackend(Backend):
+    """ Writes the messages to an ALSA rawmidi device node, like the ones made by the `snd-virmidi` kernel module for testing
+    (``modprobe snd-virmidi``) or the ones of a keyboard connected through USB.
+
+    ### Arguments
+     - path (str): Device node, like ``/dev/snd/midiC1D0``. `findPorts()` lists the ones available.
+     - blocking (bool): If False, a write the device can't take right away raises `BlockingIOError` instead of waiting.
+     - input (bool): If True, the node is also opened for reading so `read()` returns what the device sends.
+    """
+
+    def __init__(self, path: str, blocking: bool = True, input: bool = False):
+        self.path = path
+        self._out = os.open(path, os.O_WRONLY | (0 if blocking else os.O_NONBLOCK))
+        self._in = os.open(path, os.O_RDONLY | os.O_NONBLOCK) if input else None
+
+    def write(self, frames):
+        data = memoryview(b"".join(frames))
+
+        # The kernel might take less than the whole batch at once
+        total = 0
+        while data:
+            try:
+                written = os.write(self._out, data)
+            except BlockingIOError as error:
+                # Tells the caller how much of the batch got through before the device stopped taking it
+                error.characters_written = total
+                raise
+
+            total += written
+            data = data[written:]
+
+    def read(self) -> bytes:
+        if self._in is None:
+            return b""
+
+        try:
+            return os.read(self._in, 4096)
+        except BlockingIOError:
+            return b""
+
+    def close(self):
+        os.close(self._out)
+        if self._in is not None:
+            os.close(self._in)
+
+    @staticmethod
+    def findPorts(virtualOnly: bool = False) -> list:
+        """ Lists the ALSA rawmidi device nodes of the system.
+
+        ### Arguments
+         - virtualOnly (bool): If True, only lists the ports of the `snd-virmidi` cards.
+        """
+        ports = sorted(glob.glob("/dev/snd/midiC*D*"))
+        if not virtualOnly:
+            return ports
+
+        try:
+            with open("/proc/asound/cards") as file:
+                cards = {match.group(1) for match in re.finditer(r"^\s*(\d+)\s+\[\w+\s*\]: VirMIDI", file.read(), re.MULTILINE)}
+        except OSError:
+            return []
+
+        return [port for port in ports if re.match(r"/dev/snd/midiC(\d+)D", port).group(1) in cards]
+
+class RtMidiBackend(Backend):
+    """ Writes the messages through python-rtmidi, which has to be installed separately (``pip install python-rtmidi``). With the ALSA API,
+    it can open a virtual sequencer port other programs can connect to.
+
+    ### Arguments
+     - port (str or int): Name (or part of it) or number of the output port to open. Ignored for virtual ports.
+     - virtual (bool): If True, opens a new virtual port named after `port` instead of connecting to an existing one.
+    """
+
+    def __init__(self, port = 0, virtual: bool = False):
+        try:
+            import rtmidi
+        except ImportError:
+            raise ImportError("RtMidiBackend needs python-rtmidi, install it with: pip install python-rtmidi") from None
+
+        self._midiOut = rtmidi.MidiOut()
+
+        if virtual:
+            self._midiOut.open_virtual_port(port if isinstance(port, str) else "nihia")
+        elif isinstance(port, str):
+            names = self._midiOut.get_ports()
+            matches = [index for index, name in enumerate(names) if port in name]
+            if not matches:
+                raise ValueError("There's no MIDI output port named %r. Available ports: %s" % (port, ", ".join(names)))
+            self._midiOut.open_port(matches[0])
+        else:
+            self._midiOut.open_port(port)
+
+    def write(self, frames):
+        sendMessage = self._midiOut.send_message
+        for frame in frames:
+            sendMessage(frame)
+
+    def close(self):
+        self._midiOut.close_port()
+
+###########################################################################################################################################
+# Methods and functions
+###########################################################################################################################################
+
+def setBackend(backend: Backend):
+    """ Makes the layer write every message to a backend. None goes back to FL Studio's `device` module.
+    The previous backend isn't closed.
+    """
+    nihia._backend = backend
+
+def getBackend() -> Backend:
+    """ Returns the backend messages are being written to, or None if it's FL Studio's `device` module. """
+    return nihia._backend
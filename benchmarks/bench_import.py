@@ -0,0 +1,91 @@
+# MIT License
+
+# Copyright (c) 2024 Pablo Peral
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Benchmark of the cold-start cost of the layer: the time it takes to load the package on a fresh interpreter, as FL Studio does on every
+script load and reload, compared to loading it and then touching every submodule.
+
+Run it from anywhere with: python benchmarks/bench_import.py [--runs 20] [--output results.json]
+
+Compile the package first (python -m compileall .) so the numbers don't include compiling the sources.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from harness import ROOT
+
+# Code run on each fresh interpreter. Prints the nanoseconds it took to load the package and to access the given submodules
+_PROBE = """
+import importlib.util, os, sys, time
+root = %r
+sys.path.insert(0, os.path.join(root, "standin"))
+
+start = time.perf_counter_ns()
+spec = importlib.util.spec_from_file_location("nihia", os.path.join(root, "__init__.py"), submodule_search_locations=[root])
+nihia = importlib.util.module_from_spec(spec)
+sys.modules["nihia"] = nihia
+spec.loader.exec_module(nihia)
+for name in %r:
+    getattr(nihia, name)
+print(time.perf_counter_ns() - start)
+"""
+
+def coldStart(submodules, runs: int) -> dict:
+    """ Loads the package on `runs` fresh interpreters and returns the statistics of the time it took, in microseconds. """
+    times = []
+    for _ in range(runs):
+        output = subprocess.check_output([sys.executable, "-c", _PROBE % (ROOT, list(submodules))])
+        times.append(int(output) / 1000)
+
+    return {"median_us": statistics.median(times), "min_us": min(times), "max_us": max(times)}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=20, help="Fresh interpreters to start for each case")
+    parser.add_argument("--output", help="File to write the results to as JSON")
+    args = parser.parse_args()
+
+    # The package is loaded first so the list of submodules comes from it
+    sys.path.insert(0, os.path.join(ROOT, "standin"))
+    from harness import loadNihia
+    nihia = loadNihia()
+
+    results = {
+        "import/package": coldStart([], args.runs),
+        "import/package_and_mixer": coldStart(["mixer"], args.runs),
+        "import/package_and_all_submodules": coldStart(nihia._SUBMODULES, args.runs),
+    }
+
+    for name, result in results.items():
+        print("%-36s %s" % (name, "  ".join("%s=%.1f" % item for item in result.items())))
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+
+if __name__ == "__main__":
+    main()
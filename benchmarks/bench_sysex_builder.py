@@ -0,0 +1,61 @@
+# MIT License
+
+# Copyright (c) 2024 Pablo Peral
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Micro-benchmark comparing the precompiled SysEx frame builder of the mixer submodule against the list concatenation
+that was used before to build the same messages.
+
+Run it from anywhere with: python benchmarks/bench_sysex_builder.py
+"""
+
+from harness import loadNihia, timePerCall
+
+def legacyTrackInfo(nihia, mixer, info_type, value, trackID, text=None):
+    """ Builds a message the way the mixer setters used to do it. """
+    msg = nihia.SYSEX_HEADER + [mixer.mixerinfo_types.get(info_type), value, trackID]
+    if text is not None:
+        msg += mixer.Str2Bytes(text)
+    return bytes(msg + [247])
+
+def main():
+    nihia = loadNihia()
+    from nihia import mixer
+
+    cases = {
+        "name": ("NAME", 0, 3, "Insert 12"),
+        "volume": ("VOLUME", 0, 5, "-3.2 dB"),
+        "mute": ("IS_MUTE", 1, 2),
+    }
+
+    number = 200000
+    print("%-8s %14s %14s %8s" % ("message", "lists (ns)", "builder (ns)", "speedup"))
+    for name, args in cases.items():
+        # Both ways must give the very same bytes
+        assert legacyTrackInfo(nihia, mixer, *args) == mixer.buildTrackInfo(*args)
+
+        legacy = timePerCall(lambda: legacyTrackInfo(nihia, mixer, *args), number)
+        builder = timePerCall(lambda: mixer.buildTrackInfo(*args), number)
+
+        print("%-8s %14.1f %14.1f %7.2fx" % (name, legacy, builder, legacy / builder))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+# MIT License
+
+# Copyright (c) 2024 Pablo Peral
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Shared helpers for the benchmarks of flmidi-nihia.
+"""
+
+import importlib.util
+import os
+import sys
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def loadNihia():
+    """ Loads the layer as the `nihia` package no matter how the folder containing it is named, using the stand-in
+    `device` module when running outside of FL Studio."""
+    if "nihia" in sys.modules:
+        return sys.modules["nihia"]
+
+    if importlib.util.find_spec("device") is None:
+        sys.path.insert(0, os.path.join(ROOT, "standin"))
+
+    spec = importlib.util.spec_from_file_location("nihia", os.path.join(ROOT, "__init__.py"), submodule_search_locations=[ROOT])
+    nihia = importlib.util.module_from_spec(spec)
+    sys.modules["nihia"] = nihia
+    spec.loader.exec_module(nihia)
+
+    return nihia
+
+def timePerCall(function, number: int, repeat: int = 5) -> float:
+    """ Returns the best time out of `repeat` runs of `number` calls to a function, in nanoseconds per call. """
+    return min(timeit.repeat(function, number=number, repeat=repeat)) / number * 1e9
@@ -0,0 +1,230 @@
+# MIT License
+
+# Copyright (c) 2024 Pablo Peral
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Benchmark suite of flmidi-nihia. Measures how long the layer keeps FL Studio's UI thread busy and how much MIDI traffic it makes, running
+against the stand-in `device` module.
+
+Run it from anywhere with: python benchmarks/run.py [--output results.json] [--quick]
+
+Results are printed as a table and, if requested, written as JSON so they can be compared between releases.
+"""
+
+import argparse
+import itertools
+import json
+import platform
+import sys
+import time
+
+from harness import loadNihia, timePerCall
+
+nihia = loadNihia()
+
+import device
+from nihia import buttons, meters, mixer, names, surface
+
+# Names used for the UTF-8 encoding cases
+NAMES = {
+    "ascii": "Insert 12",
+    "latin": "Bateria acustica áéí",
+    "cjk": "ドラム バス",
+    "emoji": "Kick \U0001f941",
+}
+
+def _refreshBank():
+    """ Refreshes the 8 tracks being displayed, the way a script does it on OnRefresh, forgetting the previous refresh first so the arrows
+    don't get skipped. """
+    mixer.invalidateState()
+
+    for track in range(8):
+        mixer.setTrackExist(track, 1)
+        mixer.setTrackName(track, "Insert %d" % (track + 1))
+        mixer.setTrackVol(track, "-3.2 dB")
+        mixer.setTrackPan(track, "Centered")
+        mixer.setTrackMute(track, False)
+        mixer.setTrackSolo(track, False)
+        mixer.setTrackArm(track, False)
+        mixer.setTrackSel(track, track == 0)
+        mixer.setTrackVolGraph(track, 0.8)
+        mixer.setTrackPanGraph(track, 0.0)
+
+# Bank of 8 tracks for setBank, with the same contents _refreshBank() sends
+BANK = [
+    {"exist": 1, "name": "Insert %d" % (track + 1), "vol": "-3.2 dB", "pan": "Centered", "mute": False, "solo": False, "arm": False,
+     "sel": track == 0, "volGraph": 0.8, "panGraph": 0.0}
+    for track in range(8)
+]
+
+def _setBank():
+    """ Sends the whole bank through setBank, forgetting the previous one first so the arrows don't get skipped. """
+    mixer.invalidateState()
+    mixer.setBank(BANK)
+
+# Volume positions of the 8 tracks while automation plays, moving a bit on every tick
+_AUTOMATION = [[((tick + track * 5) % 100) / 100 for track in range(8)] for tick in range(100)]
+_tick = 0
+
+def _automateGraphs():
+    """ Updates the volume arrows of the 8 tracks as fader automation would on each tick. """
+    global _tick
+
+    _tick = (_tick + 1) % 100
+    mixer.setTrackVolGraphs(_AUTOMATION[_tick])
+
+# Lights of the transport buttons refreshed by scripts on every OnRefresh
+# Lights are never sent twice with the same mode, so the benchmark switches between the two sets to send every light on every call
+TRANSPORT_LIGHTS = {"PLAY": 1, "REC": 0, "LOOP": 1, "METRO": 0, "UNDO": 1, "REDO": 0, "QUANTIZE": 1, "AUTO": 0}
+TRANSPORT_LIGHTS_INVERTED = {button: 1 - mode for button, mode in TRANSPORT_LIGHTS.items()}
+
+def _singleCalls() -> dict:
+    return {
+        "nihia.dataOut": lambda: nihia.dataOut(16, 1),
+        "buttons.setLight": lambda: buttons.setLight("PLAY", 1),
+        "buttons.setLights": lambda lights = itertools.cycle((TRANSPORT_LIGHTS_INVERTED, TRANSPORT_LIGHTS)): buttons.setLights(next(lights)),
+        "mixer.setTrackExist": lambda: mixer.setTrackExist(0, 1),
+        "mixer.setTrackName": lambda: mixer.setTrackName(0, "Insert 1"),
+        "mixer.setTrackVol": lambda: mixer.setTrackVol(0, "-3.2 dB"),
+        "mixer.setTrackPan": lambda: mixer.setTrackPan(0, "Centered"),
+        "mixer.setTrackMute": lambda: mixer.setTrackMute(0, True),
+        "mixer.setTrackSolo": lambda: mixer.setTrackSolo(0, True),
+        "mixer.setTrackArm": lambda: mixer.setTrackArm(0, True),
+        "mixer.setTrackSel": lambda: mixer.setTrackSel(0, True),
+        "mixer.setTrackMutedBySolo": lambda: mixer.setTrackMutedBySolo(0, True),
+        "mixer.setKompleteInstance": lambda: mixer.setKompleteInstance("NIKB00"),
+        "mixer.sendPeakMeterData": lambda: mixer.sendPeakMeterData([64] * 16),
+        # The arrows are never sent twice to the same position, so they move back and forth to send a message on every call
+        "mixer.setTrackVolGraph": lambda positions = itertools.cycle((0.8, 0.2)): mixer.setTrackVolGraph(0, next(positions)),
+        "mixer.setTrackPanGraph": lambda positions = itertools.cycle((-0.5, 0.5)): mixer.setTrackPanGraph(0, next(positions)),
+    }
+
+def _measure(function, number: int) -> dict:
+    """ Times a function and counts the traffic a single call to it makes. """
+    device.reset()
+    function()
+    traffic = device.stats()
+
+    result = {
+        "ns_per_call": timePerCall(function, number),
+        "messages_per_call": traffic["messages"],
+        "bytes_per_call": traffic["bytes"],
+    }
+
+    device.reset()
+    return result
+
+def _streamMeters(rate: int, seconds: float) -> dict:
+    """ Streams changing peaks through a meter engine at a given rate, with a simulated clock so the benchmark doesn't wait. """
+    engine = meters.MeterEngine()
+    frames = int(rate * seconds)
+    peaks = [[((frame * 7 + channel * 13) % 100) / 90 for channel in range(meters.CHANNELS)] for frame in range(frames)]
+
+    device.reset()
+    start = time.perf_counter_ns()
+    for frame in range(frames):
+        engine.update(peaks[frame], now=frame / rate)
+    elapsed = time.perf_counter_ns() - start
+    traffic = device.stats()
+    device.reset()
+
+    return {
+        "ns_per_update": elapsed / frames,
+        "messages_per_second": traffic["messages"] / seconds,
+        "bytes_per_second": traffic["bytes"] / seconds,
+    }
+
+def run(quick: bool = False) -> dict:
+    """ Runs every benchmark and returns the results. """
+    number = 2000 if quick else 20000
+    results = {}
+
+    for name, function in _singleCalls().items():
+        results["single/" + name] = _measure(function, number)
+
+    for cached in (False, True):
+        mixer.enableStateCache(cached)
+        suffix = "_mirror" if cached else ""
+        results["bank/refresh_8_tracks" + suffix] = _measure(_refreshBank, number // 100)
+        results["bank/setBank_8_tracks" + suffix] = _measure(_setBank, number // 100)
+    mixer.enableStateCache(False)
+    results["graphs/automation_8_tracks"] = _measure(_automateGraphs, number // 10)
+
+    # Diff of two whole banks, identical and with a single change
+    state = surface.SurfaceState()
+    for track in range(8):
+        state.set("NAME", track, "Insert %d" % (track + 1))
+        state.set("EXIST", track, 1)
+    changed = state.snapshot()
+    changed.set("IS_SOLO", 7, 1)
+    results["surface/diff_identical"] = {"ns_per_call": timePerCall(lambda: state.diff(state.snapshot()), number)}
+    results["surface/diff_one_change"] = {"ns_per_call": timePerCall(lambda: state.diff(changed), number)}
+
+    for rate in (30, 60):
+        results["meters/stream_%dhz" % rate] = _streamMeters(rate, 2 if quick else 20)
+
+    # Names as sent by setTrackName: as they are with the default settings, and trimmed and transliterated with and without the cache
+    # The raw cases encode the names without making them safe for the screen, as the baseline
+    for name, text in NAMES.items():
+        results["encoding/raw_" + name] = {"ns_per_call": timePerCall(lambda: mixer.buildTrackInfo("NAME", 0, 0, text), number)}
+        results["encoding/" + name] = {
+            "ns_per_call": timePerCall(lambda: mixer.buildTrackInfo("NAME", 0, 0, names.encodeName(text)), number),
+            "bytes_per_call": len(mixer.buildTrackInfo("NAME", 0, 0, names.encodeName(text))),
+        }
+
+        names.setDisplay(8, True)
+        results["encoding/trimmed_" + name] = {
+            "ns_per_call": timePerCall(lambda: mixer.buildTrackInfo("NAME", 0, 0, names._render(text, 8, True)), number),
+            "bytes_per_call": len(names.encodeName(text)) + 14,
+        }
+        results["encoding/cached_" + name] = {
+            "ns_per_call": timePerCall(lambda: mixer.buildTrackInfo("NAME", 0, 0, names.encodeName(text)), number),
+            "bytes_per_call": len(names.encodeName(text)) + 14,
+        }
+        names.setDisplay()
+
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--output", help="File to write the results to as JSON")
+    parser.add_argument("--quick", action="store_true", help="Run fewer iterations")
+    args = parser.parse_args()
+
+    results = run(args.quick)
+
+    for name, result in results.items():
+        print("%-36s %s" % (name, "  ".join("%s=%.1f" % item for item in result.items())))
+
+    if args.output:
+        report = {
+            "python": sys.version.split()[0],
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "results": results,
+        }
+
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -86,6 +86,21 @@ button_list = {
     "MINUS": 127
 }
 
+# Light mode integer to light mode hex dictionary
+_LIGHT_MODES = {
+    0: 0,
+    1: 1,
+
+    # For setting lights on of the right and down dot lights of the 4D Encoder on S-Series devices
+    127: 127
+}
+
+# Last light mode set for each button ID. 255 means the light of that button is unknown
+_lights = bytearray([255] * 128)
+
+# Whether the device is showing the light mode kept for each button ID, which stops being the case after a handshake
+_shown = bytearray(128)
+
 # Method for controlling the lighting on the buttons (for those who have idle/highlighted two state lights)
 # Examples of this kind of buttons are the PLAY or REC buttons, where the PLAY button alternates between low and high light and so on.
 # SHIFT buttons are also included in this range of buttons, but instead of low/high light they alternate between on/off light states.
@@ -99,14 +114,61 @@ def setLight(buttonName: str, lightMode: int):
     
      - lightMode: If set to 0, sets the first light mode of the button. If set to 1, sets the second light mode."""
 
-    #Light mode integer to light mode hex dictionary
-    lightModes = {
-        0: 0,
-        1: 1,
+    buttonID = button_list.get(buttonName)
+    lightMode = _LIGHT_MODES.get(lightMode)
 
-        # For setting lights on of the right and down dot lights of the 4D Encoder on S-Series devices
-        127: 127
-    }
+    # Keeps the light mode for setLights() and repaintLights()
+    _lights[buttonID] = lightMode
+    _shown[buttonID] = 1
 
     # Then sends the MIDI message using dataOut
-    nihia.dataOut(button_list.get(buttonName), lightModes.get(lightMode))
+    nihia.dataOut(buttonID, lightMode)
+
+def setLights(lights: dict) -> int:
+    """ Method for controlling the lights of several buttons at once, like all the transport buttons on every refresh. Only the lights that
+    changed since the last time they were set are sent, all of them in a single batch.
+
+    ### Parameters
+
+     - lights: Dictionary that goes from the name of each button, as taken by `setLight`, to its light mode.
+
+    ### Returns
+     - int: Number of lights that changed.
+    """
+    frames = []
+
+    for buttonName, lightMode in lights.items():
+        buttonID = button_list[buttonName]
+        lightMode = _LIGHT_MODES[lightMode]
+
+        if _lights[buttonID] != lightMode or not _shown[buttonID]:
+            _lights[buttonID] = lightMode
+            _shown[buttonID] = 1
+            frames.append(bytes((191, buttonID, lightMode)))
+
+    if frames:
+        nihia.framesOut(frames)
+
+    return len(frames)
+
+def repaintLights() -> int:
+    """ Sends again the last light mode set for every button, for when the device has been reconnected and isn't showing them anymore.
+
+    ### Returns
+     - int: Number of lights sent.
+    """
+    frames = []
+    for buttonID, lightMode in enumerate(_lights):
+        if lightMode != 255:
+            _shown[buttonID] = 1
+            frames.append(bytes((191, buttonID, lightMode)))
+
+    if frames:
+        nihia.framesOut(frames)
+
+    return len(frames)
+
+def forgetLights():
+    """ Marks the light of every button as not shown by the device, so the next call to `setLights` sends all of them. The light modes
+    are still known, so `repaintLights` can send them again. """
+    _shown[:] = bytes(128)
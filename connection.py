@@ -0,0 +1,289 @@
+# MIT License
+
+# Copyright (c) 2024 Pablo Peral
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Submodule of flmidi-nihia that keeps track of the connection with the device: it makes the handshake without blocking the script, waits for the
+answer of the device, retries if it doesn't come and holds every update sent in the meantime, sending all of them at once when the device is ready.
+"""
+
+import time
+
+import nihia
+from nihia import scheduler
+
+###########################################################################################################################################
+# Dictionaries and constants
+###########################################################################################################################################
+
+# States of the connection
+DISCONNECTED = "DISCONNECTED"   # Nothing has been done yet or the device never answered and messages are sent as usual
+HANDSHAKING = "HANDSHAKING"     # Handshake sent, waiting for the answer of the device
+READY = "READY"                 # The device is in DAW integration mode and messages are sent as usual
+GOODBYE = "GOODBYE"             # The goodbye message was sent and the device went back to MIDI mode
+
+# DATA1 bytes of the handshake and goodbye messages, which the device also uses on its answers
+HELLO = 1
+BYE = 2
+
+# Protocol version sent as the DATA2 byte of the handshake
+PROTOCOL_VERSION = 3
+
+###########################################################################################################################################
+# Connection state
+###########################################################################################################################################
+
+_state = DISCONNECTED
+
+# Protocol version reported by the device on its answer to the handshake
+protocolVersion = None
+
+# Settings of the handshake
+_timeout = 0.5
+_retries = 5
+_backoff = 2.0
+
+# Attempts made so far and moment the current one times out
+_attempt = 0
+_deadline = 0.0
+
+# Latest message for each target sent while the device wasn't ready, in the order they were first sent
+_held = {}
+_heldSink = None
+
+# Functions called when the device becomes ready
+_readyHandlers = []
+
+# Functions called when the device never answered
+_giveUpHandlers = []
+
+###########################################################################################################################################
+# Methods and functions
+###########################################################################################################################################
+
+def getState() -> str:
+    """ Returns the current state of the connection: `DISCONNECTED`, `HANDSHAKING`, `READY` or `GOODBYE`. """
+    return _state
+
+def isReady() -> bool:
+    """ Returns True if the device is ready to take messages. """
+    return _state == READY
+
+def addReadyHandler(handler):
+    """ Registers a function to be called with no arguments every time the device becomes ready, after the held updates were sent.
+    Useful to send whatever the device needs to show that didn't change while connecting. """
+    _readyHandlers.append(handler)
+
+def removeReadyHandler(handler):
+    """ Unregisters a function previously registered with `addReadyHandler`. """
+    _readyHandlers.remove(handler)
+
+def addGiveUpHandler(handler):
+    """ Registers a function to be called with no arguments every time the connection gives up after the last retry, after the held
+    updates were sent. """
+    _giveUpHandlers.append(handler)
+
+def removeGiveUpHandler(handler):
+    """ Unregisters a function previously registered with `addGiveUpHandler`. """
+    _giveUpHandlers.remove(handler)
+
+def installSink(sink):
+    """ Sets the function that receives every outgoing message as a full MIDI message in bytes instead of the device, like the
+    output scheduler does. While updates are being held, the sink takes them once they are released instead.
+
+    ### Arguments
+     - sink: Function that takes a message in bytes.
+    """
+    global _heldSink
+
+    if nihia._sink is _holdFrame:
+        _heldSink = sink
+    else:
+        nihia._sink = sink
+
+def removeSink(sink):
+    """ Goes back to sending messages to the device if a sink set with `installSink()` is the one in use, holding them or not. """
+    global _heldSink
+
+    if nihia._sink is _holdFrame:
+        if _heldSink is sink:
+            _heldSink = None
+    elif nihia._sink is sink:
+        nihia._sink = None
+
+def isHolding() -> bool:
+    """ Returns True if outgoing messages are being held until the device is ready. """
+    return nihia._sink is _holdFrame
+
+def connect(timeout: float = 0.5, retries: int = 5, backoff: float = 2.0, now: float = None):
+    """ Starts the handshake with the device and returns right away. From then on, until the device answers, every message sent by the layer
+    is held back, keeping only the latest one for each target. Call `onMidiMsg()` from the OnMidiMsg function of the script and `onIdle()`
+    from its OnIdle function for the connection to go forward.
+
+    The device state mirror of `nihia.mixer` is cleared along with the caches registered to it, since whatever the device was showing
+    before is gone, and the lights of the buttons
+    known by `nihia.buttons` are sent again as soon as the device is ready.
+
+    ### Arguments
+     - timeout (float): Seconds to wait for the answer to the first attempt.
+     - retries (int): Attempts to make after the first one before giving up.
+     - backoff (float): Factor the timeout is multiplied by on each new attempt.
+     - now (float): Current time in seconds. Defaults to `time.monotonic()`.
+    """
+    global _state, _timeout, _retries, _backoff, _attempt
+
+    _timeout = timeout
+    _retries = retries
+    _backoff = backoff
+    _attempt = 0
+
+    from nihia import buttons, mixer
+    mixer.invalidateState()
+
+    _hold()
+    _state = HANDSHAKING
+
+    # Held until the device is ready, like anything else
+    buttons.repaintLights()
+
+    _sendHandshake(time.monotonic() if now is None else now)
+
+def disconnect():
+    """ Sends the goodbye message to the device, taking it out of DAW integration mode, and throws away any update still being held. """
+    global _state
+
+    _release(flush=False)
+    nihia.goodBye()
+    _state = GOODBYE
+
+def onMidiMsg(event) -> bool:
+    """ Looks for the answer of the device to the handshake on an event given by FL Studio to the OnMidiMsg function of a script.
+    The event is marked as handled if it was the answer.
+
+    ### Returns
+     - bool: True if the event was the answer to the handshake.
+    """
+    if event.status != 191 or not feed(event.data1, event.data2):
+        return False
+
+    event.handled = True
+    return True
+
+def feed(data1: int, data2: int) -> bool:
+    """ Looks for the answer of the device to the handshake on the DATA1 and DATA2 bytes of an incoming "BF XX XX" message.
+    The device answers with the same DATA1 byte of the handshake and its protocol version as the DATA2 byte.
+
+    ### Returns
+     - bool: True if the message was the answer to the handshake.
+    """
+    global _state, protocolVersion
+
+    if data1 != HELLO or _state != HANDSHAKING:
+        return False
+
+    protocolVersion = data2
+    _state = READY
+
+    # Sends everything held back as a single consolidated snapshot
+    _release(flush=True)
+
+    for handler in list(_readyHandlers):
+        handler()
+
+    return True
+
+def onIdle(now: float = None):
+    """ Moves the connection forward. Meant to be called from the OnIdle function of the script.
+
+    When a backend of `nihia.backends` able to read is in use (outside of FL Studio), its incoming messages are checked for the answer of the device.
+    If the current attempt timed out, the handshake is sent again with a longer timeout. After the last retry, the connection gives up:
+    the updates held so far are sent, the ones made from then on are sent as usual, the state becomes `DISCONNECTED` and the functions
+    registered with `addGiveUpHandler()` are called. Call `connect()` again to retry, for example when the device is plugged back in.
+    """
+    global _state
+
+    if _state != HANDSHAKING:
+        return
+
+    backend = nihia._backend
+    if backend is not None:
+        data = backend.read()
+        for index in range(len(data) - 2):
+            if data[index] == 191 and feed(data[index + 1], data[index + 2]):
+                return
+
+    if now is None:
+        now = time.monotonic()
+
+    if now < _deadline:
+        return
+
+    if _attempt > _retries:
+        _state = DISCONNECTED
+
+        # Nothing is held anymore, so updates don't get swallowed without notice while nobody retries
+        # If the device was there after all, it ends up showing the same as if it had answered
+        _release(flush=True)
+
+        for handler in list(_giveUpHandlers):
+            handler()
+        return
+
+    _sendHandshake(now)
+
+def _sendHandshake(now: float):
+    """ Sends the handshake message straight to the device, skipping the hold, and sets when the attempt times out. """
+    global _attempt, _deadline
+
+    nihia.writeFrames([bytes((191, HELLO, PROTOCOL_VERSION))])
+
+    _deadline = now + _timeout * _backoff ** _attempt
+    _attempt += 1
+
+def _holdFrame(frame: bytes):
+    """ Sink that holds messages while the device isn't ready. """
+    _held[scheduler.targetOf(frame)] = frame
+
+def _hold():
+    """ Starts holding every outgoing message, keeping whatever sink was there before to hand the messages to it later. """
+    global _heldSink
+
+    if nihia._sink is not _holdFrame:
+        _heldSink = nihia._sink
+        nihia._sink = _holdFrame
+
+    # Whatever the output scheduler had queued hasn't reached the device either, so it's held along with the rest
+    for frame in scheduler.take():
+        _holdFrame(frame)
+
+def _release(flush: bool):
+    """ Stops holding messages, putting the previous sink back, and sends or throws away the ones that were held. """
+    global _heldSink
+
+    if nihia._sink is _holdFrame:
+        nihia._sink = _heldSink
+    _heldSink = None
+
+    frames = list(_held.values())
+    _held.clear()
+
+    if flush and frames:
+        nihia.framesOut(frames)
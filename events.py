@@ -0,0 +1,189 @@
+# MIT License
+
+# Copyright (c) 2024 Pablo Peral
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Submodule of flmidi-nihia that decodes the MIDI messages sent by Komplete Kontrol keyboards into button, knob and 4D encoder events.
+"""
+
+import collections
+
+from nihia import buttons, mixer
+
+###########################################################################################################################################
+# Event types
+###########################################################################################################################################
+
+# A button of the device has been pressed
+# - name: Name of the button as found on `buttons.button_list`
+# - value: DATA2 of the message. For TRACK_SELECT, MUTE and SOLO it's the track (0-7) the button belongs to
+ButtonEvent = collections.namedtuple("ButtonEvent", ["name", "value"])
+
+# One of the 8 knobs has been turned
+# - knob: From 0 to 7, the knob being turned
+# - mode: "VOLUME" for the knob itself and "PAN" for the knob while SHIFT is being held
+# - direction: 1 if turned clockwise, -1 if turned counterclockwise
+# - speed: From 0 (slowest) to 63 (fastest). A/M-Series devices always report the fastest speed
+KnobEvent = collections.namedtuple("KnobEvent", ["knob", "mode", "direction", "speed"])
+
+# The 4D encoder has been moved or turned
+# - control: "ENCODER_X" and "ENCODER_Y" for the axis of the D-pad and ENCODER_GENERAL, ENCODER_VOLUME_SELECTED or ENCODER_PAN_SELECTED when
+#   used as a knob
+# - direction: RIGHT, LEFT, UP or DOWN for the D-pad and PLUS or MINUS when used as a knob
+EncoderEvent = collections.namedtuple("EncoderEvent", ["control", "direction"])
+
+###########################################################################################################################################
+# Dispatch tables
+###########################################################################################################################################
+
+# STATUS byte of every message the device sends in DAW integration mode
+STATUS = 191
+
+# Series the tables are built for
+# A/M-Series devices and S-Series devices use different DATA1 values for the axis of the 4D encoder
+SERIES = ("A", "S")
+
+# Entries of buttons.button_list that aren't buttons themselves, but DATA1 values of the 4D encoder or the DATA2 values it sends
+_ENCODER_ENTRIES = {
+    "ENCODER_X_A", "ENCODER_X_S", "ENCODER_Y_A", "ENCODER_Y_S",
+    "RIGHT", "LEFT", "UP", "DOWN",
+    "ENCODER_GENERAL", "ENCODER_VOLUME_SELECTED", "ENCODER_PAN_SELECTED",
+    "PLUS", "MINUS",
+}
+
+def _buttonDecoder(name: str):
+    return lambda data2: ButtonEvent(name, data2)
+
+# Speed of a knob turn by the DATA2 byte of its message
+# Clockwise goes from 0 to 63 and counterclockwise from 127 to 65, slowest to fastest, so the 63 counterclockwise values are spread over the
+# 0-63 range to make the fastest turn the same speed in both directions. 64 is never sent, but it's taken as the fastest counterclockwise turn
+SPEEDS = bytes(list(range(64)) + [63] + [round((127 - data2) * 63 / 62) for data2 in range(65, 128)])
+
+def _knobDecoder(knob: int, mode: str):
+    return lambda data2: KnobEvent(knob, mode, 1, data2) if data2 < 64 else KnobEvent(knob, mode, -1, SPEEDS[data2])
+
+def _encoderDecoder(control: str, directions: dict):
+    return lambda data2: EncoderEvent(control, directions[data2]) if data2 in directions else None
+
+def _buildTable(series: str) -> tuple:
+    """ Builds the 128 entries table that goes from the DATA1 byte of an incoming message to the function that decodes its DATA2 byte. """
+    table = [None] * 128
+    button_list = buttons.button_list
+
+    for name, data1 in button_list.items():
+        if name not in _ENCODER_ENTRIES:
+            table[data1] = _buttonDecoder(name)
+
+    for knob, data1 in enumerate(mixer.knobs[0]):
+        table[data1] = _knobDecoder(knob, "VOLUME")
+
+    for knob, data1 in enumerate(mixer.knobs[1]):
+        table[data1] = _knobDecoder(knob, "PAN")
+
+    table[button_list["ENCODER_X_" + series]] = _encoderDecoder("ENCODER_X", {button_list["RIGHT"]: "RIGHT", button_list["LEFT"]: "LEFT"})
+    table[button_list["ENCODER_Y_" + series]] = _encoderDecoder("ENCODER_Y", {button_list["UP"]: "UP", button_list["DOWN"]: "DOWN"})
+
+    knobDirections = {button_list["PLUS"]: "PLUS", button_list["MINUS"]: "MINUS"}
+    for control in ("ENCODER_GENERAL", "ENCODER_VOLUME_SELECTED", "ENCODER_PAN_SELECTED"):
+        table[button_list[control]] = _encoderDecoder(control, knobDirections)
+
+    return tuple(table)
+
+_tables = {series: _buildTable(series) for series in SERIES}
+_table = _tables["A"]
+_series = "A"
+
+# Functions to call for each kind of event
+_handlers = {ButtonEvent: [], KnobEvent: [], EncoderEvent: []}
+
+###########################################################################################################################################
+# Methods and functions
+###########################################################################################################################################
+
+def setSeries(series: str):
+    """ Sets the series of the device the messages are coming from.
+
+    ### Arguments
+     - series (str): "A" for A-Series and M-Series devices or "S" for S-Series devices.
+    """
+    global _table, _series
+
+    _table = _tables[series]
+    _series = series
+
+def getSeries() -> str:
+    """ Returns the series of the device the messages are coming from, as set with `setSeries`. """
+    return _series
+
+def decode(data1: int, data2: int):
+    """ Turns the DATA1 and DATA2 bytes of an incoming "BF XX XX" message into an event.
+
+    ### Returns
+     - A `ButtonEvent`, `KnobEvent` or `EncoderEvent`, or None if the message isn't known.
+    """
+    decoder = _table[data1 & 127]
+    if decoder is None:
+        return None
+
+    return decoder(data2)
+
+def addHandler(eventType, handler):
+    """ Registers a function to be called with every event of a kind.
+
+    ### Arguments
+     - eventType: `ButtonEvent`, `KnobEvent` or `EncoderEvent`.
+     - handler: Function that takes the event as its only argument.
+    """
+    _handlers[eventType].append(handler)
+
+def removeHandler(eventType, handler):
+    """ Unregisters a function previously registered with `addHandler`. """
+    _handlers[eventType].remove(handler)
+
+def dispatch(event) -> bool:
+    """ Calls every handler registered for the kind of a given event.
+
+    ### Returns
+     - bool: True if there was any handler for it.
+    """
+    handlers = _handlers[event.__class__]
+
+    for handler in handlers:
+        handler(event)
+
+    return bool(handlers)
+
+def onMidiMsg(event) -> bool:
+    """ Decodes and dispatches an event given by FL Studio to the OnMidiMsg function of a script. If any handler takes care of it,
+    the event is marked as handled.
+
+    ### Returns
+     - bool: True if the event was handled.
+    """
+    if event.status != STATUS:
+        return False
+
+    decoded = decode(event.data1, event.data2)
+    if decoded is None or not dispatch(decoded):
+        return False
+
+    event.handled = True
+    return True
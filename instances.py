@@ -0,0 +1,140 @@
+# MIT License
+
+# Copyright (c) 2024 Pablo Peral
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Submodule of flmidi-nihia that finds the Komplete Kontrol instances on the tracks of FL Studio's mixer and reports the one of the
+selected track to the device, keeping what it finds so the plugins of a track are only looked through again after FL Studio reports it as dirty.
+"""
+
+from nihia import mixer
+
+###########################################################################################################################################
+# Dictionaries and constants
+###########################################################################################################################################
+
+# Number of effect slots of each mixer track in FL Studio
+SLOTS = 10
+
+# Prefix of the name of the first automation parameter of every Komplete Kontrol instance
+PREFIX = "NIKB"
+
+###########################################################################################################################################
+# Methods and functions
+###########################################################################################################################################
+
+def scanTrack(track: int) -> str:
+    """ Looks through the effect slots of a mixer track for a Komplete Kontrol instance.
+
+    ### Returns
+     - str: The `NIKBxx` name of the first automation parameter of the first instance found, or `""` if there's none.
+    """
+    import plugins
+
+    for slot in range(SLOTS):
+        if plugins.isValid(track, slot):
+            name = plugins.getParamName(0, track, slot)
+            if name.startswith(PREFIX):
+                return name
+
+    return ""
+
+###########################################################################################################################################
+# Instance finder
+###########################################################################################################################################
+
+class InstanceFinder:
+    """ Keeps the Komplete Kontrol instance found on each mixer track and reports the one of the selected track to the device.
+
+    A track is only looked through the first time it's needed and after the script marks it as dirty with `markDirty()`, and even then
+    not until it's needed again. The KOMPLETE_INSTANCE message is only sent when the instance of the selected track is a different one.
+
+    ### Arguments
+     - scan: Function that takes a mixer track and returns the `NIKBxx` ID of its instance or `""`. Defaults to `scanTrack()`.
+    """
+
+    def __init__(self, scan = scanTrack):
+        self._scan = scan
+
+        self._ids = {}
+        self._selected = None
+        self._reported = None
+
+        # The device forgets the instance it was told about along with everything else it was showing
+        mixer.addInvalidateHandler(self.reset)
+
+    def resolve(self, track: int) -> str:
+        """ Returns the `NIKBxx` ID of the instance on a mixer track, or `""` if there's none. Only looks through the track if it
+        wasn't already or if it was marked as dirty since then. """
+        instanceID = self._ids.get(track)
+
+        if instanceID is None:
+            instanceID = self._ids[track] = self._scan(track)
+
+        return instanceID
+
+    def markDirty(self, track: int = -1):
+        """ Marks a mixer track, or all of them, as dirty, so it's looked through again the next time it's needed. Intended to be called
+        from the OnDirtyMixerTrack() event of the script, which gives -1 when every track has changed.
+        """
+        if track is None or track < 0:
+            self._ids.clear()
+        else:
+            self._ids.pop(track, None)
+
+    def refresh(self) -> bool:
+        """ Looks through the selected track again if it was marked as dirty and reports its instance if it changed or if the device forgot
+        it. Intended to be called from the OnRefresh() event of the script, after FL Studio has reported the dirty tracks.
+
+        ### Returns
+         - bool: True if the KOMPLETE_INSTANCE message was sent.
+        """
+        if self._selected is None:
+            return False
+
+        # Nothing to look through, but the device still has to be told about the instance again after a reset
+        if self._selected in self._ids and self._reported is not None:
+            return False
+
+        return self._report(self.resolve(self._selected))
+
+    def select(self, track: int) -> bool:
+        """ Reports the instance of a newly selected mixer track to the device.
+
+        ### Returns
+         - bool: True if the KOMPLETE_INSTANCE message was sent.
+        """
+        self._selected = track
+        return self._report(self.resolve(track))
+
+    def reset(self):
+        """ Forgets which instance the device was told about, so it's reported again on the next selection or refresh. Called by
+        `nihia.mixer.invalidateState()`. """
+        self._reported = None
+
+    def _report(self, instanceID: str) -> bool:
+        if instanceID == self._reported:
+            return False
+
+        mixer.setKompleteInstance(instanceID)
+        self._reported = instanceID
+
+        return True
@@ -0,0 +1,161 @@
+# MIT License
+
+# Copyright (c) 2024 Pablo Peral
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Submodule of flmidi-nihia that turns the raw peak values of the mixer tracks into peak meter updates for the device, only sending them
+when the meters being displayed actually move.
+"""
+
+import time
+
+from nihia import mixer
+
+###########################################################################################################################################
+# Dictionaries and constants
+###########################################################################################################################################
+
+# Peak value given by FL Studio's mixer.getTrackPeaks() that fills the whole meter on the screen
+# Anything greater is shown as a full meter
+MAX_PEAK = 1.1
+
+# Number of steps the 0 to MAX_PEAK range is divided into before being looked up on the table
+_RESOLUTION = 1024
+_SCALE = _RESOLUTION / MAX_PEAK
+
+# Lookup table that goes from the step of a peak value to the 0-127 value the device expects
+_PEAK_TABLE = bytes(round(step * 127 / _RESOLUTION) for step in range(_RESOLUTION + 1))
+
+# Number of values of a peak meter message: left and right channels of the 8 tracks being displayed
+CHANNELS = 16
+
+# Seconds the time between two updates can fall short of minInterval and still count as reaching it
+# Peaks fed at exactly the rate of minInterval would otherwise get every other update dropped by floating point rounding
+_TOLERANCE = 1e-6
+
+def quantise(peaks) -> bytes:
+    """ Scales and clamps a whole set of raw peak values to the 0-127 range of the device in a single pass.
+
+    ### Arguments
+     - peaks: Iterable of peak values as given by FL Studio's `mixer.getTrackPeaks()`, like ``[peakL_0, peakR_0, peakL_1, peakR_1 ...]``.
+
+    ### Returns
+     - bytes: The 0-127 values in the same order.
+    """
+    table = _PEAK_TABLE
+    return bytes([table[0 if peak <= 0 else _RESOLUTION if peak >= MAX_PEAK else int(peak * _SCALE)] for peak in peaks])
+
+###########################################################################################################################################
+# Meter engine
+###########################################################################################################################################
+
+class MeterEngine:
+    """ Keeps the peak meters of the 8 tracks being displayed on the device. Each call to `update()` takes the raw peaks of the tracks,
+    applies the peak hold and falloff and sends the PEAK message only when it's worth it.
+
+    ### Arguments
+     - threshold (int): Minimum change of any of the 0-127 values for the meters to be sent again.
+     - holdTime (float): Seconds a peak stays on the meter before it starts falling.
+     - falloff (float): Speed the meters fall at after the hold time, in 0-127 units per second. 0 disables the peak hold altogether.
+     - minInterval (float): Minimum seconds between two messages, to decimate updates coming faster than the device needs them.
+     - maxInterval (float): Maximum seconds without sending the meters, even if they didn't change.
+    """
+
+    def __init__(self, threshold: int = 2, holdTime: float = 0.5, falloff: float = 120.0, minInterval: float = 1 / 30, maxInterval: float = 1.0):
+        self.threshold = threshold
+        self.holdTime = holdTime
+        self.falloff = falloff
+        self.minInterval = minInterval
+        self.maxInterval = maxInterval
+
+        self._held = [0.0] * CHANNELS
+        self._holdUntil = [0.0] * CHANNELS
+        self._lastSent = None
+        self._lastSentTime = 0.0
+        self._lastUpdate = None
+
+        # The device stops showing the meters along with everything else it was showing
+        mixer.addInvalidateHandler(self.reset)
+
+    def reset(self):
+        """ Forgets the held peaks and what was last sent, so the next update gets sent no matter what. """
+        self._held = [0.0] * CHANNELS
+        self._holdUntil = [0.0] * CHANNELS
+        self._lastSent = None
+        self._lastUpdate = None
+
+    def update(self, peaks, now: float = None) -> bool:
+        """ Feeds the engine with the current peaks of the tracks and sends them to the device if needed.
+
+        ### Arguments
+         - peaks: 16 raw peak values as given by FL Studio's `mixer.getTrackPeaks()`, like ``[peakL_0, peakR_0, peakL_1, peakR_1 ...]``.
+         - now (float): Current time in seconds. Defaults to `time.perf_counter()`.
+
+        ### Returns
+         - bool: True if the meters were sent to the device.
+        """
+        if now is None:
+            now = time.perf_counter()
+
+        values = self._applyHold(quantise(peaks), now)
+
+        lastSent = self._lastSent
+        if lastSent is not None:
+            elapsed = now - self._lastSentTime
+
+            if elapsed < self.minInterval - _TOLERANCE:
+                return False
+
+            if elapsed < self.maxInterval:
+                threshold = self.threshold
+                if all(abs(new - old) < threshold for new, old in zip(values, lastSent)):
+                    return False
+
+        mixer.sendPeakMeterData(values)
+        self._lastSent = values
+        self._lastSentTime = now
+
+        return True
+
+    def _applyHold(self, values: bytes, now: float) -> bytes:
+        """ Applies the peak hold and the falloff to a set of quantised peaks. """
+        if self.falloff <= 0:
+            return values
+
+        lastUpdate = self._lastUpdate
+        self._lastUpdate = now
+
+        held = self._held
+        holdUntil = self._holdUntil
+        holdTime = self.holdTime
+        falloff = self.falloff
+
+        for channel, value in enumerate(values):
+            if value >= held[channel]:
+                held[channel] = value
+                holdUntil[channel] = now + holdTime
+
+            elif lastUpdate is not None and now >= holdUntil[channel]:
+                # Only falls for the time since the last update that was past the hold
+                fallingSince = max(lastUpdate, holdUntil[channel])
+                held[channel] = max(value, held[channel] - (now - fallingSince) * falloff)
+
+        return bytes([int(value) for value in held])
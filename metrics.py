@@ -0,0 +1,264 @@
+# MIT License
+
+# Copyright (c) 2024 Pablo Peral
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Submodule of flmidi-nihia that measures how much the layer sends and how long it takes, to find out how much of FL Studio's UI thread
+and of the MIDI bandwidth it's using.
+
+Nothing is measured until `enable()` is called: it swaps the senders of the layer for measured versions of them, and `disable()` puts the
+originals back, so there's no cost at all while disabled. Functions imported by name (``from nihia.mixer import setTrackName``) before
+enabling the metrics aren't measured.
+"""
+
+import functools
+import time
+
+import nihia
+
+###########################################################################################################################################
+# Dictionaries and constants
+###########################################################################################################################################
+
+# Names the messages are counted under
+# SysEx messages are named after their info type and "BF XX XX" messages after their DATA1 byte, looked up on mixerinfo_types first
+# and on button_list after
+def _buildNames():
+    from nihia import buttons, mixer
+
+    sysexNames = ["SYSEX_%d" % typeID for typeID in range(128)]
+    for name, typeID in mixer.mixerinfo_types.items():
+        sysexNames[typeID] = name
+
+    ccNames = ["CC_%d" % data1 for data1 in range(128)]
+    for name, data1 in buttons.button_list.items():
+        if ccNames[data1].startswith("CC_"):
+            ccNames[data1] = name
+
+    for name in ("MUTE_SELECTED", "SOLO_SELECTED", "SELECTED_AVAILABLE", "SELECTED_MUTE_BY_SOLO"):
+        ccNames[mixer.mixerinfo_types[name]] = name
+
+    for trackID in range(8):
+        ccNames[mixer.mixerinfo_types["VOLUME_GRAPH"] + trackID] = "VOLUME_GRAPH"
+        ccNames[mixer.mixerinfo_types["PAN_GRAPH"] + trackID] = "PAN_GRAPH"
+
+    ccNames[1] = "HANDSHAKE"
+    ccNames[2] = "GOODBYE"
+
+    return tuple(sysexNames), tuple(ccNames)
+
+_HEADER_LENGTH = len(nihia.SYSEX_HEADER)
+
+###########################################################################################################################################
+# Metrics state
+###########################################################################################################################################
+
+_enabled = False
+
+# Original functions replaced by measured versions while enabled, as (module, name, function)
+_originals = []
+
+# Messages and bytes written to the device, by name
+_messages = {}
+_bytes = {}
+
+# Latency histograms of each measured function: the number of calls that took between 2^(n-1) and 2^n nanoseconds on position n
+_histograms = {}
+_totals = {}
+
+_sysexNames = ()
+_ccNames = ()
+
+###########################################################################################################################################
+# Methods and functions
+###########################################################################################################################################
+
+def enable():
+    """ Starts measuring every sender of `nihia`, `nihia.mixer` and `nihia.buttons`, and dumps a summary when `nihia.goodBye()` is called. """
+    global _enabled, _sysexNames, _ccNames
+
+    if _enabled:
+        return
+
+    from nihia import buttons, mixer
+
+    _sysexNames, _ccNames = _buildNames()
+
+    # Messages are counted when they are written to the device, after the scheduler or the connection have merged or dropped them
+    _replace(nihia, "dataOut", lambda original: _timed("nihia.dataOut", _countingDataOut(original)))
+    _replace(nihia, "sysexOut", lambda original: _timed("nihia.sysexOut", _countingSysexOut(original)))
+    _replace(nihia, "framesOut", functools.partial(_timed, "nihia.framesOut"))
+    _replace(nihia, "writeFrames", lambda original: _timed("nihia.writeFrames", _countingWriteFrames(original)))
+    _replace(nihia, "goodBye", _dumpingGoodBye)
+
+    for module in (mixer, buttons):
+        for name in dir(module):
+            if name.startswith(("set", "send")) and callable(getattr(module, name)):
+                _replace(module, name, functools.partial(_timed, module.__name__.rsplit(".", 1)[-1] + "." + name))
+
+    _enabled = True
+
+def disable():
+    """ Stops measuring and puts the original senders back. The numbers gathered so far are kept until `reset()`. """
+    global _enabled
+
+    for module, name, function in reversed(_originals):
+        setattr(module, name, function)
+    _originals.clear()
+
+    _enabled = False
+
+def isEnabled() -> bool:
+    """ Returns True if the layer is being measured. """
+    return _enabled
+
+def reset():
+    """ Forgets every number gathered so far. """
+    _messages.clear()
+    _bytes.clear()
+
+    # The measured functions keep their histograms, so they are emptied in place
+    for name, histogram in _histograms.items():
+        histogram[:] = [0] * 64
+        _totals[name] = 0
+
+def summary() -> dict:
+    """ Returns every number gathered so far.
+
+    ### Returns
+     - dict: With these keys:
+        - messages, bytes: Dictionaries that go from the name of a kind of message to how many of them were written to the device and how
+          many bytes they took. Messages held or merged by the output scheduler or the connection only count once they are written.
+        - latency: Dictionary that goes from the name of each measured function to the number of `calls`, the `total_ns` spent on them, the
+          `mean_ns` and an estimation of the `p50_ns` and `p99_ns` percentiles taken from the histogram, which are upper bounds.
+    """
+    latency = {}
+    for name, histogram in _histograms.items():
+        calls = sum(histogram)
+        if not calls:
+            continue
+
+        latency[name] = {
+            "calls": calls,
+            "total_ns": _totals[name],
+            "mean_ns": _totals[name] / calls,
+            "p50_ns": _percentile(histogram, calls, 0.5),
+            "p99_ns": _percentile(histogram, calls, 0.99),
+        }
+
+    return {"messages": dict(_messages), "bytes": dict(_bytes), "latency": latency}
+
+def dump(file = None):
+    """ Prints a summary of every number gathered so far, to FL Studio's script output by default.
+
+    ### Arguments
+     - file: File object to write the summary to instead.
+    """
+    data = summary()
+
+    lines = ["nihia metrics", "-------------", "%-24s %10s %10s" % ("message", "count", "bytes")]
+    for name in sorted(data["messages"], key=data["bytes"].get, reverse=True):
+        lines.append("%-24s %10d %10d" % (name, data["messages"][name], data["bytes"][name]))
+    lines.append("%-24s %10d %10d" % ("TOTAL", sum(data["messages"].values()), sum(data["bytes"].values())))
+
+    lines.append("")
+    lines.append("%-32s %8s %10s %10s %10s" % ("function", "calls", "mean us", "p50 us", "p99 us"))
+    for name in sorted(data["latency"], key=lambda name: data["latency"][name]["total_ns"], reverse=True):
+        entry = data["latency"][name]
+        lines.append("%-32s %8d %10.1f %10.1f %10.1f" % (name, entry["calls"], entry["mean_ns"] / 1000, entry["p50_ns"] / 1000, entry["p99_ns"] / 1000))
+
+    print("\n".join(lines), file=file)
+
+###########################################################################################################################################
+# Measured versions of the senders
+###########################################################################################################################################
+
+def _replace(module, name: str, wrap):
+    original = getattr(module, name)
+    _originals.append((module, name, original))
+    setattr(module, name, wrap(original))
+
+def _timed(name: str, function):
+    histogram = _histograms.setdefault(name, [0] * 64)
+    _totals.setdefault(name, 0)
+    clock = time.perf_counter_ns
+
+    @functools.wraps(function)
+    def timed(*args, **kwargs):
+        start = clock()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            elapsed = clock() - start
+            histogram[min(elapsed.bit_length(), 63)] += 1
+            _totals[name] += elapsed
+
+    return timed
+
+def _count(frame: bytes):
+    if frame[0] == 240:
+        name = _sysexNames[frame[_HEADER_LENGTH] & 127] if len(frame) > _HEADER_LENGTH else "SYSEX"
+    else:
+        name = _ccNames[frame[1] & 127]
+
+    _messages[name] = _messages.get(name, 0) + 1
+    _bytes[name] = _bytes.get(name, 0) + len(frame)
+
+# Messages given to a sink aren't counted here, as they reach the device later through writeFrames() or not at all
+def _countingDataOut(original):
+    def dataOut(data1, data2):
+        if nihia._sink is None:
+            name = _ccNames[data1 & 127]
+            _messages[name] = _messages.get(name, 0) + 1
+            _bytes[name] = _bytes.get(name, 0) + 3
+        return original(data1, data2)
+    return dataOut
+
+def _countingSysexOut(original):
+    def sysexOut(msg):
+        if nihia._sink is None:
+            _count(msg)
+        return original(msg)
+    return sysexOut
+
+def _countingWriteFrames(original):
+    def writeFrames(frames):
+        for frame in frames:
+            _count(frame)
+        return original(frames)
+    return writeFrames
+
+def _dumpingGoodBye(original):
+    @functools.wraps(original)
+    def goodBye():
+        result = original()
+        dump()
+        return result
+    return goodBye
+
+def _percentile(histogram: list, calls: int, fraction: float) -> int:
+    target = calls * fraction
+    seen = 0
+    for bucket, count in enumerate(histogram):
+        seen += count
+        if seen >= target:
+            return 1 << bucket
+    return 1 << 63
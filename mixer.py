@@ -24,9 +24,11 @@
 Submodule of flmidi-nihia for mixer manipulation of Komplete Kontrol keyboards.
 """
 
+import types
+import weakref
+
 import nihia
-import device
-import math
+from nihia import names, surface
 
 ###########################################################################################################################################
 # Dictionaries and constants
@@ -124,6 +126,169 @@ track_types = {
     "MASTER": 6
 }
 
+# Bit of each kind of information on the capability bitmask of the device
+_BITS = {info_type: 1 << type_id for info_type, type_id in mixerinfo_types.items()}
+
+# Bitmask with every kind of information
+ALL_TYPES = (1 << 128) - 1
+
+# Kinds of information the device makes use of, set by nihia.profiles.setProfile()
+# Messages the device can't make use of are dropped before being built
+_mask = ALL_TYPES
+
+###########################################################################################################################################
+# Device state mirror
+###########################################################################################################################################
+
+# Scripts usually refresh all the tracks being displayed on every OnRefresh/OnIdle call of FL Studio, even if nothing has changed since the
+# last time. When the state mirror is enabled, the last value sent for each (info type, track slot) pair is kept here and any further attempt of
+# sending the same value again is silently dropped, as the device is already showing it.
+# The mirror is opt-in and it's disabled by default, since it assumes that nothing else is talking to the device behind the back of the layer.
+# The only exception are the positions of the volume and pan arrows, which are always kept.
+_stateCacheEnabled = False
+
+# What the 8 tracks being displayed are showing, as far as the layer knows
+_surface = surface.SurfaceState()
+
+# Last value sent for the information about the selected track, which doesn't belong to any of the 8 slots
+_selectedCache = {}
+
+# Part of the numeric array of the surface holding the positions of the arrows, which are always kept
+_VOLUME_GRAPH_INDEX = surface.NUMERIC_FIELDS.index("VOLUME_GRAPH") * surface.SLOTS
+_PAN_GRAPH_INDEX = surface.NUMERIC_FIELDS.index("PAN_GRAPH") * surface.SLOTS
+_GRAPHS = slice(min(_VOLUME_GRAPH_INDEX, _PAN_GRAPH_INDEX), max(_VOLUME_GRAPH_INDEX, _PAN_GRAPH_INDEX) + surface.SLOTS)
+
+# Functions called by `invalidateState()`, so every cache of what the device is showing gets cleared at once. Bound methods are kept through
+# weak references, so registering one doesn't keep its object alive
+_invalidateHandlers = []
+
+def enableStateCache(enabled: bool = True):
+    """ Enables or disables the device state mirror. While enabled, mixer updates whose value is already being shown by the device are not sent.
+    Changing the setting always clears the mirror.
+
+    ### Arguments
+     - enabled (bool): `True` to start dropping repeated updates, `False` to send every update as before.
+    """
+    global _stateCacheEnabled
+
+    _stateCacheEnabled = enabled
+    invalidateState()
+
+def invalidateState():
+    """ Forgets every value stored in the device state mirror, as well as the last position of the volume and pan arrows, so the next update
+    of each track gets sent no matter what.
+    Call it after `nihia.handShake()` or after the device has been reconnected, as the device won't be showing anything anymore.
+    Functions registered with `addInvalidateHandler()` are called too.
+    """
+    _surface.clear()
+    _selectedCache.clear()
+
+    for reference in list(_invalidateHandlers):
+        handler = reference()
+        if handler is None:
+            _invalidateHandlers.remove(reference)
+        else:
+            handler()
+
+def addInvalidateHandler(handler):
+    """ Registers a function to be called with no arguments every time `invalidateState()` is called, like the `reset` method of other
+    caches of what the device is showing. Bound methods are only weakly referenced, and they're unregistered once their object is gone. """
+    if isinstance(handler, types.MethodType):
+        _invalidateHandlers.append(weakref.WeakMethod(handler))
+    else:
+        _invalidateHandlers.append(lambda: handler)
+
+def removeInvalidateHandler(handler):
+    """ Unregisters a function previously registered with `addInvalidateHandler`. """
+    for reference in _invalidateHandlers:
+        if reference() == handler:
+            _invalidateHandlers.remove(reference)
+            return
+
+    raise ValueError("Handler not registered")
+
+def _forgetGraphs():
+    """ Forgets the positions of the volume and pan arrows, so they get sent again even if they didn't move. """
+    _surface.numbers[_GRAPHS] = bytes([surface.UNKNOWN]) * (_GRAPHS.stop - _GRAPHS.start)
+
+def getSurfaceState() -> surface.SurfaceState:
+    """ Returns a copy of what the 8 tracks being displayed are showing, as far as the device state mirror knows. Without the mirror enabled,
+    only the positions of the arrows are known.
+    """
+    return _surface.snapshot()
+
+def applySurfaceState(state: surface.SurfaceState) -> int:
+    """ Makes the device show a whole surface state, sending in one batch only the fields that differ from what it's already showing.
+
+    ### Arguments
+     - state (SurfaceState): State to show, usually a copy from `getSurfaceState()` with some fields changed. Unknown fields are left untouched.
+
+    ### Returns
+     - int: Number of messages sent.
+    """
+    frames = state.render(state.diff(_surface), _mask)
+
+    # Fields unknown on the state don't make the mirror forget what the device is showing
+    if _stateCacheEnabled:
+        _surface.merge(state)
+    else:
+        numbers = _surface.numbers
+        for index in range(_GRAPHS.start, _GRAPHS.stop):
+            if state.numbers[index] != surface.UNKNOWN:
+                numbers[index] = state.numbers[index]
+
+    if frames:
+        nihia.framesOut(frames)
+
+    return len(frames)
+
+def _isCached(info_type: str, trackID: int, value) -> bool:
+    """ Checks the device state mirror for a given update and records it as the last value sent if it wasn't there already.
+    The information about the selected track is given with None as the trackID.
+
+    ### Returns
+     - bool: `True` if the device is already showing that value and the update can be dropped.
+    """
+    if not _stateCacheEnabled:
+        return False
+
+    if trackID is not None:
+        return not _surface.set(info_type, trackID, value)
+
+    # The type is also checked so a cached int doesn't match a string or the other way around
+    cached = _selectedCache.get(info_type)
+    if cached is not None and type(cached) is type(value) and cached == value:
+        return True
+
+    _selectedCache[info_type] = value
+    return False
+
+###########################################################################################################################################
+# SysEx message builder
+###########################################################################################################################################
+
+# Every SysEx message for the mixer has the same structure: SYSEX_HEADER + [info type, value, trackID] + payload + [247]
+# The part that never changes for a given info type (the header plus the info type byte) is precomputed here as a bytes object, so building a message
+# only takes a single bytes formatting operation instead of concatenating and converting several lists
+_FRAME_PREFIXES = {info_type: bytes(nihia.SYSEX_HEADER + [type_id]) for info_type, type_id in mixerinfo_types.items()}
+
+def buildTrackInfo(info_type: str, value: int, trackID: int, payload: bytes or str = b"") -> bytes:
+    """ Builds the SysEx message used to report a certain kind of information about a mixer track, ready to be given to `nihia.sysexOut`.
+
+    ### Arguments
+     - info_type (str): Kind of information being reported, as defined on `mixerinfo_types`.
+     - value (int): Value byte of the message. For text messages, it's always 0.
+     - trackID (int): From 0 to 7, the number of the track being represented on the display.
+     - payload (bytes or str): Additional data appended after the track number. Strings get encoded to UTF-8 on the fly.
+
+    ### Returns
+     - bytes: The full SysEx message.
+    """
+    if payload.__class__ is str:
+        payload = payload.encode("UTF-8")
+
+    return b"%b%c%c%b\xf7" % (_FRAME_PREFIXES[info_type], value, trackID, payload)
+
 # Methods for reporting information about the mixer tracks, which is done through SysEx
 def setTrackExist(trackID: int, value: int or str):
     """ Method to report existence of a track and update its type as well.
@@ -136,24 +301,34 @@ def setTrackExist(trackID: int, value: int or str):
     if value == str:
         value = track_types.get(track_types)
 
-    # Conforms the kind of message midiOutSysex is waiting for
-    msg = nihia.SYSEX_HEADER + [mixerinfo_types.get("EXIST"), value, trackID] + [247]
+    # Skips the update if the device can't make use of it
+    if not _mask & _BITS["EXIST"]:
+        return
+
+    # Skips the update if the device is already showing it
+    if _isCached("EXIST", trackID, value):
+        return
 
-    # Warps the data and sends it to the device
-    device.midiOutSysex(bytes(msg))
+    # Builds the message and sends it to the device
+    nihia.sysexOut(buildTrackInfo("EXIST", value, trackID))
 
 def setTrackName(trackID: int, name: str):
     """ Method to update the name of a track being displayed on the device.
 
     ### Arguments
     - trackID (int): From 0 to 7, the number of the track being represented on the display.
-    - name (str): Name of the track.
+    - name (str): Name of the track. It's trimmed and encoded as set on `nihia.names`.
     """
-    # Conforms the kind of message midiOutSysex is waiting for
-    msg = nihia.SYSEX_HEADER + [mixerinfo_types.get("NAME"), 0, trackID] + Str2Bytes(name) + [247]
+    # Skips the update if the device can't make use of it
+    if not _mask & _BITS["NAME"]:
+        return
 
-    # Warps the data and sends it to the device
-    device.midiOutSysex(bytes(msg))
+    # Skips the update if the device is already showing it
+    if _isCached("NAME", trackID, name):
+        return
+
+    # Builds the message and sends it to the device
+    nihia.sysexOut(buildTrackInfo("NAME", 0, trackID, names.encodeName(name)))
 
 def setTrackPan(trackID: int, value: str):
     """ Method to update the pan string of a track being displayed on the device.
@@ -162,11 +337,16 @@ def setTrackPan(trackID: int, value: str):
     - trackID (int): From 0 to 7, the number of the track being represented on the display.
     - value (str): String to show on the display as the pan of the track.
     """
-    # Conforms the kind of message midiOutSysex is waiting for
-    msg = nihia.SYSEX_HEADER + [mixerinfo_types.get("PAN"), 0, trackID] + Str2Bytes(value) + [247]
+    # Skips the update if the device can't make use of it
+    if not _mask & _BITS["PAN"]:
+        return
+
+    # Skips the update if the device is already showing it
+    if _isCached("PAN", trackID, value):
+        return
 
-    # Warps the data and sends it to the device
-    device.midiOutSysex(bytes(msg))
+    # Builds the message and sends it to the device
+    nihia.sysexOut(buildTrackInfo("PAN", 0, trackID, value))
 
 def setTrackVol(trackID: int, value: str):
     """ Method to update the volume string of a track being displayed on the device.
@@ -175,11 +355,16 @@ def setTrackVol(trackID: int, value: str):
     - trackID (int): From 0 to 7, the number of the track being represented on the display.
     - value (str): String to show on the display as the volume of the track.
     """
-    # Conforms the kind of message midiOutSysex is waiting for
-    msg = nihia.SYSEX_HEADER + [mixerinfo_types.get("VOLUME"), 0, trackID] + Str2Bytes(value) + [247]
+    # Skips the update if the device can't make use of it
+    if not _mask & _BITS["VOLUME"]:
+        return
+
+    # Skips the update if the device is already showing it
+    if _isCached("VOLUME", trackID, value):
+        return
 
-    # Warps the data and sends it to the device
-    device.midiOutSysex(bytes(msg))
+    # Builds the message and sends it to the device
+    nihia.sysexOut(buildTrackInfo("VOLUME", 0, trackID, value))
 
 def setTrackArm(trackID: int, value: bool):
     """ Method to report the arm for recording state state of a track.
@@ -188,11 +373,16 @@ def setTrackArm(trackID: int, value: bool):
     - trackID (int): From 0 to 7, the number of the track being represented on the display.
     - value (Bool): Selection status.
     """
-    # Conforms the kind of message midiOutSysex is waiting for
-    msg = nihia.SYSEX_HEADER + [mixerinfo_types.get("IS_ARMED"), value, trackID] + [247]
+    # Skips the update if the device can't make use of it
+    if not _mask & _BITS["IS_ARMED"]:
+        return
 
-    # Warps the data and sends it to the device
-    device.midiOutSysex(bytes(msg))
+    # Skips the update if the device is already showing it
+    if _isCached("IS_ARMED", trackID, value):
+        return
+
+    # Builds the message and sends it to the device
+    nihia.sysexOut(buildTrackInfo("IS_ARMED", value, trackID))
 
 def setTrackSel(trackID: int, value: bool):
     """ Method to report selection state of a track.
@@ -201,11 +391,16 @@ def setTrackSel(trackID: int, value: bool):
     - trackID (int): From 0 to 7, the number of the track being represented on the display.
     - value (bool): Selection status.
     """
-    # Conforms the kind of message midiOutSysex is waiting for
-    msg = nihia.SYSEX_HEADER + [mixerinfo_types.get("SELECTED"), value, trackID] + [247]
+    # Skips the update if the device can't make use of it
+    if not _mask & _BITS["SELECTED"]:
+        return
+
+    # Skips the update if the device is already showing it
+    if _isCached("SELECTED", trackID, value):
+        return
 
-    # Warps the data and sends it to the device
-    device.midiOutSysex(bytes(msg))
+    # Builds the message and sends it to the device
+    nihia.sysexOut(buildTrackInfo("SELECTED", value, trackID))
 
 def setTrackSolo(trackID:int, value: bool):
     """ Method to report solo state of a track.
@@ -214,11 +409,16 @@ def setTrackSolo(trackID:int, value: bool):
     - trackID (int): From 0 to 7, the number of the track being represented on the display.
     - value (bool): Solo status.
     """
-    # Conforms the kind of message midiOutSysex is waiting for
-    msg = nihia.SYSEX_HEADER + [mixerinfo_types.get("IS_SOLO"), value, trackID] + [247]
+    # Skips the update if the device can't make use of it
+    if not _mask & _BITS["IS_SOLO"]:
+        return
 
-    # Warps the data and sends it to the device
-    device.midiOutSysex(bytes(msg))
+    # Skips the update if the device is already showing it
+    if _isCached("IS_SOLO", trackID, value):
+        return
+
+    # Builds the message and sends it to the device
+    nihia.sysexOut(buildTrackInfo("IS_SOLO", value, trackID))
 
 def setTrackMute(trackID:int, value: bool):
     """ Method to report mute state of a track.
@@ -227,11 +427,16 @@ def setTrackMute(trackID:int, value: bool):
     - trackID (int): From 0 to 7, the number of the track being represented on the display.
     - value (bool): Mute status.
     """
-    # Conforms the kind of message midiOutSysex is waiting for
-    msg = nihia.SYSEX_HEADER + [mixerinfo_types.get("IS_MUTE"), value, trackID] + [247]
+    # Skips the update if the device can't make use of it
+    if not _mask & _BITS["IS_MUTE"]:
+        return
+
+    # Skips the update if the device is already showing it
+    if _isCached("IS_MUTE", trackID, value):
+        return
 
-    # Warps the data and sends it to the device
-    device.midiOutSysex(bytes(msg))
+    # Builds the message and sends it to the device
+    nihia.sysexOut(buildTrackInfo("IS_MUTE", value, trackID))
 
 def setTrackMutedBySolo(trackID:int, value: bool):
     """ Method to report mute by solo state of a track.
@@ -240,11 +445,16 @@ def setTrackMutedBySolo(trackID:int, value: bool):
     - trackID (int): From 0 to 7, the number of the track being represented on the display.
     - value (bool): Mute by solo status.
     """
-    # Conforms the kind of message midiOutSysex is waiting for
-    msg = nihia.SYSEX_HEADER + [mixerinfo_types.get("MUTED_BY_SOLO"), value, trackID] + [247]
+    # Skips the update if the device can't make use of it
+    if not _mask & _BITS["MUTED_BY_SOLO"]:
+        return
 
-    # Warps the data and sends it to the device
-    device.midiOutSysex(bytes(msg))
+    # Skips the update if the device is already showing it
+    if _isCached("MUTED_BY_SOLO", trackID, value):
+        return
+
+    # Builds the message and sends it to the device
+    nihia.sysexOut(buildTrackInfo("MUTED_BY_SOLO", value, trackID))
 
 def setKompleteInstance(instanceID: str):
     """ Method to report the currently selected Komplete Kontrol instance.
@@ -254,69 +464,234 @@ def setKompleteInstance(instanceID: str):
       If it's left to nothing (`""`), the Komplete Kontrol integration will be disabled for that track.
     """
 
-    msg = nihia.SYSEX_HEADER + [mixerinfo_types.get("KOMPLETE_INSTANCE"), 0, 0] + Str2Bytes(instanceID) + [247]
+    # Skips the update if the device can't make use of it
+    if not _mask & _BITS["KOMPLETE_INSTANCE"]:
+        return
+
+    # Skips the update if the device is already showing it
+    if _isCached("KOMPLETE_INSTANCE", 0, instanceID):
+        return
 
-    device.midiOutSysex(bytes(msg))
+    nihia.sysexOut(buildTrackInfo("KOMPLETE_INSTANCE", 0, 0, instanceID))
 
 def sendPeakMeterData(peakValues: list):
     """ Send peak meter data to be displayed on the device.
 
     ### Arguments
-     - peakValues (list): A list of 16 integer values representing peak values for each track and stereo channel like ``[peakL_0, peakR_0, peakL_1, peakR_1 ...]``
+     - peakValues (list or bytes): A list of 16 integer values representing peak values for each track and stereo channel like ``[peakL_0, peakR_0, peakL_1, peakR_1 ...]``
      in a range of 0 to 127. To convert values coming from FL Studio's ``mixer.getTrackPeaks()`` function, the recommended range is 0 to 1.1 so that any value
-     greater than 1.1 should be set to 1.1 anyway.
+     greater than 1.1 should be set to 1.1 anyway. `nihia.meters` can do the conversion and decide when the meters are worth sending.
     """
 
-    # Conforms the kind of message midiOutSysex is waiting for
-    msg = [240, 0, 33, 9, 0, 0, 68, 67, 1, 0, mixerinfo_types.get("PEAK"), 2, 0] + peakValues + [247]
+    # Skips the update if the device can't make use of it
+    if not _mask & _BITS["PEAK"]:
+        return
 
-    # Warps the data and sends it to the device
-    device.midiOutSysex(bytes(msg))
+    # Builds the message and sends it to the device
+    nihia.sysexOut(buildTrackInfo("PEAK", 2, 0, bytes(peakValues)))
 
 # Methods for changing the locations of the pan and volume arrows on the screen of S-Series devices to graphically show where the pan and volume faders are
+# Fader automation makes scripts call these for every track on every tick, so the last position sent for each arrow is always kept on the
+# surface state and only actual movements of the arrows get sent
+_VOLUME_GRAPH = mixerinfo_types["VOLUME_GRAPH"]
+_PAN_GRAPH = mixerinfo_types["PAN_GRAPH"]
+
 def setTrackVolGraph(trackID: int, location: float):
     """ Method for changing the location of the volume arrow of a track on the screen of S-Series MK2 devices to graphically show where the volume fader is.
+    Nothing is sent if the arrow is already there.
     ### Arguments
      - trackID: From 0 to 7, the track whose the graph you want to update belongs to.
      - location: Can be filled using `mixer.getTrackVolume()`, expecting a `0 <= x <= 1` range.
     """
+    # Skips the update if the device can't make use of it
+    if not _mask & _BITS["VOLUME_GRAPH"]:
+        return
+
     # Gets the right data1 value to update the volume graph
-    graphValue = mixerinfo_types.get("VOLUME_GRAPH")
+    data1 = _VOLUME_GRAPH + trackID
     
     # Translates the 0-1 range given by FL Studio to 0-127 range
-    location = location * 127
-    
-    # Truncates the possible decimals and declares the number as an integer to avoid errors in the translation of the data
-    location = int(math.trunc(location))
+    location = _volGraphPosition(location)
+
+    # Skips the update if the arrow is already there
+    index = _VOLUME_GRAPH_INDEX + trackID
+    if _surface.numbers[index] == location:
+        return
+    _surface.numbers[index] = location
 
     # Reports the change of the desired graph to the device
-    nihia.dataOut(graphValue + trackID, location)
+    nihia.dataOut(data1, location)
 
 def setTrackPanGraph(trackID: int, location: float):
     """ Method for changing the location of the pan arrow of a track on the screen of S-Series MK2 devices to graphically show where the pan fader is.
+    Nothing is sent if the arrow is already there.
     ### Arguments
      - trackID: From 0 to 7, the track whose the graph you want to update belongs to.
      - location: Can be filled using `mixer.getTrackPan()`, expecting a `-1 <= x <= 1` range.
     """
+    # Skips the update if the device can't make use of it
+    if not _mask & _BITS["PAN_GRAPH"]:
+        return
+
     # Gets the right data1 value to update the pan graph
-    graphValue = mixerinfo_types.get("PAN_GRAPH")
+    data1 = _PAN_GRAPH + trackID
     
     # Translates the -1 to 1 range from FL Studio to 0-127 range
-    if location < 0:  # If the pan is negative, for hence is set to the left
-        location = abs(location)    # Gets the absolute value of the location
-        location = 64 - location * 64
-    
-    elif location == 0: # If the pan is 0, for hence is set to the center
-        location = 64
-    
-    elif location > 0:  # If the pan is positive, for hence is set to the right
-        location = 64 + location * 63
-    
-    # Truncates the possible decimals and declares the number as an integer to avoid errors in the translation of the data
-    location = int(math.trunc(location))
+    location = _panGraphPosition(location)
+
+    # Skips the update if the arrow is already there
+    index = _PAN_GRAPH_INDEX + trackID
+    if _surface.numbers[index] == location:
+        return
+    _surface.numbers[index] = location
 
     # Reports the change of the desired graph to the device
-    nihia.dataOut(graphValue + trackID, location)
+    nihia.dataOut(data1, location)
+
+def setTrackVolGraphs(locations) -> int:
+    """ Updates the volume arrows of several tracks at once, sending only the ones that moved in a single batch.
+    ### Arguments
+     - locations: Up to 8 volumes in the `0 <= x <= 1` range, starting from the first track. None leaves the arrow of that track untouched.
+
+    ### Returns
+     - int: Number of arrows that moved.
+    """
+    return _setGraphs(_VOLUME_GRAPH, _VOLUME_GRAPH_INDEX, _volGraphPosition, locations)
+
+def setTrackPanGraphs(locations) -> int:
+    """ Updates the pan arrows of several tracks at once, sending only the ones that moved in a single batch.
+    ### Arguments
+     - locations: Up to 8 pans in the `-1 <= x <= 1` range, starting from the first track. None leaves the arrow of that track untouched.
+
+    ### Returns
+     - int: Number of arrows that moved.
+    """
+    return _setGraphs(_PAN_GRAPH, _PAN_GRAPH_INDEX, _panGraphPosition, locations)
+
+def _setGraphs(graphValue: int, firstIndex: int, translate, locations) -> int:
+    # A ninth location would land on the first arrow of the other kind
+    if len(locations) > 8:
+        raise ValueError("A bank has 8 tracks, got %d" % len(locations))
+
+    # Skips the update if the device can't make use of it
+    if not _mask >> graphValue & 1:
+        return 0
+
+    positions = _surface.numbers
+    frames = []
+
+    for trackID, location in enumerate(locations):
+        if location is None:
+            continue
+
+        location = translate(location)
+        if positions[firstIndex + trackID] != location:
+            positions[firstIndex + trackID] = location
+            frames.append(bytes((191, graphValue + trackID, location)))
+
+    if frames:
+        nihia.framesOut(frames)
+
+    return len(frames)
+
+def _volGraphPosition(location: float) -> int:
+    """ Translates a volume in the 0-1 range given by FL Studio to the 0-127 position of the volume arrow. """
+    # int() truncates the decimals the same way math.trunc() does
+    location = int(location * 127)
+
+    # Anything outside of the range stays at the ends
+    return 0 if location < 0 else 127 if location > 127 else location
+
+def _panGraphPosition(location: float) -> int:
+    """ Translates a pan in the -1 to 1 range given by FL Studio to the 0-127 position of the pan arrow. """
+    # The left half spans 64 positions and the right half 63, with the center at 64
+    location = int(64 + location * 64) if location < 0 else int(64 + location * 63)
+
+    return 0 if location < 0 else 127 if location > 127 else location
+
+###########################################################################################################################################
+# Bank updates
+###########################################################################################################################################
+
+# Fields of the track descriptors taken by setBank() and the info type each one of them is reported as, in the order they are sent
+# Existence goes first, as the device ignores the mute and solo states of tracks that don't exist
+_BANK_FIELDS = (
+    ("exist", "EXIST"),
+    ("sel", "SELECTED"),
+    ("mute", "IS_MUTE"),
+    ("solo", "IS_SOLO"),
+    ("arm", "IS_ARMED"),
+    ("mutedBySolo", "MUTED_BY_SOLO"),
+    ("volGraph", "VOLUME_GRAPH"),
+    ("panGraph", "PAN_GRAPH"),
+    ("name", "NAME"),
+    ("vol", "VOLUME"),
+    ("pan", "PAN"),
+)
+
+def setBank(tracks) -> int:
+    """ Updates the 8 tracks being displayed at once, the way it's done when the user switches between banks of mixer tracks.
+    
+    Every message of the bank is made in a single pass and sent in one ordered burst, existence of the tracks first, as the device ignores
+    the mute and solo states of tracks that don't exist. Arrows already in place are skipped and, if the device state mirror is enabled,
+    so are the rest of the fields the device is already showing, no matter if they were sent through this method or through any other.
+
+    ### Arguments
+     - tracks: Sequence of up to 8 track descriptors, one for each track being displayed. Each descriptor is a dictionary with any of these keys:
+        - exist (int or str): Track type from `track_types`.
+        - name (str), vol (str), pan (str): Text to show as the name, volume and pan of the track.
+        - sel, mute, solo, arm, mutedBySolo (bool): Selection, mute, solo, arm for recording and mute by solo states.
+        - volGraph (float), panGraph (float): Positions of the volume and pan arrows, as taken by `setTrackVolGraph` and `setTrackPanGraph`.
+       
+       A descriptor can be None to leave that track untouched.
+
+    ### Returns
+     - int: Number of messages sent.
+    """
+    if len(tracks) > 8:
+        raise ValueError("A bank has 8 tracks, got %d" % len(tracks))
+
+    frames = []
+    append = frames.append
+    setField = _surface.set
+
+    # Builds the messages straight from the precomputed prefixes, without going through the setters for each one of them
+    for field, info_type in _BANK_FIELDS:
+        if not _mask & _BITS[info_type]:
+            continue
+
+        prefix = _FRAME_PREFIXES[info_type]
+
+        for trackID, track in enumerate(tracks):
+            if track is None or field not in track:
+                continue
+
+            value = track[field]
+
+            if info_type == "VOLUME_GRAPH" or info_type == "PAN_GRAPH":
+                # The arrows are always kept on the surface, with or without the mirror
+                value = _volGraphPosition(value) if info_type == "VOLUME_GRAPH" else _panGraphPosition(value)
+                if setField(info_type, trackID, value):
+                    append(bytes((191, mixerinfo_types[info_type] + trackID, value)))
+                continue
+
+            if field == "exist" and value.__class__ is str:
+                value = track_types[value]
+
+            if _stateCacheEnabled and not setField(info_type, trackID, value):
+                continue
+
+            if info_type == "NAME":
+                append(b"%b\x00%c%b\xf7" % (prefix, trackID, names.encodeName(value)))
+            elif info_type == "VOLUME" or info_type == "PAN":
+                append(b"%b\x00%c%b\xf7" % (prefix, trackID, value.encode("UTF-8")))
+            else:
+                append(b"%b%c%c\xf7" % (prefix, value, trackID))
+
+    if frames:
+        nihia.framesOut(frames)
+
+    return len(frames)
 
 # Deprecated due to not having enough knowledge about how this actually works TODO
 # -----------------------
@@ -350,6 +725,14 @@ def setCurrentTrackAvailable(track_type: int or str):
     if track_type == str:
         track_type = track_types.get(track_type)
 
+    # Skips the update if the device can't make use of it
+    if not _mask & _BITS["SELECTED_AVAILABLE"]:
+        return
+
+    # Skips the update if the device is already showing it
+    if _isCached("SELECTED_AVAILABLE", None, track_type):
+        return
+
     # Sends the message
     nihia.dataOut(mixerinfo_types.get("SELECTED_AVAILABLE"), track_type)
 
@@ -360,6 +743,14 @@ def setCurrentTrackMuted(value: bool):
     ### Arguments
      - value (bool): Mute status. 
     """
+    # Skips the update if the device can't make use of it
+    if not _mask & _BITS["MUTE_SELECTED"]:
+        return
+
+    # Skips the update if the device is already showing it
+    if _isCached("MUTE_SELECTED", None, value):
+        return
+
     # Sends the message
     nihia.dataOut(mixerinfo_types.get("MUTE_SELECTED"), value)
 
@@ -370,6 +761,14 @@ def setCurrentTrackSolo(value: bool):
     ### Arguments
      - value (bool): Mute status. 
     """
+    # Skips the update if the device can't make use of it
+    if not _mask & _BITS["SOLO_SELECTED"]:
+        return
+
+    # Skips the update if the device is already showing it
+    if _isCached("SOLO_SELECTED", None, value):
+        return
+
     # Sends the message
     nihia.dataOut(mixerinfo_types.get("SOLO_SELECTED"), value)
 
@@ -380,11 +779,20 @@ def setCurrentTrackMuteBySolo(value: str):
      - value (bool):
     """
 
+    # Skips the update if the device can't make use of it
+    if not _mask & _BITS["SELECTED_MUTE_BY_SOLO"]:
+        return
+
+    # Skips the update if the device is already showing it
+    if _isCached("SELECTED_MUTE_BY_SOLO", None, value):
+        return
+
     # Sends the message
     nihia.dataOut(mixerinfo_types.get("SELECTED_MUTE_BY_SOLO"), value)
 
 def Str2Bytes(string: str) -> list:
     """ Utility function that encodes a given string to a Python list of its corresponding values in the UTF-8 standard.
+    Kept for scripts that build their own messages as lists. `buildTrackInfo` takes strings directly and doesn't need it.
 
     ### Args
      - str (str): String to encode
@@ -0,0 +1,120 @@
+# MIT License
+
+# Copyright (c) 2024 Pablo Peral
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Submodule of flmidi-nihia that turns track names into the bytes sent to the device, trimmed to what the screen can show. When names have
+to be trimmed or transliterated, the results are cached so that work isn't done over and over on every refresh. Otherwise, names are just
+encoded.
+"""
+
+import functools
+
+###########################################################################################################################################
+# Dictionaries and constants
+###########################################################################################################################################
+
+# Number of different names kept encoded unless specified otherwise
+DEFAULT_CACHE_SIZE = 256
+
+# Characters the screen of the device can show for a track name. None doesn't trim the names
+_width = None
+
+# If True, names are turned into plain ASCII before being sent, for screens that can't show anything else
+_transliterate = False
+
+# True while names are neither trimmed nor transliterated
+_plain = True
+
+###########################################################################################################################################
+# Methods and functions
+###########################################################################################################################################
+
+def setDisplay(width: int = None, transliterate: bool = False):
+    """ Sets what the screen of the device can show. Names already encoded for other settings stay in the cache.
+
+    ### Arguments
+     - width (int): Maximum number of characters of a name. None to send names whole.
+     - transliterate (bool): True to turn names into plain ASCII, dropping the accents and replacing anything else with "?".
+    """
+    global _width, _transliterate, _plain
+
+    _width = width
+    _transliterate = transliterate
+    _plain = width is None and not transliterate
+
+def encodeName(name: str) -> bytes:
+    """ Returns the bytes to send to the device for a name, ready to be used as the payload of a message.
+
+    ### Arguments
+     - name (str): Name as given by FL Studio.
+
+    ### Returns
+     - bytes: The name in UTF-8, made safe for the screen of the device.
+    """
+    # Without trimming nor transliteration, printable names are sent as they are, which costs less than looking them up on the cache
+    if _plain and name.isprintable():
+        return name.encode("UTF-8")
+
+    return _encode(name, _width, _transliterate)
+
+def _render(name: str, width: int, transliterate: bool) -> bytes:
+    """ Does the actual work of `encodeName`. Every call to it is a cache miss. """
+    # Line breaks, tabs and the like would be shown as garbage
+    if not name.isprintable():
+        name = "".join(character if character.isprintable() else " " for character in name)
+
+    if transliterate:
+        # Only needed by the profiles that transliterate, so it isn't loaded along with the layer
+        import unicodedata
+
+        # Splits the accents from the letters and drops them, so "é" becomes "e"
+        name = "".join(character for character in unicodedata.normalize("NFKD", name) if not unicodedata.combining(character))
+        name = name.encode("ascii", "replace").decode("ascii")
+
+    # Trimmed by characters, not bytes, so a multi-byte character never gets cut in half
+    if width is not None and len(name) > width:
+        name = name[:width]
+
+    return name.encode("UTF-8")
+
+_encode = functools.lru_cache(maxsize=DEFAULT_CACHE_SIZE)(_render)
+
+def setCacheSize(size: int):
+    """ Changes the number of names kept encoded, emptying the cache and its counters. """
+    global _encode
+
+    _encode = functools.lru_cache(maxsize=size)(_render)
+
+def clearCache():
+    """ Empties the cache and resets its counters. """
+    _encode.cache_clear()
+
+def cacheInfo() -> dict:
+    """ Returns the counters of the cache, to find out if it's big enough for the project.
+
+    ### Returns
+     - dict: With the number of `hits` and `misses` since the cache was last cleared, the number of names it holds (`size`) and the maximum (`maxsize`).
+       Names that are neither trimmed nor transliterated don't go through the cache, so they count as neither.
+    """
+    info = _encode.cache_info()
+
+    return {"hits": info.hits, "misses": info.misses, "size": info.currsize, "maxsize": info.maxsize}
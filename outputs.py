@@ -0,0 +1,370 @@
+# MIT License
+
+# Copyright (c) 2024 Pablo Peral
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Submodule of flmidi-nihia that drives several keyboards at once: every message is built a single time and the same bytes are written
+to each of them, leaving out what each keyboard can't make use of or is already showing.
+"""
+
+import nihia
+from nihia import backends, mixer, scheduler
+
+###########################################################################################################################################
+# Dictionaries and constants
+###########################################################################################################################################
+
+# Bytes every mixer SysEx message begins with, followed by the kind of information
+_HEADER = bytes(nihia.SYSEX_HEADER)
+_HEADER_LENGTH = len(_HEADER)
+
+# DATA1 bytes of the messages that start and end the deep integration mode, which the device also uses on its answers
+# The device forgets what it was showing on both, so they are never skipped and clear what each target is known to be showing
+_HELLO = 1
+_BYE = 2
+
+# Kinds of information sent as "BF XX XX" messages, and the DATA1 bytes they use
+_CC_TYPES = {
+    "VOLUME_GRAPH": range(mixer.mixerinfo_types["VOLUME_GRAPH"], mixer.mixerinfo_types["VOLUME_GRAPH"] + 8),
+    "PAN_GRAPH": range(mixer.mixerinfo_types["PAN_GRAPH"], mixer.mixerinfo_types["PAN_GRAPH"] + 8),
+    "SELECTED_AVAILABLE": (mixer.mixerinfo_types["SELECTED_AVAILABLE"], ),
+    "MUTE_SELECTED": (mixer.mixerinfo_types["MUTE_SELECTED"], ),
+    "SOLO_SELECTED": (mixer.mixerinfo_types["SOLO_SELECTED"], ),
+    "SELECTED_MUTE_BY_SOLO": (mixer.mixerinfo_types["SELECTED_MUTE_BY_SOLO"], ),
+}
+
+def _split(data: bytes) -> list:
+    """ Splits a run of whole messages, as written to a backend, back into messages. """
+    frames = []
+    index = 0
+
+    while index < len(data):
+        if data[index] == 240:
+            end = data.find(247, index) + 1 or len(data)
+        else:
+            end = index + 3
+
+        frames.append(data[index:end])
+        index = end
+
+    return frames
+
+###########################################################################################################################################
+# Targets
+###########################################################################################################################################
+
+class Target:
+    """ One of the keyboards of an `OutputGroup`. Keeps what the keyboard can make use of, what it's showing, whether it answered the
+    handshake and whatever it couldn't take yet. Made by `OutputGroup.add()`.
+
+    ### Attributes
+     - backend: Backend the messages for this keyboard are written to.
+     - profile (str): Profile from `nihia.profiles.profile_list` of the keyboard, or None if it makes use of everything.
+     - ready (bool): False from the moment the handshake is sent until this keyboard answers it.
+     - error (OSError): Error that made the target stop receiving messages, or None if it's working.
+    """
+
+    def __init__(self, backend: backends.Backend, mask: int, profile: str = None, backlogLimit: int = 4096, handshake: bool = True):
+        self.backend = backend
+        self.profile = profile
+        self.ready = True
+        self.error = None
+
+        self._mask = mask
+        self._handshake = handshake
+        self._backlog = b""
+        self._backlogLimit = backlogLimit
+        self._shown = {}
+
+        # Latest message for each target sent while the keyboard wasn't ready
+        self._held = {}
+
+        # Latest message for each target the keyboard couldn't take once its backlog went past the limit
+        self._overflow = {}
+
+        # What the keyboard has sent and wasn't given to `OutputGroup.read()` yet
+        self._input = b""
+
+        # Last bytes read while waiting for the answer to the handshake, in case the answer is split across two reads
+        self._tail = b""
+
+        # Whether the device makes use of each "BF XX XX" message, by DATA1 byte
+        self._ccAllowed = bytearray([1]) * 128
+        for info_type, data1s in _CC_TYPES.items():
+            allowed = mask >> mixer.mixerinfo_types[info_type] & 1
+            for data1 in data1s:
+                self._ccAllowed[data1] = allowed
+
+        # Resyncs after a reconnection or a profile change have to reach every keyboard
+        mixer.addInvalidateHandler(self.forget)
+
+    def forget(self):
+        """ Forgets what the keyboard is showing, so every message gets written to it again. """
+        self._shown.clear()
+
+    def _filter(self, frames) -> list:
+        """ Returns the messages of a batch the keyboard makes use of and isn't already showing. """
+        mask = self._mask
+        ccAllowed = self._ccAllowed
+        shown = self._shown
+
+        accepted = []
+        for frame in frames:
+            if frame[0] == 240:
+                if frame.startswith(_HEADER) and len(frame) > _HEADER_LENGTH and not mask >> frame[_HEADER_LENGTH] & 1:
+                    continue
+            elif frame[1] == _HELLO or frame[1] == _BYE:
+                shown.clear()
+                self._held.clear()
+                self._overflow.clear()
+                self.ready = frame[1] == _BYE or not self._handshake
+                self._tail = b""
+                accepted.append(frame)
+                continue
+            elif not ccAllowed[frame[1]]:
+                continue
+
+            target = scheduler.targetOf(frame)
+
+            # Until the keyboard answers the handshake, only the latest message for each target is kept
+            if not self.ready:
+                self._held[target] = frame
+                continue
+
+            if shown.get(target) == frame:
+                continue
+
+            shown[target] = frame
+            accepted.append(frame)
+
+        return accepted
+
+    def _poll(self):
+        """ Reads whatever the keyboard has sent, keeping it for `OutputGroup.read()` and looking for its answer to the handshake. """
+        data = self.backend.read()
+        if not data:
+            return
+
+        # Only the newest input is kept for a keyboard nobody reads from
+        self._input = (self._input + data)[-self._backlogLimit:]
+
+        if self.ready:
+            return
+
+        data = self._tail + data
+        self._tail = data[-2:]
+
+        for index in range(len(data) - 2):
+            if data[index] == 191 and data[index + 1] == _HELLO:
+                self.ready = True
+                self._tail = b""
+
+                frames = list(self._held.values())
+                self._held.clear()
+
+                accepted = self._filter(frames)
+                if accepted:
+                    self._write(accepted)
+                return
+
+    def _write(self, frames):
+        """ Writes a batch to the keyboard, keeping whatever it can't take right away for later. """
+        if self._overflow:
+            self._keep(frames)
+            self._drain()
+        elif self._backlog:
+            self._backlog += b"".join(frames)
+            self._drain()
+        else:
+            self._send(frames)
+
+    def _send(self, frames):
+        try:
+            self.backend.write(frames)
+        except BlockingIOError as error:
+            self._hold(b"".join(frames)[getattr(error, "characters_written", 0):])
+        except OSError as error:
+            self._fail(error)
+
+    def _drain(self):
+        """ Tries to write what the keyboard couldn't take before. """
+        backlog = self._backlog
+        self._backlog = b""
+
+        if backlog:
+            try:
+                self.backend.write((backlog, ))
+            except BlockingIOError as error:
+                self._hold(backlog[getattr(error, "characters_written", 0):])
+                return
+            except OSError as error:
+                self._fail(error)
+                return
+
+        # Once the keyboard has caught up, it's given the latest message for each target it missed
+        if self._overflow:
+            frames = list(self._overflow.values())
+            self._overflow.clear()
+            self._send(frames)
+
+    def _hold(self, data: bytes):
+        if not self._overflow and len(data) <= self._backlogLimit:
+            self._backlog = data
+            return
+
+        # A keyboard that falls too far behind only keeps the end of the message it was cut in the middle of, which it needs to make
+        # sense of whatever comes next, and the latest message for each target after that
+        start = 0
+        while start < len(data) and data[start] < 128:
+            start += 1
+        if start < len(data) and data[start] == 247:
+            start += 1
+
+        self._backlog = data[:start]
+        self._keep(_split(data[start:]))
+
+    def _keep(self, frames):
+        overflow = self._overflow
+        for frame in frames:
+            # Moved to the end, so the messages are replayed in the order their latest versions were sent
+            target = scheduler.targetOf(frame)
+            overflow.pop(target, None)
+            overflow[target] = frame
+
+    def _fail(self, error: OSError):
+        self.error = error
+        self._backlog = b""
+        self._overflow.clear()
+        self._shown.clear()
+
+###########################################################################################################################################
+# Output group
+###########################################################################################################################################
+
+class OutputGroup(backends.Backend):
+    """ Backend that writes every message to several keyboards. Messages are built once by the layer, as usual, and the same bytes
+    are given to each keyboard after leaving out the ones it can't make use of or is already showing.
+
+    A keyboard that can't take a batch right away (backends raising `BlockingIOError`) keeps the rest for the next write or `onIdle()`
+    without holding up the others. Past `backlogLimit` bytes, only the latest message for each target is kept until the keyboard catches
+    up. A keyboard that fails with any other `OSError` stops receiving messages until it's added again, which replaces the failed
+    target on the group.
+
+    Each keyboard answers the handshake on its own: after the handshake goes through the group, the messages for every keyboard are held
+    until that keyboard answers, which `read()` and `onIdle()` look for. `nihia.connection` sees the device as ready as soon as any of
+    them answers, and the rest catch up when they answer too. Keyboards whose backend can't read are added with ``handshake=False``, which
+is the default for `backends.FLStudioBackend`.
+
+    Inside FL Studio, a script can only write to the output port it's assigned to through the `device` module, so at most one keyboard of
+    the group can use `backends.FLStudioBackend`. The others need a backend that opens their ports by itself, like
+    `backends.RawMidiBackend` or `backends.RtMidiBackend`, with those ports left unassigned on FL Studio's MIDI settings.
+
+    Names are encoded once for all the keyboards, so their length and characters follow `nihia.names.setDisplay()` rather than the
+    profile of each keyboard. No profile should be set on `nihia.profiles` while using a group, so the layer builds every message
+    any of the keyboards can make use of.
+
+    ### Arguments
+     - backlogLimit (int): Maximum bytes held for a keyboard that's falling behind before only the latest message for each target is kept.
+    """
+
+    def __init__(self, backlogLimit: int = 4096):
+        self.backlogLimit = backlogLimit
+        self.targets = []
+
+    def add(self, backend: backends.Backend, profile: str = None, handshake: bool = None) -> Target:
+        """ Adds a keyboard to the group. A target of the group that failed with the same backend, or with any
+        `backends.FLStudioBackend` if that's the backend being added, is taken out of the group first.
+
+        ### Arguments
+         - backend: Backend the messages for the keyboard are written to.
+         - profile (str): Profile from `nihia.profiles.profile_list` of the keyboard. None for a keyboard that makes use of everything.
+         - handshake (bool): If True, messages for the keyboard are held after a handshake until it answers. Must be False for backends
+           that can't read. Defaults to True for every backend but `backends.FLStudioBackend`, whose answers reach the script through
+           its OnMidiMsg function instead.
+
+        ### Returns
+         - Target: The keyboard on the group.
+        """
+        from nihia import profiles
+
+        isFLStudio = isinstance(backend, backends.FLStudioBackend)
+
+        # Adding a keyboard that failed again replaces its dead target instead of writing to the keyboard twice
+        self.targets = [target for target in self.targets if target.error is None or not (target.backend is backend
+                        or isFLStudio and isinstance(target.backend, backends.FLStudioBackend))]
+
+        if isFLStudio and any(isinstance(target.backend, backends.FLStudioBackend) for target in self.targets):
+            raise ValueError("Only one keyboard of a group can be written to through FL Studio's device module")
+
+        if handshake is None:
+            handshake = not isFLStudio
+
+        mask = mixer.ALL_TYPES if profile is None else profiles.maskOf(profiles.profile_list[profile]["types"])
+        target = Target(backend, mask, profile, self.backlogLimit, handshake)
+        self.targets.append(target)
+
+        return target
+
+    def remove(self, target: Target):
+        """ Takes a keyboard out of the group. Its backend isn't closed. """
+        self.targets.remove(target)
+
+    def write(self, frames):
+        for target in self.targets:
+            if target.error is None:
+                accepted = target._filter(frames)
+                if accepted:
+                    target._write(accepted)
+
+    def read(self) -> bytes:
+        """ Returns whatever the working keyboards have sent since the last call, one after the other. """
+        data = []
+        for target in self.targets:
+            if target.error is None:
+                target._poll()
+                data.append(target._input)
+                target._input = b""
+
+        return b"".join(data)
+
+    def onIdle(self) -> int:
+        """ Looks for the answers to the handshake of the keyboards that weren't ready and writes whatever the keyboards that were
+        falling behind couldn't take before. Intended to be called from the OnIdle() event of the script.
+
+        ### Returns
+         - int: Number of keyboards that still have messages waiting.
+        """
+        waiting = 0
+
+        for target in self.targets:
+            if target.error is None and not target.ready:
+                target._poll()
+
+            if (target._backlog or target._overflow) and target.error is None:
+                target._drain()
+                if target._backlog or target._overflow:
+                    waiting += 1
+
+        return waiting
+
+    def close(self):
+        for target in self.targets:
+            target.backend.close()
@@ -0,0 +1,125 @@
+# MIT License
+
+# Copyright (c) 2024 Pablo Peral
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Submodule of flmidi-nihia with the capabilities of each series of Komplete Kontrol keyboards, so nothing gets sent to a device that can't
+make use of it.
+"""
+
+from nihia import events, mixer, names
+
+###########################################################################################################################################
+# Dictionaries and constants
+###########################################################################################################################################
+
+# Kinds of information from `mixer.mixerinfo_types` every device in DAW integration mode understands
+_COMMON_TYPES = (
+    "VOLUME", "PAN", "IS_MUTE", "IS_SOLO", "NAME", "IS_ARMED", "MUTED_BY_SOLO",
+    "MUTE_SELECTED", "SOLO_SELECTED", "EXIST", "SELECTED", "SELECTED_AVAILABLE", "SELECTED_MUTE_BY_SOLO",
+    "KOMPLETE_INSTANCE",
+)
+
+# Device profile dictionary
+# - types: Kinds of information from `mixer.mixerinfo_types` the device makes use of. The peak meters only work on S-Series MK2 devices
+#   and later, and the volume and pan arrows only exist on the screens of S-Series devices
+# - screenWidth: Characters of a track name that fit on the screen. None to send names whole and let the device cut them
+# - transliterate: If True, names are turned into plain ASCII for screens that can't show anything else
+#   No device is known to need trimming or transliteration yet, so every profile leaves names untouched. Both can be set through the
+#   overrides of `setProfile()` for firmwares that need them
+# - series: Series the 4D encoder mapping of the device belongs to, as taken by `nihia.events.setSeries`
+profile_list = {
+    "A_SERIES": {
+        "types": _COMMON_TYPES,
+        "screenWidth": None,
+        "transliterate": False,
+        "series": "A",
+    },
+    "M_SERIES": {
+        "types": _COMMON_TYPES,
+        "screenWidth": None,
+        "transliterate": False,
+        "series": "A",
+    },
+    "S_MK2": {
+        "types": _COMMON_TYPES + ("PEAK", "VOLUME_GRAPH", "PAN_GRAPH"),
+        "screenWidth": None,
+        "transliterate": False,
+        "series": "S",
+    },
+    "S_MK3": {
+        "types": _COMMON_TYPES + ("PEAK", "VOLUME_GRAPH", "PAN_GRAPH"),
+        "screenWidth": None,
+        "transliterate": False,
+        "series": "S",
+    },
+}
+
+# Name of the active profile. None until one is set, in which case everything gets sent
+_active = None
+
+###########################################################################################################################################
+# Methods and functions
+###########################################################################################################################################
+
+def maskOf(types) -> int:
+    """ Returns the bitmask of a set of kinds of information: bit n is set if the kind of information with ID n is among them. """
+    mask = 0
+    for info_type in types:
+        mask |= 1 << mixer.mixerinfo_types[info_type]
+    return mask
+
+def setProfile(name: str, **overrides):
+    """ Sets the profile of the device being used. From then on, the senders of `nihia.mixer` drop the messages the device can't make
+    use of before building them, names are trimmed to the screen and incoming 4D encoder messages are decoded for the right series.
+    The device state mirror of `nihia.mixer` is cleared, so everything gets sent again for the new profile.
+
+    ### Arguments
+     - name (str): Profile from `profile_list`, or None to go back to sending everything.
+     - overrides: Values to use instead of the ones of the profile, like ``screenWidth=12``.
+    """
+    global _active
+
+    # Looked up first, so an unknown name leaves everything as it was
+    profile = None if name is None else dict(profile_list[name], **overrides)
+
+    _active = name
+
+    # Whatever the device is showing might have been sent with a different screen width or kinds of information
+    mixer.invalidateState()
+
+    if profile is None:
+        mixer._mask = mixer.ALL_TYPES
+        names.setDisplay()
+        events.setSeries("A")
+        return
+
+    mixer._mask = maskOf(profile["types"])
+    names.setDisplay(profile["screenWidth"], profile["transliterate"])
+    events.setSeries(profile["series"])
+
+def getProfile() -> str:
+    """ Returns the name of the active profile, or None if there's none. """
+    return _active
+
+def supports(info_type: str) -> bool:
+    """ Returns True if the device being used makes use of a kind of information from `mixer.mixerinfo_types`. """
+    return bool(mixer._mask >> mixer.mixerinfo_types[info_type] & 1)
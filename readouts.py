@@ -0,0 +1,195 @@
+# MIT License
+
+# Copyright (c) 2024 Pablo Peral
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Submodule of flmidi-nihia that shows the volume and pan of the tracks as text on the screen of the device from their numeric values,
+without flooding it with messages while a fader is being moved or automated.
+"""
+
+import math
+import time
+
+from nihia import mixer
+
+###########################################################################################################################################
+# Dictionaries and constants
+###########################################################################################################################################
+
+# Number of steps of the tables for values coming from MIDI controllers and for the fine-grained values of FL Studio's mixer
+COARSE = 128
+FINE = 1024
+
+# Points of the volume fader of FL Studio's mixer: 0.8 is unity gain (0 dB) and the top of the fader is +5.6 dB
+UNITY = 0.8
+MAX_DB = 5.6
+
+# dB per decade of the fader value, making the fader follow a power law that goes through both points
+_DB_PER_DECADE = MAX_DB / math.log10(1 / UNITY)
+
+# Names of the functions of `nihia.mixer` each kind of readout is sent through
+# Looked up on every message, so the readouts go through whatever replaced them, like the timers of `nihia.metrics`
+_SENDERS = {
+    "VOLUME": "setTrackVol",
+    "PAN": "setTrackPan",
+}
+
+###########################################################################################################################################
+# Formatters
+###########################################################################################################################################
+
+def percentText(value: float) -> str:
+    """ Formats a `0 <= x <= 1` value as a percentage, like ``"78%"``. """
+    return "%d%%" % round(value * 100)
+
+def dBText(value: float) -> str:
+    """ Formats a `0 <= x <= 1` volume of FL Studio's mixer in decibels, like ``"-3.2 dB"``. The fader is taken as a power law going
+    through the two points FL Studio shows, 0 dB at 0.8 and +5.6 dB at the top. Values in between follow that curve, which can differ
+    slightly from FL Studio's own hint bar: give `volumeReadout()` another format for exact values. """
+    if value <= 0:
+        return "-inf dB"
+
+    dB = round(_DB_PER_DECADE * math.log10(value / UNITY), 1)
+
+    return "0.0 dB" if dB == 0 else "%+.1f dB" % dB
+
+def panText(value: float) -> str:
+    """ Formats a `-1 <= x <= 1` pan the way FL Studio does, like ``"Centered"`` or ``"25% Left"``. """
+    percent = round(abs(value) * 100)
+
+    if percent == 0:
+        return "Centered"
+
+    return "%d%% %s" % (percent, "Left" if value < 0 else "Right")
+
+###########################################################################################################################################
+# Readout
+###########################################################################################################################################
+
+class Readout:
+    """ Shows a numeric value of the 8 tracks being displayed as text on the screen of the device. Every possible text is formatted
+    once, when the readout is created, and each slot is sent at most `rate` times per second. When updates come faster than that, the
+    last one is held and sent by `onIdle()` once the slot can be sent again, so the screen always ends up showing the final value.
+    The readout forgets what it has sent whenever `nihia.mixer.invalidateState()` is called, like on reconnections and profile changes.
+
+    ### Arguments
+     - field (str): Kind of readout, "VOLUME" or "PAN".
+     - format: Function that takes a value between `low` and `high` and returns the text to show.
+     - steps (int): Number of texts the `low` to `high` range is divided into, at least 2. `COARSE` for values from MIDI controllers and `FINE` for
+       the values of FL Studio's mixer.
+     - low (float): Lowest value of the range.
+     - high (float): Highest value of the range.
+     - rate (float): Maximum updates per second of each slot.
+    """
+
+    def __init__(self, field: str, format, steps: int = FINE, low: float = 0.0, high: float = 1.0, rate: float = 20.0):
+        if steps < 2:
+            raise ValueError("A readout needs at least 2 steps, got %d" % steps)
+
+        self.field = field
+        self.low = low
+        self.interval = 1 / rate
+
+        self._sender = _SENDERS[field]
+        self._last = steps - 1
+        self._scale = self._last / (high - low)
+        self._table = tuple(format(low + step / self._scale) for step in range(steps))
+
+        self._shown = [None] * 8
+        self._pending = [None] * 8
+        self._sentTime = [float("-inf")] * 8
+
+        # Forgets what the screen is showing along with the device state mirror, on reconnections and profile changes
+        mixer.addInvalidateHandler(self.reset)
+
+    def textOf(self, value: float) -> str:
+        """ Returns the text a value is shown as. """
+        step = round((value - self.low) * self._scale)
+        return self._table[0 if step < 0 else self._last if step > self._last else step]
+
+    def update(self, slot: int, value: float, now: float = None) -> bool:
+        """ Shows a new value on a slot of the screen, or holds it until `onIdle()` if the slot was sent too recently.
+
+        ### Arguments
+         - slot (int): From 0 to 7, the number of the track being represented on the display.
+         - value (float): New value, between `low` and `high`.
+         - now (float): Current time in seconds. Defaults to `time.perf_counter()`.
+
+        ### Returns
+         - bool: True if the text was sent to the device.
+        """
+        text = self.textOf(value)
+
+        if text == self._shown[slot]:
+            self._pending[slot] = None
+            return False
+
+        if now is None:
+            now = time.perf_counter()
+
+        if now - self._sentTime[slot] < self.interval:
+            self._pending[slot] = text
+            return False
+
+        self._show(slot, text, now)
+        return True
+
+    def onIdle(self, now: float = None) -> int:
+        """ Sends the held values of the slots that can be sent again. Intended to be called from the OnIdle() event of the script.
+
+        ### Returns
+         - int: Number of slots sent.
+        """
+        if now is None:
+            now = time.perf_counter()
+
+        sent = 0
+        pending = self._pending
+
+        for slot, text in enumerate(pending):
+            if text is not None and now - self._sentTime[slot] >= self.interval:
+                self._show(slot, text, now)
+                sent += 1
+
+        return sent
+
+    def reset(self):
+        """ Forgets what the screen is showing and drops the held values, so the next update of each slot gets sent right away. Called by
+        `nihia.mixer.invalidateState()`. """
+        self._shown = [None] * 8
+        self._pending = [None] * 8
+        self._sentTime = [float("-inf")] * 8
+
+    def _show(self, slot: int, text: str, now: float):
+        getattr(mixer, self._sender)(slot, text)
+        self._shown[slot] = text
+        self._pending[slot] = None
+        self._sentTime[slot] = now
+
+def volumeReadout(rate: float = 20.0, format = dBText, steps: int = FINE) -> Readout:
+    """ Creates a readout for the volume of the tracks, taking the `0 <= x <= 1` values of FL Studio's mixer and showing them in
+    decibels. """
+    return Readout("VOLUME", format, steps, 0.0, 1.0, rate)
+
+def panReadout(rate: float = 20.0, format = panText, steps: int = FINE) -> Readout:
+    """ Creates a readout for the pan of the tracks, taking the `-1 <= x <= 1` values of FL Studio's mixer. The number of steps is
+    made odd so the center of the range has a step of its own. """
+    return Readout("PAN", format, steps | 1, -1.0, 1.0, rate)
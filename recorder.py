@@ -0,0 +1,281 @@
+# MIT License
+
+# Copyright (c) 2024 Pablo Peral
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Submodule of flmidi-nihia that records the MIDI traffic between the layer and the device to a compact binary log and plays it back.
+
+Log format: the `MAGIC` bytes followed by one record per message, each made of
+ - the time since the previous record in microseconds, as a varint (7 bits per byte, lowest first, high bit set on every byte but the last),
+ - the kind of message: `OUTGOING` or `INCOMING`,
+ - the length of the message as a varint,
+ - the bytes of the message.
+"""
+
+import os
+import time
+
+import nihia
+from nihia import backends
+
+###########################################################################################################################################
+# Dictionaries and constants
+###########################################################################################################################################
+
+MAGIC = b"NIHIALOG\x01"
+
+# Kinds of record
+OUTGOING = 0
+INCOMING = 1
+
+# Bytes of the ring buffer unless specified otherwise
+DEFAULT_CAPACITY = 1 << 16
+
+def _varint(value: int) -> bytes:
+    data = bytearray()
+    while value > 127:
+        data.append((value & 127) | 128)
+        value >>= 7
+    data.append(value)
+    return bytes(data)
+
+###########################################################################################################################################
+# Recorder
+###########################################################################################################################################
+
+class _RecordingBackend(backends.Backend):
+    """ Backend that records every batch before handing it to the backend that was in use. """
+
+    def __init__(self, recorder: "Recorder", backend: backends.Backend):
+        self.recorder = recorder
+        self.backend = backend
+
+    def write(self, frames):
+        record = self.recorder.record
+        for frame in frames:
+            record(OUTGOING, frame)
+
+        self.backend.write(frames)
+
+    def read(self) -> bytes:
+        data = self.backend.read()
+        if data:
+            self.recorder.record(INCOMING, data)
+        return data
+
+    def close(self):
+        self.backend.close()
+
+class Recorder:
+    """ Records the messages exchanged with the device to a binary log.
+
+    Records are written to a ring buffer allocated up front, so recording a message never touches the disk. The buffer is written to the
+    log by `flush()`, meant to be called from the OnIdle function of the script. If the buffer fills up before that, new records are
+    dropped and counted on `dropped` instead of stalling the script.
+
+    ### Arguments
+     - target: Path of the log to create (str or path-like object) or a binary file object that's already open.
+     - capacity (int): Bytes of the ring buffer.
+    """
+
+    def __init__(self, target, capacity: int = DEFAULT_CAPACITY):
+        if isinstance(target, (str, os.PathLike)):
+            self._file = open(os.fspath(target), "wb")
+            self._owned = True
+        else:
+            self._file = target
+            self._owned = False
+
+        self._file.write(MAGIC)
+
+        self._buffer = bytearray(capacity)
+        self._view = memoryview(self._buffer)
+        self._start = 0
+        self._used = 0
+
+        self._lastTime = None
+        self._backend = None
+        self._previousBackend = None
+
+        self.recorded = 0
+        self.dropped = 0
+
+    def start(self):
+        """ Starts recording every message written to the device by the layer. """
+        if self._backend is not None:
+            return
+
+        self._previousBackend = nihia._backend
+        self._backend = _RecordingBackend(self, self._previousBackend or backends.FLStudioBackend())
+        nihia._backend = self._backend
+
+    def stop(self):
+        """ Stops recording, puts back the backend that was in use and writes whatever is left on the buffer to the log. """
+        if self._backend is not None and nihia._backend is self._backend:
+            nihia._backend = self._previousBackend
+        self._backend = None
+
+        self.flush()
+
+    def close(self):
+        """ Stops recording and closes the log. """
+        self.stop()
+        if self._owned:
+            self._file.close()
+
+    def onMidiMsg(self, event):
+        """ Records an incoming message given by FL Studio to the OnMidiMsg function of a script. """
+        if event.sysex:
+            self.record(INCOMING, event.sysex)
+        else:
+            self.record(INCOMING, bytes((event.status, event.data1, event.data2)))
+
+    def record(self, kind: int, data: bytes, now: float = None):
+        """ Adds a message to the buffer.
+
+        ### Arguments
+         - kind (int): `OUTGOING` or `INCOMING`.
+         - data (bytes): The message.
+         - now (float): Time of the message in seconds. Defaults to `time.perf_counter()`.
+        """
+        if now is None:
+            now = time.perf_counter()
+
+        delta = 0 if self._lastTime is None else max(0, round((now - self._lastTime) * 1000000))
+
+        entry = b"%b%c%b%b" % (_varint(delta), kind, _varint(len(data)), data)
+        size = len(entry)
+        capacity = len(self._buffer)
+
+        if self._used + size > capacity:
+            self.dropped += 1
+            return
+
+        # Only the time of recorded messages counts, so the deltas of the log always add up
+        self._lastTime = now
+
+        position = (self._start + self._used) % capacity
+        first = min(size, capacity - position)
+        self._view[position:position + first] = entry[:first]
+        if first < size:
+            self._view[:size - first] = entry[first:]
+
+        self._used += size
+        self.recorded += 1
+
+    def flush(self):
+        """ Writes the contents of the buffer to the log. """
+        if not self._used:
+            return
+
+        capacity = len(self._buffer)
+        end = self._start + self._used
+
+        if end <= capacity:
+            self._file.write(self._view[self._start:end])
+        else:
+            self._file.write(self._view[self._start:])
+            self._file.write(self._view[:end - capacity])
+
+        self._file.flush()
+        self._start = end % capacity
+        self._used = 0
+
+###########################################################################################################################################
+# Replayer
+###########################################################################################################################################
+
+def readLog(source):
+    """ Reads a log made by a `Recorder`.
+
+    ### Arguments
+     - source: Path of the log (str or path-like object) or its contents as bytes.
+
+    ### Returns
+     - Generator of (time, kind, data) tuples, being time the seconds since the first record.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(os.fspath(source), "rb") as file:
+            source = file.read()
+
+    if not source.startswith(MAGIC):
+        raise ValueError("Not a nihia traffic log")
+
+    position = len(MAGIC)
+    elapsed = 0
+
+    while position < len(source):
+        delta, position = _readVarint(source, position)
+        kind = source[position]
+        length, position = _readVarint(source, position + 1)
+
+        elapsed += delta
+        yield elapsed / 1000000, kind, bytes(source[position:position + length])
+        position += length
+
+def _readVarint(data: bytes, position: int) -> tuple:
+    value = 0
+    shift = 0
+    while True:
+        byte = data[position]
+        position += 1
+        value |= (byte & 127) << shift
+        if byte < 128:
+            return value, position
+        shift += 7
+
+def replay(source, realtime: bool = False, handler = None) -> int:
+    """ Plays a log back through FL Studio's `device` module, or the stand-in one of the `standin` folder when used outside of FL Studio,
+    so it can be used as a load generator for throughput tests.
+
+    ### Arguments
+     - source: Path of the log (str or path-like object) or its contents as bytes.
+     - realtime (bool): If True, keeps the timing the messages were recorded with. Otherwise, they're sent as fast as possible.
+     - handler: Function to give the incoming messages to, like the OnMidiMsg function of a script. Needs the stand-in device module to
+       build the events. If None, incoming messages are skipped.
+
+    ### Returns
+     - int: Number of messages played.
+    """
+    device = nihia._device or nihia._host()
+
+    played = 0
+    start = time.perf_counter()
+
+    for timestamp, kind, data in readLog(source):
+        if realtime:
+            wait = timestamp - (time.perf_counter() - start)
+            if wait > 0:
+                time.sleep(wait)
+
+        if kind == OUTGOING:
+            if data[0] == 240:
+                device.midiOutSysex(data)
+            else:
+                device.midiOutMsg(data[0], 0, data[1], data[2])
+        elif handler is not None:
+            handler(device.MidiEvent(data))
+        else:
+            continue
+
+        played += 1
+
+    return played
@@ -0,0 +1,223 @@
+# MIT License
+
+# Copyright (c) 2024 Pablo Peral
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Submodule of flmidi-nihia that queues the messages sent to the device during a script callback and sends them later, merging
+outdated updates and spreading them across several calls to FL Studio's OnIdle.
+"""
+
+import sys
+
+import nihia
+
+###########################################################################################################################################
+# Dictionaries and constants
+###########################################################################################################################################
+
+# Priorities of the messages, from the first to be sent to the last one
+# What the user notices the most (the lights of the transport buttons and which track is selected) goes first, and the names of the
+# tracks, which are the biggest messages and the ones that change the least, go last
+PRIORITY_TRANSPORT = 0  # Button lights, selection and existence of the tracks
+PRIORITY_STATE = 1      # Mute, solo, arm and Komplete Kontrol instance of the tracks
+PRIORITY_GRAPH = 2      # Volume/pan arrows and peak meters
+PRIORITY_VALUE = 3      # Volume and pan strings
+PRIORITY_NAME = 4       # Track names
+
+# Maximum number of bytes sent on each call to onIdle() unless specified otherwise when enabling the scheduler
+DEFAULT_BYTES_PER_TICK = 1024
+
+# Priority of each "BF XX XX" message by its DATA1 byte
+# Anything that isn't a mixer arrow is a light or a selection state
+_CC_PRIORITIES = bytearray([PRIORITY_TRANSPORT] * 128)
+for _data1 in range(80, 96):
+    _CC_PRIORITIES[_data1] = PRIORITY_GRAPH
+
+# Priority of each mixer SysEx message by its info type byte
+_SYSEX_PRIORITIES = bytearray([PRIORITY_STATE] * 128)
+_SYSEX_PRIORITIES[64] = PRIORITY_TRANSPORT  # EXIST, so a track is never selected before the device knows it exists
+_SYSEX_PRIORITIES[66] = PRIORITY_TRANSPORT  # SELECTED
+_SYSEX_PRIORITIES[73] = PRIORITY_GRAPH      # PEAK
+_SYSEX_PRIORITIES[70] = PRIORITY_VALUE      # VOLUME
+_SYSEX_PRIORITIES[71] = PRIORITY_VALUE      # PAN
+_SYSEX_PRIORITIES[72] = PRIORITY_NAME       # NAME
+
+_HEADER = bytes(nihia.SYSEX_HEADER)
+_HEADER_LENGTH = len(_HEADER)
+
+###########################################################################################################################################
+# Scheduler state
+###########################################################################################################################################
+
+# One dictionary per priority level that goes between the target of a message and the latest message sent to that target
+# A newer message for the same target replaces the one that was waiting, since the device would only end up showing the last one anyway
+_pending = [{} for _ in range(PRIORITY_NAME + 1)]
+
+_bytesPerTick = DEFAULT_BYTES_PER_TICK
+_enabled = False
+
+###########################################################################################################################################
+# Methods and functions
+###########################################################################################################################################
+
+def enable(bytesPerTick: int = DEFAULT_BYTES_PER_TICK):
+    """ Starts queuing every message sent through `nihia.dataOut` and `nihia.sysexOut` instead of sending them right away.
+    From then on, `onIdle()` has to be called from the OnIdle function of the script for anything to reach the device.
+
+    ### Arguments
+     - bytesPerTick (int): Maximum number of bytes sent on each call to `onIdle()`.
+    """
+    global _bytesPerTick, _enabled
+
+    _bytesPerTick = bytesPerTick
+    _enabled = True
+
+    # Installed through nihia.connection, so the updates it holds until the device is ready are queued once released
+    from nihia import connection
+    connection.installSink(push)
+
+def disable():
+    """ Sends everything that was still waiting on the queue and goes back to sending messages as soon as they are made. """
+    global _enabled
+
+    _enabled = False
+
+    from nihia import connection
+    connection.removeSink(push)
+
+    # If the device isn't ready yet, the messages are held along with the rest instead
+    batch = take()
+    if batch:
+        nihia.framesOut(batch)
+
+def isEnabled() -> bool:
+    """ Returns True if messages are being queued. """
+    return _enabled
+
+def targetOf(frame: bytes):
+    """ Returns the target of a message: what the message changes on the device, so a newer message with the same target
+    makes the older one useless.
+
+    ### Arguments
+     - frame (bytes): Full MIDI message.
+
+    ### Returns
+     - The DATA1 byte for "BF XX XX" messages, a tuple of (info type, trackID) for the mixer SysEx messages or the message itself for
+    any other SysEx message, as those can't be merged.
+    """
+    if frame[0] != 240:
+        return frame[1]
+
+    if frame.startswith(_HEADER) and len(frame) > _HEADER_LENGTH + 2:
+        return (frame[_HEADER_LENGTH], frame[_HEADER_LENGTH + 2])
+
+    return frame
+
+def priorityOf(frame: bytes) -> int:
+    """ Returns the priority level of a message, being 0 the first to be sent. """
+    if frame[0] != 240:
+        return _CC_PRIORITIES[frame[1]]
+
+    if frame.startswith(_HEADER) and len(frame) > _HEADER_LENGTH:
+        return _SYSEX_PRIORITIES[frame[_HEADER_LENGTH]]
+
+    return PRIORITY_STATE
+
+def push(frame: bytes):
+    """ Adds a message to the queue, replacing any other message with the same target still waiting to be sent.
+
+    ### Arguments
+     - frame (bytes): Full MIDI message.
+    """
+    _pending[priorityOf(frame)][targetOf(frame)] = frame
+
+def pending() -> int:
+    """ Returns the number of messages waiting to be sent. """
+    return sum(len(level) for level in _pending)
+
+def onIdle() -> int:
+    """ Sends as many of the queued messages as the byte budget allows, in priority order. Meant to be called from the OnIdle function
+    of the script. At least one message gets sent on each call even if it's bigger than the budget, so nothing gets stuck forever.
+
+    ### Returns
+     - int: Number of bytes sent.
+    """
+    batch = []
+    sent = 0
+
+    for level in _pending:
+        while level:
+            # Dictionaries keep the insertion order, so the oldest target goes first
+            target = next(iter(level))
+            size = len(level[target])
+
+            if batch and sent + size > _bytesPerTick:
+                nihia.writeFrames(batch)
+                return sent
+
+            batch.append(level.pop(target))
+            sent += size
+
+    if batch:
+        nihia.writeFrames(batch)
+
+    return sent
+
+def take() -> list:
+    """ Takes every queued message out of the queue without sending it.
+
+    ### Returns
+     - list: The messages, in the order they would have been sent.
+    """
+    batch = []
+    for level in _pending:
+        batch.extend(level.values())
+        level.clear()
+
+    return batch
+
+def flushAll() -> int:
+    """ Sends every queued message right away, ignoring the byte budget.
+
+    ### Returns
+     - int: Number of bytes sent.
+    """
+    batch = take()
+
+    if batch:
+        nihia.writeFrames(batch)
+
+    return sum(len(frame) for frame in batch)
+
+def clear():
+    """ Throws away every queued message without sending it. The device state mirror and the arrows of `nihia.mixer` and the lights of
+    `nihia.buttons` already took those messages as shown, so they are forgotten too and the next update of each one gets sent. """
+    for level in _pending:
+        level.clear()
+
+    # If the submodules weren't imported yet, there's nothing to forget
+    mixer = sys.modules.get("nihia.mixer")
+    if mixer is not None:
+        mixer.invalidateState()
+
+    buttons = sys.modules.get("nihia.buttons")
+    if buttons is not None:
+        buttons.forgetLights()
@@ -0,0 +1,176 @@
+# MIT License
+
+# Copyright (c) 2024 Pablo Peral
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Stand-in for the `device` module of the FL Studio MIDI Scripting API, so the layer can be loaded, tested and profiled outside of FL Studio.
+
+Instead of talking to a real device, it keeps a record of every message the layer sends, with the moment it was sent and its size,
+and it can feed a script with incoming messages as if they came from the keyboard.
+
+To use it, put this folder first on the module search path before importing the layer:
+
+    import sys
+    sys.path.insert(0, "path/to/nihia/standin")
+
+    import device
+    import nihia
+"""
+
+import collections
+import time
+
+###########################################################################################################################################
+# Wire capture
+###########################################################################################################################################
+
+# Every outgoing message as it would have been written to the wire
+# - time: Moment the message was sent, from time.perf_counter()
+# - kind: "msg" for messages sent with midiOutMsg and "sysex" for the ones sent with midiOutSysex
+# - data: Bytes of the message
+Message = collections.namedtuple("Message", ["time", "kind", "data"])
+
+sent = []
+
+_startTime = time.perf_counter()
+
+def reset():
+    """ Forgets every message sent so far and restarts the clock used by `stats()`. """
+    global _startTime
+
+    sent.clear()
+    _startTime = time.perf_counter()
+
+def stats() -> dict:
+    """ Returns how much traffic has been sent since the last call to `reset()`.
+
+    ### Returns
+     - dict: With the following keys:
+        - messages, msg, sysex: Number of messages sent in total, through midiOutMsg and through midiOutSysex.
+        - bytes: Number of bytes that would have been written to the wire.
+        - elapsed: Seconds since the last reset.
+        - messagesPerSecond, bytesPerSecond: Average throughput over the elapsed time.
+        - wireSeconds: Time it would take to send those bytes over a 31250 baud MIDI DIN cable (10 bits per byte).
+    """
+    elapsed = time.perf_counter() - _startTime
+    size = sum(len(message.data) for message in sent)
+    sysex = sum(1 for message in sent if message.kind == "sysex")
+
+    return {
+        "messages": len(sent),
+        "msg": len(sent) - sysex,
+        "sysex": sysex,
+        "bytes": size,
+        "elapsed": elapsed,
+        "messagesPerSecond": len(sent) / elapsed if elapsed else 0.0,
+        "bytesPerSecond": size / elapsed if elapsed else 0.0,
+        "wireSeconds": size * 10 / 31250,
+    }
+
+###########################################################################################################################################
+# device module API
+###########################################################################################################################################
+
+def midiOutMsg(message: int, channel: int = -1, data1: int = -1, data2: int = -1):
+    """ Records a short MIDI message. Like in FL Studio, the message can be given already packed as a single integer
+    (``status + (data1 << 8) + (data2 << 16)``) or as separate status, channel, DATA1 and DATA2 values."""
+
+    if data1 == -1:
+        data = bytes((message & 0xFF, (message >> 8) & 0x7F, (message >> 16) & 0x7F))
+    else:
+        # The channel is added to the status byte if the status byte doesn't carry it already
+        if channel > 0:
+            message = (message & 0xF0) | (channel & 0x0F)
+        data = bytes((message, data1, data2))
+
+    sent.append(Message(time.perf_counter(), "msg", data))
+
+def midiOutSysex(message: bytes):
+    """ Records a SysEx message. """
+    sent.append(Message(time.perf_counter(), "sysex", bytes(message)))
+
+def isAssigned() -> bool:
+    """ There's always a device on the other side. """
+    return True
+
+def getName() -> str:
+    return "Komplete Kontrol DAW (stand-in)"
+
+def getPortNumber() -> int:
+    return 0
+
+###########################################################################################################################################
+# Incoming messages
+###########################################################################################################################################
+
+class MidiEvent:
+    """ Incoming MIDI message with the attributes of the event FL Studio gives to the OnMidiMsg function of a script. """
+
+    def __init__(self, data: bytes):
+        self.sysex = None
+        self.handled = False
+
+        if data[0] == 240:
+            self.status = 240
+            self.data1 = 0
+            self.data2 = 0
+            self.sysex = bytes(data)
+        else:
+            self.status = data[0]
+            self.data1 = data[1] if len(data) > 1 else 0
+            self.data2 = data[2] if len(data) > 2 else 0
+
+        self.midiId = self.status & 0xF0
+        self.midiChan = self.status & 0x0F
+
+def replay(messages, handler, realtime: bool = False) -> int:
+    """ Feeds a script with incoming messages as if they were coming from the device.
+
+    ### Arguments
+     - messages: Iterable of ``(time, data)`` pairs, where time is in seconds and data are the bytes of the message.
+       The `sent` list can be given too, to play the messages sent by the layer back.
+     - handler: Function that takes the event, like the OnMidiMsg function of a script.
+     - realtime (bool): If True, waits between messages so they arrive with the same timing they were recorded with. Otherwise,
+       they are given one after another as fast as possible.
+
+    ### Returns
+     - int: Number of messages the handler marked as handled.
+    """
+    handled = 0
+    first = None
+    start = time.perf_counter()
+
+    for message in messages:
+        timestamp, data = message[0], message[-1]
+
+        if realtime:
+            if first is None:
+                first = timestamp
+
+            wait = (timestamp - first) - (time.perf_counter() - start)
+            if wait > 0:
+                time.sleep(wait)
+
+        event = MidiEvent(data)
+        handler(event)
+        handled += event.handled
+
+    return handled
@@ -0,0 +1,226 @@
+# MIT License
+
+# Copyright (c) 2024 Pablo Peral
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Submodule of flmidi-nihia with a compact model of what the 8 tracks being displayed on the device are showing, cheap enough to be compared
+on every tick.
+"""
+
+import struct
+
+###########################################################################################################################################
+# Dictionaries and constants
+###########################################################################################################################################
+
+# Number of tracks being displayed on the device at once
+SLOTS = 8
+
+# Kinds of information from `mixer.mixerinfo_types` reported for each track with a number from 0 to 127
+NUMERIC_FIELDS = ("EXIST", "SELECTED", "IS_MUTE", "IS_SOLO", "IS_ARMED", "MUTED_BY_SOLO", "VOLUME_GRAPH", "PAN_GRAPH")
+
+# Kinds of information from `mixer.mixerinfo_types` reported for each track as text
+# KOMPLETE_INSTANCE only makes use of the first slot
+TEXT_FIELDS = ("NAME", "VOLUME", "PAN", "KOMPLETE_INSTANCE")
+
+# Value of a numeric field whose state on the device is unknown
+UNKNOWN = 255
+
+# Position of the first slot of each field on the numeric array and on the text tuple
+_NUMERIC_OFFSETS = {field: index * SLOTS for index, field in enumerate(NUMERIC_FIELDS)}
+_TEXT_OFFSETS = {field: index * SLOTS for index, field in enumerate(TEXT_FIELDS)}
+
+# (field, slot) pair of each position of the numeric array and of the text tuple
+_NUMERIC_PAIRS = tuple((field, slot) for field in NUMERIC_FIELDS for slot in range(SLOTS))
+_TEXT_PAIRS = tuple((field, slot) for field in TEXT_FIELDS for slot in range(SLOTS))
+
+_EMPTY_NUMBERS = bytes([UNKNOWN] * len(_NUMERIC_PAIRS))
+_EMPTY_TEXTS = (None, ) * len(_TEXT_PAIRS)
+
+# Length prefix of each text on the serialised state. 0xFFFF stands for an unknown text
+_LENGTH = struct.Struct("<H")
+_NO_TEXT = 0xFFFF
+
+###########################################################################################################################################
+# Surface state
+###########################################################################################################################################
+
+class SurfaceState:
+    """ State of the 8 tracks being displayed on the device. Numeric fields live on a single `bytearray` and texts on a single list, both laid out
+    field by field, so a whole state can be copied and compared at once.
+
+    Every field starts as unknown (`UNKNOWN` for numbers and None for texts), which never matches any value that could be set.
+    """
+
+    __slots__ = ("numbers", "texts")
+
+    def __init__(self, numbers: bytes = _EMPTY_NUMBERS, texts = _EMPTY_TEXTS):
+        self.numbers = bytearray(numbers)
+        self.texts = list(texts)
+
+    def get(self, field: str, slot: int):
+        """ Returns the value of a field for a slot, or None if it's unknown. """
+        if field in _NUMERIC_OFFSETS:
+            value = self.numbers[_NUMERIC_OFFSETS[field] + slot]
+            return None if value == UNKNOWN else value
+
+        return self.texts[_TEXT_OFFSETS[field] + slot]
+
+    def set(self, field: str, slot: int, value) -> bool:
+        """ Sets the value of a field for a slot.
+
+        ### Arguments
+         - field (str): One of `NUMERIC_FIELDS` or `TEXT_FIELDS`.
+         - slot (int): From 0 to 7.
+         - value: Integer from 0 to 127 (or bool) for numeric fields and str for text fields.
+
+        ### Returns
+         - bool: True if the value changed.
+        """
+        offset = _NUMERIC_OFFSETS.get(field)
+        if offset is not None:
+            index = offset + slot
+            if self.numbers[index] == value:
+                return False
+            self.numbers[index] = value
+            return True
+
+        index = _TEXT_OFFSETS[field] + slot
+        if self.texts[index] == value:
+            return False
+        self.texts[index] = value
+        return True
+
+    def forget(self, field: str, slot: int):
+        """ Sets a field of a slot as unknown. """
+        if field in _NUMERIC_OFFSETS:
+            self.numbers[_NUMERIC_OFFSETS[field] + slot] = UNKNOWN
+        else:
+            self.texts[_TEXT_OFFSETS[field] + slot] = None
+
+    def clear(self):
+        """ Sets every field of every slot as unknown. """
+        self.numbers[:] = _EMPTY_NUMBERS
+        self.texts[:] = _EMPTY_TEXTS
+
+    def merge(self, other: "SurfaceState"):
+        """ Takes every value known on another state, leaving the fields it doesn't know as they are. """
+        numbers = self.numbers
+        for index, value in enumerate(other.numbers):
+            if value != UNKNOWN:
+                numbers[index] = value
+
+        texts = self.texts
+        for index, text in enumerate(other.texts):
+            if text is not None:
+                texts[index] = text
+
+    def snapshot(self) -> "SurfaceState":
+        """ Returns an independent copy of the state. """
+        return SurfaceState(self.numbers, self.texts)
+
+    def diff(self, other: "SurfaceState") -> list:
+        """ Compares this state with another one.
+
+        ### Returns
+         - list: (field, slot) pairs whose value is different on this state, numeric fields first and in the order of `NUMERIC_FIELDS`
+         and `TEXT_FIELDS`.
+        """
+        changes = []
+
+        # Comparing the whole array at once is a single memory comparison, so identical states cost almost nothing
+        numbers, otherNumbers = self.numbers, other.numbers
+        if numbers != otherNumbers:
+            changes.extend(_NUMERIC_PAIRS[index] for index, value in enumerate(numbers) if value != otherNumbers[index])
+
+        texts, otherTexts = self.texts, other.texts
+        if texts != otherTexts:
+            changes.extend(_TEXT_PAIRS[index] for index, value in enumerate(texts) if value != otherTexts[index])
+
+        return changes
+
+    def render(self, changes, mask: int = None) -> list:
+        """ Builds the messages that make the device show the values of this state for the given (field, slot) pairs,
+        like the ones returned by `diff()`. Unknown values are skipped.
+
+        ### Arguments
+         - changes: Iterable of (field, slot) pairs.
+         - mask (int): Capability bitmask of the device, as used by `nihia.profiles`. Fields the device can't make use of are skipped.
+
+        ### Returns
+         - list: Full MIDI messages in bytes, ready for `nihia.framesOut`.
+        """
+        from nihia import mixer
+
+        frames = []
+        for field, slot in changes:
+            if mask is not None and not mask >> mixer.mixerinfo_types[field] & 1:
+                continue
+
+            value = self.get(field, slot)
+            if value is None:
+                continue
+
+            if field == "VOLUME_GRAPH" or field == "PAN_GRAPH":
+                frames.append(bytes((191, mixer.mixerinfo_types[field] + slot, value)))
+            elif field == "NAME":
+                frames.append(mixer.buildTrackInfo(field, 0, slot, mixer.names.encodeName(value)))
+            elif field in _TEXT_OFFSETS:
+                frames.append(mixer.buildTrackInfo(field, 0, slot, value))
+            else:
+                frames.append(mixer.buildTrackInfo(field, value, slot))
+
+        return frames
+
+    def toBytes(self) -> bytes:
+        """ Serialises the state: the numeric array followed by each text as its length in 2 bytes and its UTF-8 bytes. """
+        parts = [bytes(self.numbers)]
+        for text in self.texts:
+            if text is None:
+                parts.append(_LENGTH.pack(_NO_TEXT))
+            else:
+                encoded = text.encode("UTF-8")
+                parts.append(_LENGTH.pack(len(encoded)))
+                parts.append(encoded)
+
+        return b"".join(parts)
+
+    @classmethod
+    def fromBytes(cls, data: bytes) -> "SurfaceState":
+        """ Rebuilds a state serialised with `toBytes()`. """
+        position = len(_EMPTY_NUMBERS)
+        numbers = data[:position]
+
+        texts = []
+        for _ in range(len(_EMPTY_TEXTS)):
+            length, = _LENGTH.unpack_from(data, position)
+            position += _LENGTH.size
+
+            if length == _NO_TEXT:
+                texts.append(None)
+            else:
+                texts.append(data[position:position + length].decode("UTF-8"))
+                position += length
+
+        return cls(numbers, texts)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, SurfaceState) and self.numbers == other.numbers and self.texts == other.texts
@@ -0,0 +1,70 @@
+# MIT License
+
+# Copyright (c) 2024 Pablo Peral
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Shared fixtures of the tests of flmidi-nihia. The layer is loaded as the `nihia` package with the stand-in `device` module of the
+`standin` folder, and every test starts with the layer as FL Studio would load it.
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+from harness import loadNihia
+
+nihia = loadNihia()
+
+import device
+
+@pytest.fixture(autouse=True)
+def fresh():
+    """ Puts every submodule with state back to how it starts and forgets the messages sent by previous tests. """
+    from nihia import buttons, connection, mixer, profiles, scheduler
+
+    nihia._sink = None
+    nihia._backend = None
+
+    scheduler.clear()
+    scheduler._enabled = False
+
+    connection._state = connection.DISCONNECTED
+    connection._held.clear()
+    connection._heldSink = None
+    connection._readyHandlers.clear()
+    connection._giveUpHandlers.clear()
+
+    mixer._invalidateHandlers.clear()
+    profiles.setProfile(None)
+    mixer.enableStateCache(False)
+    buttons._lights[:] = bytes([255] * 128)
+    buttons.forgetLights()
+
+    device.reset()
+    yield device
+
+@pytest.fixture
+def sent():
+    """ Function that returns the bytes of every message the stand-in device has received so far. """
+    return lambda: [message.data for message in device.sent]
@@ -0,0 +1,89 @@
+# MIT License
+
+# Copyright (c) 2024 Pablo Peral
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Tests of the knob acceleration of `nihia.acceleration`.
+"""
+
+import pytest
+
+from nihia import acceleration, events, mixer, profiles
+
+def test_turns_up_and_down_cancel_each_other():
+    engine = acceleration.KnobEngine()
+    knob = mixer.knobs[0][0]
+
+    assert engine.delta(63) == -engine.delta(65)
+
+    for _ in range(5):
+        engine.feedRaw(knob, 63)
+        engine.feed(events.decode(knob, 65))
+
+    assert engine.drain() == {}
+
+def test_turns_are_accumulated_per_knob():
+    engine = acceleration.KnobEngine(acceleration.linearCurve(1, 1))
+
+    engine.feedRaw(mixer.knobs[0][0], 0)
+    engine.feedRaw(mixer.knobs[0][0], 0)
+    engine.feedRaw(mixer.knobs[1][0], 127)
+
+    assert engine.drain() == {(0, "VOLUME"): 2, (0, "PAN"): -1}
+    assert engine.drain() == {}
+
+def test_curves_have_64_steps():
+    assert len(acceleration.linearCurve(1, 2)) == 64
+    assert len(acceleration.exponentialCurve(1, 2)) == 64
+
+    with pytest.raises(ValueError):
+        acceleration.KnobEngine((1.0, ))
+
+def test_attached_engine_gets_decoded_events():
+    engine = acceleration.KnobEngine(acceleration.linearCurve(1, 1))
+    engine.attach()
+
+    try:
+        events.dispatch(events.decode(mixer.knobs[0][3], 65))
+    finally:
+        engine.detach()
+
+    assert engine.drain() == {(3, "VOLUME"): -1}
+
+def test_curve_is_only_used_on_speed_sensitive_series():
+    engine = acceleration.KnobEngine(acceleration.linearCurve(1, 8))
+    knob = mixer.knobs[0][0]
+
+    profiles.setProfile("A_SERIES")
+    engine.feedRaw(knob, 63)
+    engine.feed(events.decode(knob, 65))
+    assert engine.delta(63) == 1
+    assert engine.drain() == {}
+
+    engine.feedRaw(knob, 63)
+    engine.feed(events.decode(knob, 63))
+    assert engine.drain() == {(0, "VOLUME"): 2}
+
+    profiles.setProfile("S_MK2")
+    engine.feedRaw(knob, 63)
+    engine.feed(events.decode(knob, 63))
+    assert engine.delta(63) == 8
+    assert engine.drain() == {(0, "VOLUME"): 16}
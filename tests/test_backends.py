@@ -0,0 +1,78 @@
+# MIT License
+
+# Copyright (c) 2024 Pablo Peral
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Tests of the backends of `nihia.backends`.
+"""
+
+import io
+import os
+
+import pytest
+
+import nihia
+from nihia import backends, mixer
+
+def test_messages_go_to_the_backend_instead_of_the_device(sent):
+    log = io.BytesIO()
+    backends.setBackend(backends.FileBackend(log))
+
+    assert backends.getBackend() is nihia._backend
+    nihia.dataOut(16, 1)
+    mixer.setTrackName(0, "Kick")
+    nihia.writeFrames([bytes((191, 17, 0))])
+
+    assert sent() == []
+    assert log.getvalue() == bytes((191, 16, 1)) + mixer.buildTrackInfo("NAME", 0, 0, "Kick") + bytes((191, 17, 0))
+
+def test_fl_studio_backend_writes_to_the_device(sent):
+    backends.setBackend(backends.FLStudioBackend())
+    nihia.framesOut([bytes((191, 16, 1)), mixer.buildTrackInfo("NAME", 0, 0, "Kick")])
+
+    assert sent() == [bytes((191, 16, 1)), mixer.buildTrackInfo("NAME", 0, 0, "Kick")]
+
+def test_setting_no_backend_goes_back_to_the_device(sent):
+    backends.setBackend(backends.FileBackend(io.BytesIO()))
+    backends.setBackend(None)
+    nihia.dataOut(16, 1)
+
+    assert sent() == [bytes((191, 16, 1))]
+
+@pytest.mark.skipif(not hasattr(os, "mkfifo"), reason="needs named pipes")
+def test_rawmidi_backend_reports_partial_writes(tmp_path):
+    path = str(tmp_path / "midi")
+    os.mkfifo(path)
+
+    reader = os.open(path, os.O_RDONLY | os.O_NONBLOCK)
+    backend = backends.RawMidiBackend(path, blocking=False)
+
+    try:
+        frame = bytes(1000)
+        with pytest.raises(BlockingIOError) as error:
+            for _ in range(10000):
+                backend.write([frame])
+
+        # Whatever got through before the pipe filled up is reported, and it's never more than the batch
+        assert 0 <= error.value.characters_written <= len(frame)
+    finally:
+        backend.close()
+        os.close(reader)
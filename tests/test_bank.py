@@ -0,0 +1,98 @@
+# MIT License
+
+# Copyright (c) 2024 Pablo Peral
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Tests of the bank updates of `nihia.mixer`.
+"""
+
+import pytest
+
+from nihia import mixer
+
+BANK = [
+    {"exist": 1, "name": "Insert %d" % (track + 1), "vol": "-3.2 dB", "pan": "Centered", "mute": False, "solo": track == 3,
+     "arm": False, "sel": track == 0, "mutedBySolo": False, "volGraph": 0.8, "panGraph": 0.0}
+    for track in range(8)
+]
+
+def _refresh(bank):
+    """ Sends a bank the way scripts did before `setBank`, one setter at a time. """
+    for track, fields in enumerate(bank):
+        mixer.setTrackExist(track, fields["exist"])
+        mixer.setTrackSel(track, fields["sel"])
+        mixer.setTrackMute(track, fields["mute"])
+        mixer.setTrackSolo(track, fields["solo"])
+        mixer.setTrackArm(track, fields["arm"])
+        mixer.setTrackMutedBySolo(track, fields["mutedBySolo"])
+        mixer.setTrackVolGraph(track, fields["volGraph"])
+        mixer.setTrackPanGraph(track, fields["panGraph"])
+        mixer.setTrackName(track, fields["name"])
+        mixer.setTrackVol(track, fields["vol"])
+        mixer.setTrackPan(track, fields["pan"])
+
+def test_set_bank_sends_the_same_messages_as_the_setters(fresh, sent):
+    _refresh(BANK)
+    expected = sorted(sent())
+
+    mixer.invalidateState()
+    fresh.reset()
+    mixer.setBank(BANK)
+
+    assert sorted(sent()) == expected
+
+def test_set_bank_sends_existence_first(sent):
+    mixer.setBank(BANK)
+
+    frames = sent()
+    exist = mixer._FRAME_PREFIXES["EXIST"]
+    assert all(frame.startswith(exist) for frame in frames[:8])
+    assert not any(frame.startswith(exist) for frame in frames[8:])
+
+def test_set_bank_repairs_single_track_updates(sent):
+    for cached in (False, True):
+        mixer.enableStateCache(cached)
+
+        mixer.setBank([{"name": "A"}])
+        mixer.setTrackName(0, "X")
+        mixer.setBank([{"name": "A"}])
+
+        assert sent()[-1] == mixer.buildTrackInfo("NAME", 0, 0, "A")
+
+def test_set_bank_skips_what_the_mirror_knows(sent):
+    mixer.enableStateCache()
+
+    assert mixer.setBank(BANK) == len(sent())
+    assert mixer.setBank(BANK) == 0
+
+def test_set_bank_leaves_missing_tracks_and_fields_untouched(sent):
+    mixer.setBank([None, {"mute": True}])
+
+    assert sent() == [mixer.buildTrackInfo("IS_MUTE", True, 1)]
+
+def test_set_bank_takes_track_types_by_name(sent):
+    mixer.setBank([{"exist": "AUDIO"}])
+
+    assert sent() == [mixer.buildTrackInfo("EXIST", mixer.track_types["AUDIO"], 0)]
+
+def test_set_bank_takes_8_tracks_at_most():
+    with pytest.raises(ValueError):
+        mixer.setBank([{}] * 9)
@@ -0,0 +1,62 @@
+# MIT License
+
+# Copyright (c) 2024 Pablo Peral
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Tests of the button lights of `nihia.buttons`.
+"""
+
+import nihia
+from nihia import buttons
+
+def test_set_lights_only_sends_what_changed(sent):
+    assert buttons.setLights({"PLAY": 1, "REC": 0}) == 2
+    assert buttons.setLights({"PLAY": 1, "REC": 1}) == 1
+
+    assert sent() == [bytes((191, 16, 1)), bytes((191, 18, 0)), bytes((191, 18, 1))]
+
+def test_set_light_is_recorded(sent):
+    buttons.setLight("PLAY", 1)
+
+    assert buttons.setLights({"PLAY": 1}) == 0
+    assert len(sent()) == 1
+
+def test_repaint_sends_every_known_light(fresh, sent):
+    buttons.setLights({"PLAY": 1, "REC": 0})
+    fresh.reset()
+
+    assert buttons.repaintLights() == 2
+    assert sent() == [bytes((191, 16, 1)), bytes((191, 18, 0))]
+
+def test_handshake_resends_the_lights_on_the_next_set(sent):
+    buttons.setLights({"PLAY": 1, "REC": 1})
+    nihia.handShake()
+
+    assert buttons.setLights({"PLAY": 1, "REC": 1}) == 2
+
+def test_repaint_after_handshake_sends_the_known_lights(fresh, sent):
+    buttons.setLights({"PLAY": 1, "REC": 0})
+    nihia.handShake()
+    fresh.reset()
+
+    assert buttons.repaintLights() == 2
+    assert sent() == [bytes((191, 16, 1)), bytes((191, 18, 0))]
+    assert buttons.setLights({"PLAY": 1, "REC": 0}) == 0
@@ -0,0 +1,174 @@
+# MIT License
+
+# Copyright (c) 2024 Pablo Peral
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Tests of the handshake and the hold of updates of `nihia.connection`.
+"""
+
+import nihia
+from nihia import connection, mixer
+
+HANDSHAKE = bytes((191, connection.HELLO, connection.PROTOCOL_VERSION))
+
+def test_updates_are_held_until_the_device_answers(sent):
+    connection.connect(now=0)
+    mixer.setTrackName(0, "Kick")
+    mixer.setTrackName(0, "Bass")
+
+    assert connection.getState() == connection.HANDSHAKING
+    assert sent() == [HANDSHAKE]
+
+    assert connection.feed(connection.HELLO, 3)
+    assert connection.isReady()
+    assert sent() == [HANDSHAKE, mixer.buildTrackInfo("NAME", 0, 0, "Bass")]
+
+def test_updates_are_sent_as_usual_once_ready(sent):
+    connection.connect(now=0)
+    connection.feed(connection.HELLO, 3)
+    mixer.setTrackName(0, "Kick")
+
+    assert sent()[-1] == mixer.buildTrackInfo("NAME", 0, 0, "Kick")
+
+def test_ready_handlers_are_called(sent):
+    called = []
+    connection.addReadyHandler(lambda: called.append(True))
+
+    connection.connect(now=0)
+    connection.feed(connection.HELLO, 3)
+
+    assert called == [True]
+
+def test_handshake_is_retried_with_backoff(sent):
+    connection.connect(timeout=1, retries=2, backoff=2, now=0)
+
+    connection.onIdle(0.5)
+    assert sent() == [HANDSHAKE]
+
+    connection.onIdle(1)
+    connection.onIdle(2.5)
+    assert sent() == [HANDSHAKE, HANDSHAKE]
+
+    connection.onIdle(3)
+    assert sent() == [HANDSHAKE, HANDSHAKE, HANDSHAKE]
+
+def test_giving_up_releases_the_held_updates(sent):
+    gaveUp = []
+    connection.addGiveUpHandler(lambda: gaveUp.append(True))
+
+    connection.connect(timeout=1, retries=0, now=0)
+    mixer.setTrackName(0, "Kick")
+    connection.onIdle(1)
+
+    assert connection.getState() == connection.DISCONNECTED
+    assert gaveUp == [True]
+    assert nihia._sink is None
+    assert sent() == [HANDSHAKE, mixer.buildTrackInfo("NAME", 0, 0, "Kick")]
+
+    mixer.setTrackName(0, "Bass")
+    assert sent()[-1] == mixer.buildTrackInfo("NAME", 0, 0, "Bass")
+
+def test_disconnect_drops_the_held_updates(sent):
+    connection.connect(now=0)
+    mixer.setTrackName(0, "Kick")
+    connection.disconnect()
+
+    assert connection.getState() == connection.GOODBYE
+    assert sent() == [HANDSHAKE, bytes((191, connection.BYE, 1))]
+
+def test_held_updates_go_through_the_previous_sink(sent):
+    from nihia import scheduler
+
+    scheduler.enable()
+    connection.connect(now=0)
+    mixer.setTrackName(0, "Kick")
+    connection.feed(connection.HELLO, 3)
+
+    assert nihia._sink is scheduler.push
+    assert sent() == [HANDSHAKE]
+
+    scheduler.onIdle()
+    assert sent() == [HANDSHAKE, mixer.buildTrackInfo("NAME", 0, 0, "Kick")]
+
+def test_onidle_reads_the_answer_from_the_backend(sent):
+    from nihia import backends
+
+    class AnsweringBackend(backends.FLStudioBackend):
+        def read(self):
+            return bytes((191, connection.HELLO, 4))
+
+    backends.setBackend(AnsweringBackend())
+    connection.connect(now=0)
+    connection.onIdle(0.1)
+
+    assert connection.isReady()
+    assert connection.protocolVersion == 4
+
+def test_scheduler_enabled_while_handshaking_keeps_the_hold(sent):
+    from nihia import scheduler
+
+    connection.connect(now=0)
+    scheduler.enable()
+    mixer.setTrackName(0, "Kick")
+    scheduler.onIdle()
+
+    assert sent() == [HANDSHAKE]
+
+    connection.feed(connection.HELLO, 3)
+    assert nihia._sink is scheduler.push
+    assert sent() == [HANDSHAKE]
+
+    scheduler.onIdle()
+    assert sent() == [HANDSHAKE, mixer.buildTrackInfo("NAME", 0, 0, "Kick")]
+
+def test_scheduler_disabled_while_handshaking_keeps_the_hold(sent):
+    from nihia import scheduler
+
+    scheduler.enable()
+    mixer.setTrackName(1, "Snare")
+    connection.connect(now=0)
+    scheduler.disable()
+    mixer.setTrackName(0, "Kick")
+
+    assert sent() == [HANDSHAKE]
+
+    connection.feed(connection.HELLO, 3)
+    assert nihia._sink is None
+    assert scheduler.pending() == 0
+    assert sent() == [HANDSHAKE, mixer.buildTrackInfo("NAME", 0, 1, "Snare"), mixer.buildTrackInfo("NAME", 0, 0, "Kick")]
+
+    mixer.setTrackName(0, "Bass")
+    assert sent()[-1] == mixer.buildTrackInfo("NAME", 0, 0, "Bass")
+
+def test_queued_updates_are_held_on_connect(sent):
+    from nihia import scheduler
+
+    scheduler.enable()
+    mixer.setTrackName(0, "Kick")
+    connection.connect(now=0)
+    scheduler.onIdle()
+
+    assert scheduler.pending() == 0
+    assert sent() == [HANDSHAKE]
+
+    connection.feed(connection.HELLO, 3)
+    scheduler.onIdle()
+    assert sent() == [HANDSHAKE, mixer.buildTrackInfo("NAME", 0, 0, "Kick")]
@@ -0,0 +1,88 @@
+# MIT License
+
+# Copyright (c) 2024 Pablo Peral
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Tests of the decoding tables of `nihia.events`.
+"""
+
+from nihia import buttons, events, mixer
+
+def test_buttons_are_decoded():
+    assert events.decode(buttons.button_list["PLAY"], 1) == events.ButtonEvent("PLAY", 1)
+
+def test_unknown_messages_are_ignored():
+    known = set(buttons.button_list.values()) | set(mixer.knobs[0]) | set(mixer.knobs[1])
+    unknown = next(data1 for data1 in range(128) if data1 not in known)
+
+    assert events.decode(unknown, 1) is None
+    assert events.decode(buttons.button_list["ENCODER_X_A"], 5) is None
+
+def test_knobs_are_decoded_for_both_modes():
+    assert events.decode(mixer.knobs[0][2], 1) == events.KnobEvent(2, "VOLUME", 1, 1)
+    assert events.decode(mixer.knobs[1][2], 127) == events.KnobEvent(2, "PAN", -1, 0)
+
+def test_knob_speeds_cover_the_full_range_in_both_directions():
+    knob = mixer.knobs[0][0]
+
+    assert events.decode(knob, 0).speed == 0
+    assert events.decode(knob, 63).speed == 63
+    assert events.decode(knob, 127).speed == 0
+    assert events.decode(knob, 65).speed == 63
+
+    speeds = [events.decode(knob, data2).speed for data2 in range(127, 64, -1)]
+    assert speeds == sorted(speeds)
+
+def test_encoder_axis_depends_on_the_series():
+    right = buttons.button_list["RIGHT"]
+
+    events.setSeries("S")
+    assert events.decode(buttons.button_list["ENCODER_X_S"], right) == events.EncoderEvent("ENCODER_X", "RIGHT")
+
+    events.setSeries("A")
+    assert events.decode(buttons.button_list["ENCODER_X_A"], right) == events.EncoderEvent("ENCODER_X", "RIGHT")
+
+def test_handlers_get_their_kind_of_event():
+    received = []
+    events.addHandler(events.ButtonEvent, received.append)
+
+    try:
+        assert events.dispatch(events.ButtonEvent("PLAY", 1))
+        assert not events.dispatch(events.KnobEvent(0, "VOLUME", 1, 1))
+    finally:
+        events.removeHandler(events.ButtonEvent, received.append)
+
+    assert received == [events.ButtonEvent("PLAY", 1)]
+
+def test_fl_studio_events_are_marked_as_handled(fresh):
+    received = []
+    events.addHandler(events.KnobEvent, received.append)
+
+    try:
+        handled = fresh.MidiEvent(bytes((events.STATUS, mixer.knobs[0][0], 65)))
+        other = fresh.MidiEvent(bytes((0x90, 60, 100)))
+
+        assert events.onMidiMsg(handled) and handled.handled
+        assert not events.onMidiMsg(other) and not other.handled
+    finally:
+        events.removeHandler(events.KnobEvent, received.append)
+
+    assert received == [events.KnobEvent(0, "VOLUME", -1, 63)]
@@ -0,0 +1,68 @@
+# MIT License
+
+# Copyright (c) 2024 Pablo Peral
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Tests of the volume and pan arrows of `nihia.mixer`.
+"""
+
+import pytest
+
+import nihia
+from nihia import mixer
+
+def test_arrows_are_never_sent_twice(sent):
+    mixer.setTrackVolGraph(0, 0.5)
+    mixer.setTrackVolGraph(0, 0.5)
+    assert mixer.setTrackVolGraphs([0.5, 0.25]) == 1
+
+    assert len(sent()) == 2
+
+def test_handshake_forgets_the_arrows(sent):
+    mixer.setTrackVolGraph(0, 0.5)
+    nihia.handShake()
+    mixer.setTrackVolGraph(0, 0.5)
+
+    assert sent() == [bytes((191, 80, 63)), bytes((191, 1, 3)), bytes((191, 80, 63))]
+
+def test_positions_are_clamped_to_the_range():
+    assert mixer._volGraphPosition(-0.5) == 0
+    assert mixer._volGraphPosition(1.5) == 127
+    assert mixer._panGraphPosition(-1) == 0
+    assert mixer._panGraphPosition(0) == 64
+    assert mixer._panGraphPosition(1) == 127
+
+def test_batches_only_send_the_arrows_that_moved(sent):
+    mixer.setTrackPanGraphs([0.0] * 8)
+
+    assert mixer.setTrackPanGraphs([0.0, None, 1.0] + [0.0] * 5) == 1
+    assert sent()[-1] == bytes((191, mixer.mixerinfo_types["PAN_GRAPH"] + 2, 127))
+
+def test_more_than_8_arrows_are_rejected(sent):
+    with pytest.raises(ValueError):
+        mixer.setTrackVolGraphs([0.5] * 9)
+
+    with pytest.raises(ValueError):
+        mixer.setTrackPanGraphs([0.0] * 9)
+
+    assert sent() == []
+    mixer.setTrackPanGraph(0, 0.0)
+    assert len(sent()) == 1
@@ -0,0 +1,66 @@
+# MIT License
+
+# Copyright (c) 2024 Pablo Peral
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Tests of the lazy loading of the `nihia` package, run on fresh interpreters so the modules loaded by other tests don't get in the way.
+"""
+
+import os
+import subprocess
+import sys
+
+_BENCHMARKS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks")
+
+def _run(code: str):
+    """ Runs some code on a fresh interpreter with the layer loaded as `nihia`, failing if any of its assertions do. """
+    probe = "import sys\nsys.path.insert(0, %r)\nfrom harness import loadNihia\nnihia = loadNihia()\n" % _BENCHMARKS
+    subprocess.run([sys.executable, "-c", probe + code], check=True)
+
+def test_package_loads_nothing_else():
+    _run(
+        "assert 'device' not in sys.modules\n"
+        "assert not [name for name in sys.modules if name.startswith('nihia.')]\n"
+    )
+
+def test_first_message_binds_the_device():
+    _run(
+        "assert nihia._device is None\n"
+        "nihia.dataOut(16, 1)\n"
+        "import device\n"
+        "assert nihia._device is device\n"
+        "assert [message.data for message in device.sent] == [bytes((191, 16, 1))]\n"
+    )
+
+def test_mixer_doesnt_load_unicodedata():
+    _run(
+        "from nihia import mixer\n"
+        "mixer.setTrackName(0, 'Kick')\n"
+        "assert 'unicodedata' not in sys.modules\n"
+    )
+
+def test_star_import_only_takes_the_original_submodules():
+    _run(
+        "namespace = {}\n"
+        "exec('from nihia import *', namespace)\n"
+        "assert sorted(name for name in namespace if not name.startswith('__')) == ['buttons', 'mixer']\n"
+        "assert 'nihia.backends' not in sys.modules and 'nihia.connection' not in sys.modules\n"
+    )
@@ -0,0 +1,127 @@
+# MIT License
+
+# Copyright (c) 2024 Pablo Peral
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Tests of the Komplete Kontrol instance finder of `nihia.instances`.
+"""
+
+import pytest
+
+from nihia import connection, instances, mixer
+
+class _Mixer:
+    """ Instances on each mixer track, counting how many times each track is looked through. """
+
+    def __init__(self, ids: dict):
+        self.ids = ids
+        self.scans = []
+
+    def scan(self, track: int) -> str:
+        self.scans.append(track)
+        return self.ids.get(track, "")
+
+@pytest.fixture
+def tracks():
+    return _Mixer({1: "NIKB01", 2: "NIKB02"})
+
+def test_tracks_are_only_looked_through_once(tracks, sent):
+    finder = instances.InstanceFinder(tracks.scan)
+
+    assert finder.select(1)
+    assert finder.select(2)
+    assert finder.select(1)
+    assert finder.resolve(3) == ""
+    assert finder.resolve(3) == ""
+
+    assert tracks.scans == [1, 2, 3]
+    assert len(sent()) == 3
+
+def test_same_instance_is_not_reported_again(tracks, sent):
+    tracks.ids[3] = "NIKB01"
+    finder = instances.InstanceFinder(tracks.scan)
+
+    assert finder.select(1)
+    assert not finder.select(3)
+    assert len(sent()) == 1
+
+def test_dirty_tracks_are_looked_through_lazily(tracks):
+    finder = instances.InstanceFinder(tracks.scan)
+    finder.select(1)
+    finder.resolve(2)
+
+    # Marking tracks as dirty doesn't look through anything by itself
+    finder.markDirty(2)
+    finder.markDirty(5)
+    assert tracks.scans == [1, 2]
+
+    # Nor does refreshing while the selected track is clean
+    assert not finder.refresh()
+    assert tracks.scans == [1, 2]
+
+    tracks.ids[2] = "NIKB03"
+    assert finder.resolve(2) == "NIKB03"
+    assert tracks.scans == [1, 2, 2]
+
+def test_refresh_reports_the_new_instance_of_the_selected_track(tracks, sent):
+    finder = instances.InstanceFinder(tracks.scan)
+    finder.select(1)
+
+    tracks.ids[1] = "NIKB04"
+    finder.markDirty(1)
+
+    assert finder.refresh()
+    assert not finder.refresh()
+    assert sent()[-1] == mixer.buildTrackInfo("KOMPLETE_INSTANCE", 0, 0, "NIKB04")
+    assert tracks.scans == [1, 1]
+
+def test_marking_every_track_as_dirty(tracks):
+    finder = instances.InstanceFinder(tracks.scan)
+    finder.select(1)
+    finder.resolve(2)
+
+    finder.markDirty(-1)
+    finder.refresh()
+    finder.resolve(2)
+
+    assert tracks.scans == [1, 2, 1, 2]
+
+def test_instance_is_reported_again_after_reconnecting(tracks, sent):
+    finder = instances.InstanceFinder(tracks.scan)
+    finder.select(1)
+
+    connection.connect(now=0)
+    connection.disconnect()
+    before = len(sent())
+
+    assert finder.select(1)
+    assert len(sent()) == before + 1
+
+def test_refresh_reports_the_instance_again_after_invalidate(tracks, sent):
+    finder = instances.InstanceFinder(tracks.scan)
+    finder.select(1)
+
+    mixer.invalidateState()
+
+    assert finder.refresh()
+    assert not finder.refresh()
+    assert sent() == [mixer.buildTrackInfo("KOMPLETE_INSTANCE", 0, 0, "NIKB01")] * 2
+    assert tracks.scans == [1]
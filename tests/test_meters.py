@@ -0,0 +1,77 @@
+# MIT License
+
+# Copyright (c) 2024 Pablo Peral
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Tests of the peak meter engine of `nihia.meters`.
+"""
+
+from nihia import meters, mixer
+
+def _peak(values) -> bytes:
+    return mixer.buildTrackInfo("PEAK", 2, 0, bytes(values))
+
+def test_quantise_end_points_and_clamping():
+    assert meters.quantise([0, meters.MAX_PEAK]) == bytes((0, 127))
+    assert meters.quantise([-1, 5]) == bytes((0, 127))
+    assert meters.quantise([0.55]) == bytes((64, ))
+
+def test_small_changes_are_not_sent(sent):
+    engine = meters.MeterEngine(threshold=2, falloff=0, minInterval=0)
+
+    assert engine.update([0.5] * meters.CHANNELS, now=0)
+    assert not engine.update([0.51] + [0.5] * 15, now=0.1)
+    assert engine.update([0.52] + [0.5] * 15, now=0.2)
+
+    assert sent() == [_peak(meters.quantise([0.5] * 16)), _peak(meters.quantise([0.52] + [0.5] * 15))]
+
+def test_meters_are_sent_again_after_max_interval(sent):
+    engine = meters.MeterEngine(falloff=0, minInterval=0, maxInterval=1.0)
+
+    assert engine.update([0.5] * meters.CHANNELS, now=0)
+    assert not engine.update([0.5] * meters.CHANNELS, now=0.5)
+    assert engine.update([0.5] * meters.CHANNELS, now=1.0)
+    assert len(sent()) == 2
+
+def test_updates_at_the_min_interval_rate_are_all_sent(sent):
+    engine = meters.MeterEngine(falloff=0)
+
+    for frame in range(30):
+        engine.update([(frame % 2) * 0.5] * meters.CHANNELS, now=frame / 30)
+
+    assert len(sent()) == 30
+
+def test_peaks_are_held_and_then_fall(sent):
+    engine = meters.MeterEngine(threshold=1, holdTime=0.5, falloff=100, minInterval=0)
+
+    assert engine.update([meters.MAX_PEAK] * meters.CHANNELS, now=0)
+    assert not engine.update([0] * meters.CHANNELS, now=0.25)
+    assert engine.update([0] * meters.CHANNELS, now=1.0)
+
+    assert sent() == [_peak([127] * 16), _peak([77] * 16)]
+
+def test_meters_are_sent_again_after_invalidate(sent):
+    engine = meters.MeterEngine(falloff=0)
+
+    assert engine.update([0.5] * meters.CHANNELS, now=0)
+    mixer.invalidateState()
+    assert engine.update([0.5] * meters.CHANNELS, now=0.5)
+    assert len(sent()) == 2
@@ -0,0 +1,116 @@
+# MIT License
+
+# Copyright (c) 2024 Pablo Peral
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Tests of the traffic and latency counters of `nihia.metrics`.
+"""
+
+import io
+
+import pytest
+
+import nihia
+from nihia import connection, metrics, mixer, readouts, scheduler
+
+@pytest.fixture(autouse=True)
+def measured():
+    metrics.enable()
+    metrics.reset()
+    yield
+    metrics.disable()
+    metrics.reset()
+
+def test_messages_are_counted_by_kind(sent):
+    mixer.setTrackName(0, "Kick")
+    mixer.setTrackName(1, "Snare")
+    nihia.dataOut(16, 1)
+
+    data = metrics.summary()
+    assert data["messages"] == {"NAME": 2, "PLAY": 1}
+    assert data["bytes"]["NAME"] == sum(len(frame) for frame in sent()[:2])
+    assert data["bytes"]["PLAY"] == 3
+
+def test_merged_updates_are_counted_once_written(sent):
+    scheduler.enable()
+
+    mixer.setTrackName(0, "Kick")
+    mixer.setTrackName(0, "Bass")
+    assert metrics.summary()["messages"] == {}
+
+    scheduler.onIdle()
+    assert metrics.summary()["messages"] == {"NAME": 1}
+    assert len(sent()) == 1
+
+def test_held_updates_are_counted_once_released(sent):
+    connection.connect(now=0)
+    mixer.setTrackName(0, "Kick")
+    mixer.setTrackName(0, "Bass")
+    connection.feed(connection.HELLO, 3)
+
+    assert metrics.summary()["messages"] == {"HANDSHAKE": 1, "NAME": 1}
+    assert len(sent()) == 2
+
+def test_latency_is_measured_per_function():
+    mixer.setTrackName(0, "Kick")
+    mixer.setTrackName(0, "Kick")
+
+    latency = metrics.summary()["latency"]
+    assert latency["mixer.setTrackName"]["calls"] == 2
+    assert latency["mixer.setTrackName"]["total_ns"] > 0
+    assert "mixer.setTrackMute" not in latency
+
+def test_readouts_go_through_the_measured_senders():
+    readouts.volumeReadout().update(0, 0.8, now=0)
+
+    assert metrics.summary()["latency"]["mixer.setTrackVol"]["calls"] == 1
+
+def test_reset_keeps_measuring():
+    mixer.setTrackName(0, "Kick")
+    metrics.reset()
+    mixer.setTrackName(0, "Kick")
+
+    assert metrics.summary()["latency"]["mixer.setTrackName"]["calls"] == 1
+
+def test_disable_puts_the_originals_back():
+    measuredSetter = mixer.setTrackName
+    metrics.disable()
+
+    assert not metrics.isEnabled()
+    assert mixer.setTrackName is not measuredSetter
+    assert nihia.writeFrames.__module__ == "nihia"
+
+def test_goodbye_dumps_a_summary(monkeypatch):
+    output = io.StringIO()
+    monkeypatch.setattr(metrics, "dump", lambda file = None: print("summary", file=output))
+
+    nihia.goodBye()
+
+    assert output.getvalue() == "summary\n"
+
+def test_disconnect_dumps_a_summary(monkeypatch):
+    output = io.StringIO()
+    monkeypatch.setattr(metrics, "dump", lambda file = None: print("summary", file=output))
+
+    connection.connect(now=0)
+    connection.disconnect()
+
+    assert output.getvalue() == "summary\n"
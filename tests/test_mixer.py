@@ -0,0 +1,53 @@
+# MIT License
+
+# Copyright (c) 2024 Pablo Peral
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Tests of the device state mirror of `nihia.mixer`.
+"""
+
+from nihia import mixer
+
+def test_mirror_drops_repeated_updates(sent):
+    mixer.enableStateCache()
+
+    mixer.setTrackName(0, "Kick")
+    mixer.setTrackName(0, "Kick")
+    mixer.setTrackName(1, "Kick")
+    mixer.setTrackMute(0, True)
+    mixer.setTrackMute(0, True)
+
+    assert len(sent()) == 3
+
+def test_mirror_disabled_sends_everything(sent):
+    mixer.setTrackName(0, "Kick")
+    mixer.setTrackName(0, "Kick")
+
+    assert len(sent()) == 2
+
+def test_invalidate_state_sends_again(sent):
+    mixer.enableStateCache()
+
+    mixer.setTrackName(0, "Kick")
+    mixer.invalidateState()
+    mixer.setTrackName(0, "Kick")
+
+    assert len(sent()) == 2
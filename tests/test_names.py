@@ -0,0 +1,81 @@
+# MIT License
+
+# Copyright (c) 2024 Pablo Peral
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Tests of the name encoding of `nihia.names`.
+"""
+
+import pytest
+
+from nihia import names
+
+@pytest.fixture(autouse=True)
+def emptyCache():
+    names.clearCache()
+    yield
+    names.setDisplay()
+
+def test_names_are_sent_as_they_are_by_default():
+    assert names.encodeName("ドラム バス") == "ドラム バス".encode("UTF-8")
+    assert names.cacheInfo()["misses"] == 0
+
+def test_unprintable_characters_become_spaces():
+    assert names.encodeName("Kick\n1\t") == b"Kick 1 "
+
+def test_names_are_trimmed_by_characters():
+    names.setDisplay(3)
+
+    assert names.encodeName("Insert 1") == b"Ins"
+    assert names.encodeName("ドラム バス") == "ドラム".encode("UTF-8")
+    assert names.encodeName("Hi") == b"Hi"
+
+def test_names_are_transliterated():
+    names.setDisplay(transliterate=True)
+
+    assert names.encodeName("Batería acústica") == b"Bateria acustica"
+    assert names.encodeName("ドラム") == b"???"
+
+def test_cache_counts_hits_and_misses():
+    names.setDisplay(4)
+
+    names.encodeName("Insert 1")
+    names.encodeName("Insert 1")
+    names.encodeName("Insert 2")
+
+    info = names.cacheInfo()
+    assert (info["hits"], info["misses"], info["size"]) == (1, 2, 2)
+
+    names.clearCache()
+    assert names.cacheInfo()["size"] == 0
+
+def test_cache_size_can_be_changed():
+    names.setCacheSize(1)
+    names.setDisplay(4)
+
+    names.encodeName("Insert 1")
+    names.encodeName("Insert 2")
+    names.encodeName("Insert 1")
+
+    info = names.cacheInfo()
+    assert (info["hits"], info["misses"], info["size"], info["maxsize"]) == (0, 3, 1, 1)
+
+    names.setCacheSize(names.DEFAULT_CACHE_SIZE)
@@ -0,0 +1,243 @@
+# MIT License
+
+# Copyright (c) 2024 Pablo Peral
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Tests of the multi-keyboard backend of `nihia.outputs`.
+"""
+
+import pytest
+
+import nihia
+from nihia import backends, mixer, outputs, scheduler
+
+class _Keyboard(backends.Backend):
+    """ Keyboard that takes at most `room` bytes until it's given more, and answers with whatever is put on `input`. """
+
+    def __init__(self, room: int = None):
+        self.room = room
+        self.data = b""
+        self.input = b""
+
+    def write(self, frames):
+        data = b"".join(frames)
+        taken = data if self.room is None else data[:self.room]
+
+        self.data += taken
+        if self.room is not None:
+            self.room -= len(taken)
+
+        if len(taken) < len(data):
+            error = BlockingIOError()
+            error.characters_written = len(taken)
+            raise error
+
+    def read(self) -> bytes:
+        data = self.input
+        self.input = b""
+        return data
+
+class _Broken(backends.Backend):
+    def write(self, frames):
+        raise OSError("unplugged")
+
+def _state(data: bytes) -> dict:
+    """ What a keyboard ends up showing after taking a run of messages. """
+    return {scheduler.targetOf(frame): frame for frame in outputs._split(data)}
+
+def _group(*keyboards, **options) -> outputs.OutputGroup:
+    group = outputs.OutputGroup(**options)
+    for keyboard in keyboards:
+        group.add(keyboard, handshake=False)
+
+    backends.setBackend(group)
+    return group
+
+def test_every_keyboard_gets_the_same_bytes():
+    first, second = _Keyboard(), _Keyboard()
+    _group(first, second)
+
+    mixer.setTrackName(0, "Kick")
+    mixer.setTrackVolGraph(0, 0.5)
+
+    assert first.data == second.data
+    assert outputs._split(first.data)[0] == mixer.buildTrackInfo("NAME", 0, 0, "Kick")
+    assert outputs._split(first.data)[1][:2] == bytes((191, mixer.mixerinfo_types["VOLUME_GRAPH"]))
+
+def test_messages_already_shown_are_skipped_per_keyboard():
+    first, second = _Keyboard(), _Keyboard()
+    group = _group(first, second)
+
+    mixer.setTrackName(0, "Kick")
+    group.targets[1].forget()
+    mixer.setTrackName(0, "Kick")
+
+    assert len(outputs._split(first.data)) == 1
+    assert len(outputs._split(second.data)) == 2
+
+def test_keyboards_only_get_what_their_profile_uses():
+    full, light = _Keyboard(), _Keyboard()
+    group = outputs.OutputGroup()
+    group.add(full, handshake=False)
+    group.add(light, "A_SERIES", handshake=False)
+    backends.setBackend(group)
+
+    mixer.setTrackVolGraph(0, 0.5)
+    mixer.setTrackName(0, "Kick")
+
+    assert _state(full.data).keys() == {mixer.mixerinfo_types["VOLUME_GRAPH"], scheduler.targetOf(mixer.buildTrackInfo("NAME", 0, 0, "Kick"))}
+    assert outputs._split(light.data) == [mixer.buildTrackInfo("NAME", 0, 0, "Kick")]
+
+def test_blocked_keyboard_catches_up_without_holding_up_the_others():
+    fast, slow = _Keyboard(), _Keyboard(room=10)
+    group = _group(fast, slow)
+
+    mixer.setTrackName(0, "Kick")
+    assert group.onIdle() == 1
+
+    slow.room = None
+    assert group.onIdle() == 0
+    assert slow.data == fast.data
+
+def test_overflowed_keyboard_ends_up_showing_the_same_as_the_others():
+    fast, slow = _Keyboard(), _Keyboard(room=10)
+    group = _group(fast, slow, backlogLimit=64)
+
+    for index in range(40):
+        mixer.setTrackName(index % 8, "Track %d" % index)
+        mixer.setTrackVolGraph(index % 8, index / 40)
+
+    # Only the latest message for each target is kept past the limit
+    assert group.targets[1]._overflow
+    assert len(slow.data) + len(group.targets[1]._backlog) + sum(len(frame) for frame in group.targets[1]._overflow.values()) < len(fast.data)
+
+    slow.room = None
+    assert group.onIdle() == 0
+    assert _state(slow.data) == _state(fast.data)
+
+    # Once caught up, it's back to getting every new message right away
+    mixer.setTrackName(0, "Kick")
+    assert slow.data.endswith(mixer.buildTrackInfo("NAME", 0, 0, "Kick"))
+
+def test_failed_keyboard_doesnt_stop_the_others():
+    working = _Keyboard()
+    group = _group(_Broken(), working)
+
+    mixer.setTrackName(0, "Kick")
+    mixer.setTrackName(1, "Snare")
+
+    assert isinstance(group.targets[0].error, OSError)
+    assert len(outputs._split(working.data)) == 2
+
+def test_each_keyboard_answers_the_handshake_on_its_own(sent):
+    first, second = _Keyboard(), _Keyboard()
+    group = outputs.OutputGroup()
+    group.add(first)
+    group.add(second)
+    backends.setBackend(group)
+
+    nihia.handShake()
+    mixer.setTrackName(0, "Kick")
+    assert [target.ready for target in group.targets] == [False, False]
+
+    first.input = bytes((191, 1, 3))
+    assert group.read() == bytes((191, 1, 3))
+    assert [target.ready for target in group.targets] == [True, False]
+    assert first.data.endswith(mixer.buildTrackInfo("NAME", 0, 0, "Kick"))
+
+    # Only the latest message for each target is held
+    mixer.setTrackName(0, "Snare")
+    second.input = bytes((191, 1, 3))
+    group.onIdle()
+
+    assert second.data == bytes((191, 1, 3)) + mixer.buildTrackInfo("NAME", 0, 0, "Snare")
+
+def test_fl_studio_keyboard_doesnt_wait_for_the_handshake(sent):
+    other = _Keyboard()
+    group = outputs.OutputGroup()
+    group.add(backends.FLStudioBackend())
+    group.add(other)
+    backends.setBackend(group)
+
+    nihia.handShake()
+    mixer.setTrackName(0, "Kick")
+
+    assert [target.ready for target in group.targets] == [True, False]
+    assert sent() == [bytes((191, 1, 3)), mixer.buildTrackInfo("NAME", 0, 0, "Kick")]
+    assert other.data == bytes((191, 1, 3))
+
+def test_only_one_keyboard_can_use_fl_studio():
+    group = outputs.OutputGroup()
+    group.add(backends.FLStudioBackend())
+
+    with pytest.raises(ValueError):
+        group.add(backends.FLStudioBackend())
+
+def test_failed_keyboard_added_again_replaces_its_target():
+    keyboard = _Keyboard()
+    group = _group(keyboard)
+    failed = group.targets[0]
+    failed._fail(OSError("unplugged"))
+
+    target = group.add(keyboard, handshake=False)
+    mixer.setTrackName(0, "Kick")
+
+    assert group.targets == [target]
+    assert keyboard.data == mixer.buildTrackInfo("NAME", 0, 0, "Kick")
+
+def test_failed_fl_studio_keyboard_can_be_added_again():
+    class _BrokenFLStudio(backends.FLStudioBackend):
+        def write(self, frames):
+            raise OSError("unplugged")
+
+    group = outputs.OutputGroup()
+    group.add(_BrokenFLStudio())
+    backends.setBackend(group)
+    mixer.setTrackName(0, "Kick")
+
+    target = group.add(backends.FLStudioBackend())
+    assert group.targets == [target]
+
+def test_invalidate_sends_everything_again_to_every_keyboard():
+    first, second = _Keyboard(), _Keyboard()
+    _group(first, second)
+
+    mixer.setTrackName(0, "Kick")
+    mixer.invalidateState()
+    mixer.setTrackName(0, "Kick")
+
+    assert first.data == second.data == mixer.buildTrackInfo("NAME", 0, 0, "Kick") * 2
+
+def test_answer_split_across_reads_is_found():
+    keyboard = _Keyboard()
+    group = outputs.OutputGroup()
+    group.add(keyboard)
+    backends.setBackend(group)
+
+    nihia.handShake()
+
+    keyboard.input = bytes((191, 1))
+    group.onIdle()
+    assert not group.targets[0].ready
+
+    keyboard.input = bytes((3, ))
+    group.onIdle()
+    assert group.targets[0].ready
@@ -0,0 +1,81 @@
+# MIT License
+
+# Copyright (c) 2024 Pablo Peral
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Tests of the device profiles of `nihia.profiles`.
+"""
+
+import pytest
+
+from nihia import events, mixer, profiles
+
+def test_profile_drops_unsupported_messages(sent):
+    profiles.setProfile("A_SERIES")
+
+    mixer.setTrackVolGraph(0, 0.5)
+    mixer.sendPeakMeterData([0] * 16)
+    mixer.setBank([{"volGraph": 0.5, "name": "Kick"}])
+
+    assert sent() == [mixer.buildTrackInfo("NAME", 0, 0, "Kick")]
+
+def test_names_are_sent_whole_by_default(sent):
+    profiles.setProfile("A_SERIES")
+    mixer.setTrackName(0, "ドラム バス and a very long name")
+
+    assert sent() == [mixer.buildTrackInfo("NAME", 0, 0, "ドラム バス and a very long name")]
+
+def test_overrides_replace_the_values_of_the_profile(sent):
+    profiles.setProfile("S_MK3", screenWidth=4)
+    mixer.setTrackName(0, "Insert 1")
+
+    assert sent() == [mixer.buildTrackInfo("NAME", 0, 0, "Inse")]
+
+def test_changing_profile_sends_everything_again(sent):
+    mixer.enableStateCache()
+
+    mixer.setTrackName(0, "Kick")
+    profiles.setProfile("S_MK2")
+    mixer.setTrackName(0, "Kick")
+
+    assert len(sent()) == 2
+
+def test_profile_sets_the_encoder_series():
+    profiles.setProfile("S_MK2")
+    assert events._table is events._tables["S"]
+
+    profiles.setProfile(None)
+    assert events._table is events._tables["A"]
+    assert profiles.getProfile() is None
+    assert profiles.supports("PEAK")
+
+def test_unknown_profile_changes_nothing(sent):
+    mixer.enableStateCache()
+    profiles.setProfile("S_MK2")
+    mixer.setTrackName(0, "Kick")
+
+    with pytest.raises(KeyError):
+        profiles.setProfile("FOO")
+
+    mixer.setTrackName(0, "Kick")
+
+    assert profiles.getProfile() == "S_MK2"
+    assert len(sent()) == 1
@@ -0,0 +1,117 @@
+# MIT License
+
+# Copyright (c) 2024 Pablo Peral
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Tests of the rate-limited text readouts of `nihia.readouts`.
+"""
+
+import gc
+
+import pytest
+
+from nihia import connection, mixer, profiles, readouts
+
+def _volume(text: str, slot: int = 0) -> bytes:
+    return mixer.buildTrackInfo("VOLUME", 0, slot, text)
+
+def test_formatters():
+    assert readouts.dBText(0.8) == "0.0 dB"
+    assert readouts.dBText(1.0) == "+5.6 dB"
+    assert readouts.dBText(0.0) == "-inf dB"
+    assert readouts.panText(0.0) == "Centered"
+    assert readouts.panText(-0.25) == "25% Left"
+    assert readouts.percentText(0.78) == "78%"
+
+def test_pan_readout_has_a_center_step():
+    readout = readouts.panReadout(steps=128)
+
+    assert readout.textOf(0.0) == "Centered"
+    assert readout.textOf(2.0) == "100% Right"
+    assert readout.textOf(-2.0) == "100% Left"
+
+def test_identical_text_is_not_sent_again(sent):
+    readout = readouts.volumeReadout()
+
+    assert readout.update(0, 0.8, now=0)
+    assert not readout.update(0, 0.8, now=1)
+    assert sent() == [_volume("0.0 dB")]
+
+def test_updates_are_rate_limited_and_the_last_one_is_sent_on_idle(sent):
+    readout = readouts.volumeReadout(rate=10)
+
+    assert readout.update(0, 0.8, now=0)
+    assert not readout.update(0, 0.5, now=0.01)
+    assert not readout.update(0, 0.6, now=0.02)
+
+    # Other slots have their own budget
+    assert readout.update(1, 0.5, now=0.03)
+
+    assert readout.onIdle(now=0.05) == 0
+    assert readout.onIdle(now=0.1) == 1
+    assert readout.onIdle(now=0.3) == 0
+    assert sent() == [_volume("0.0 dB"), _volume(readout.textOf(0.5), 1), _volume(readout.textOf(0.6))]
+
+def test_going_back_to_the_shown_text_drops_the_held_one(sent):
+    readout = readouts.volumeReadout(rate=10)
+
+    readout.update(0, 0.8, now=0)
+    readout.update(0, 0.5, now=0.01)
+    readout.update(0, 0.8, now=0.02)
+
+    assert readout.onIdle(now=1) == 0
+    assert sent() == [_volume("0.0 dB")]
+
+def test_invalidating_the_mirror_resets_the_readouts(sent):
+    readout = readouts.volumeReadout()
+    readout.update(0, 0.8, now=0)
+
+    mixer.invalidateState()
+    assert readout.update(0, 0.8, now=0)
+
+    profiles.setProfile(None)
+    assert readout.update(0, 0.8, now=0)
+
+    connection.connect(now=0)
+    connection.disconnect()
+    assert readout.update(0, 0.8, now=0)
+
+def test_readouts_are_not_kept_alive_by_the_mirror():
+    readouts.volumeReadout()
+    gc.collect()
+
+    mixer.invalidateState()
+    assert mixer._invalidateHandlers == []
+
+def test_invalidate_handlers_can_be_removed():
+    calls = []
+    handler = lambda: calls.append(None)
+
+    mixer.addInvalidateHandler(handler)
+    mixer.invalidateState()
+    mixer.removeInvalidateHandler(handler)
+    mixer.invalidateState()
+
+    assert calls == [None]
+
+def test_readouts_need_two_steps():
+    with pytest.raises(ValueError):
+        readouts.Readout("VOLUME", readouts.dBText, steps=1)
@@ -0,0 +1,108 @@
+# MIT License
+
+# Copyright (c) 2024 Pablo Peral
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Tests of the traffic log of `nihia.recorder`.
+"""
+
+import io
+
+import pytest
+
+import nihia
+from nihia import mixer, recorder
+
+def test_log_round_trip(fresh, sent):
+    log = io.BytesIO()
+    capture = recorder.Recorder(log)
+
+    capture.start()
+    mixer.setTrackName(0, "Kick")
+    nihia.dataOut(16, 1)
+    capture.record(recorder.INCOMING, bytes((191, 1, 3)))
+    capture.stop()
+
+    written = sent()
+    records = list(recorder.readLog(log.getvalue()))
+
+    assert [(kind, data) for _, kind, data in records] == [
+        (recorder.OUTGOING, written[0]),
+        (recorder.OUTGOING, written[1]),
+        (recorder.INCOMING, bytes((191, 1, 3))),
+    ]
+    assert [timestamp for timestamp, _, _ in records] == sorted(timestamp for timestamp, _, _ in records)
+    assert nihia._backend is None
+
+    fresh.reset()
+    assert recorder.replay(log.getvalue()) == 2
+    assert sent() == written
+
+def test_full_buffer_drops_records():
+    capture = recorder.Recorder(io.BytesIO(), capacity=16)
+
+    capture.record(recorder.OUTGOING, bytes(10), now=0)
+    capture.record(recorder.OUTGOING, bytes(10), now=0)
+
+    assert capture.recorded == 1
+    assert capture.dropped == 1
+
+def test_logs_are_checked():
+    with pytest.raises(ValueError):
+        list(recorder.readLog(b"not a log"))
+
+def test_records_wrap_around_the_ring():
+    log = io.BytesIO()
+    capture = recorder.Recorder(log, capacity=16)
+    messages = [bytes((176, index, index)) for index in range(6)]
+
+    # Each record takes 6 bytes, so the ones after the first flushes are split over the end of the buffer
+    for message in messages:
+        capture.record(recorder.OUTGOING, message, now=0)
+        capture.record(recorder.OUTGOING, message, now=0)
+        capture.flush()
+
+    assert capture.dropped == 0
+    assert [data for _, _, data in recorder.readLog(log.getvalue())] == [message for message in messages for _ in range(2)]
+
+def test_incoming_messages_are_replayed_to_the_handler(fresh):
+    log = io.BytesIO()
+    capture = recorder.Recorder(log)
+
+    capture.onMidiMsg(fresh.MidiEvent(bytes((191, 1, 3))))
+    capture.onMidiMsg(fresh.MidiEvent(bytes((240, 0, 33, 9, 247))))
+    capture.flush()
+
+    received = []
+    assert recorder.replay(log.getvalue(), handler=lambda event: received.append(event)) == 2
+    assert [(event.status, event.data1, event.data2) for event in received[:1]] == [(191, 1, 3)]
+    assert received[1].sysex == bytes((240, 0, 33, 9, 247))
+
+def test_logs_can_be_written_and_read_through_paths(tmp_path, sent):
+    log = tmp_path / "traffic.nihialog"
+
+    capture = recorder.Recorder(log)
+    capture.start()
+    mixer.setTrackName(0, "Kick")
+    capture.stop()
+
+    assert [data for _, _, data in recorder.readLog(log)] == sent()
+    assert recorder.replay(log) == 1
@@ -0,0 +1,121 @@
+# MIT License
+
+# Copyright (c) 2024 Pablo Peral
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Tests of the output scheduler of `nihia.scheduler`.
+"""
+
+import nihia
+from nihia import buttons, mixer, scheduler
+
+def test_nothing_is_sent_until_idle(sent):
+    scheduler.enable()
+
+    mixer.setTrackName(0, "Kick")
+    buttons.setLight("PLAY", 1)
+
+    assert sent() == []
+    assert scheduler.pending() == 2
+
+def test_messages_are_sent_by_priority(sent):
+    scheduler.enable()
+
+    mixer.setTrackName(0, "Kick")
+    mixer.setTrackVolGraph(0, 0.5)
+    mixer.setTrackMute(0, True)
+    buttons.setLight("PLAY", 1)
+    scheduler.onIdle()
+
+    assert sent() == [
+        bytes((191, 16, 1)),
+        mixer.buildTrackInfo("IS_MUTE", True, 0),
+        bytes((191, 80, 63)),
+        mixer.buildTrackInfo("NAME", 0, 0, "Kick"),
+    ]
+
+def test_newer_messages_replace_older_ones(sent):
+    scheduler.enable()
+
+    mixer.setTrackName(0, "Kick")
+    mixer.setTrackName(1, "Snare")
+    mixer.setTrackName(0, "Bass")
+    scheduler.onIdle()
+
+    assert sent() == [mixer.buildTrackInfo("NAME", 0, 0, "Bass"), mixer.buildTrackInfo("NAME", 0, 1, "Snare")]
+
+def test_byte_budget_spreads_messages(sent):
+    scheduler.enable(bytesPerTick=20)
+
+    for track in range(4):
+        mixer.setTrackName(track, "Insert %d" % track)
+
+    ticks = 0
+    while scheduler.pending():
+        scheduler.onIdle()
+        ticks += 1
+
+    assert ticks == 4
+    assert len(sent()) == 4
+
+def test_disable_flushes_the_queue(sent):
+    scheduler.enable()
+    mixer.setTrackName(0, "Kick")
+    scheduler.disable()
+
+    assert len(sent()) == 1
+    assert nihia._sink is None
+
+def test_goodbye_skips_the_queue(sent):
+    scheduler.enable()
+
+    mixer.setTrackName(0, "Kick")
+    nihia.goodBye()
+
+    assert sent() == [bytes((191, 2, 1))]
+
+def test_clear_forgets_what_was_dropped(sent):
+    mixer.enableStateCache()
+    scheduler.enable()
+
+    mixer.setTrackName(0, "Kick")
+    mixer.setTrackVolGraph(0, 0.5)
+    buttons.setLights({"PLAY": 1})
+    scheduler.clear()
+
+    mixer.setTrackName(0, "Kick")
+    mixer.setTrackVolGraph(0, 0.5)
+    buttons.setLights({"PLAY": 1})
+    scheduler.onIdle()
+
+    assert len(sent()) == 3
+
+def test_queued_bank_keeps_existence_first(sent):
+    scheduler.enable()
+
+    mixer.setBank([{"exist": 1, "sel": True, "mute": True}])
+    scheduler.onIdle()
+
+    assert sent() == [
+        mixer.buildTrackInfo("EXIST", 1, 0),
+        mixer.buildTrackInfo("SELECTED", 1, 0),
+        mixer.buildTrackInfo("IS_MUTE", 1, 0),
+    ]
@@ -0,0 +1,116 @@
+# MIT License
+
+# Copyright (c) 2024 Pablo Peral
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Tests of the surface state of `nihia.surface` and how `nihia.mixer` applies it.
+"""
+
+from nihia import mixer, surface
+
+def _state() -> surface.SurfaceState:
+    state = surface.SurfaceState()
+    for slot in range(surface.SLOTS):
+        state.set("EXIST", slot, 1)
+        state.set("NAME", slot, "Insert %d" % (slot + 1))
+    return state
+
+def test_fields_start_unknown():
+    state = surface.SurfaceState()
+
+    assert state.get("IS_MUTE", 0) is None
+    assert state.get("NAME", 0) is None
+
+def test_set_reports_changes():
+    state = surface.SurfaceState()
+
+    assert state.set("IS_MUTE", 2, 1)
+    assert not state.set("IS_MUTE", 2, 1)
+    assert state.get("IS_MUTE", 2) == 1
+
+    state.forget("IS_MUTE", 2)
+    assert state.get("IS_MUTE", 2) is None
+
+def test_diff_lists_the_changed_fields_numbers_first():
+    state = _state()
+    changed = state.snapshot()
+
+    assert state.diff(changed) == []
+
+    changed.set("NAME", 3, "Kick")
+    changed.set("IS_SOLO", 7, 1)
+
+    assert changed.diff(state) == [("IS_SOLO", 7), ("NAME", 3)]
+
+def test_snapshots_are_independent():
+    state = _state()
+    copy = state.snapshot()
+    copy.set("NAME", 0, "Kick")
+
+    assert state.get("NAME", 0) == "Insert 1"
+    assert state != copy
+
+def test_bytes_round_trip():
+    state = _state()
+    state.set("VOLUME", 4, "-3.2 dB")
+    state.set("NAME", 5, "ドラム")
+
+    assert surface.SurfaceState.fromBytes(state.toBytes()) == state
+    assert surface.SurfaceState.fromBytes(surface.SurfaceState().toBytes()) == surface.SurfaceState()
+
+def test_render_builds_the_same_messages_as_the_setters(fresh, sent):
+    state = surface.SurfaceState()
+    state.set("IS_MUTE", 1, 1)
+    state.set("PAN_GRAPH", 1, 127)
+    state.set("NAME", 1, "Kick")
+
+    mixer.setTrackMute(1, True)
+    mixer.setTrackPanGraph(1, 1.0)
+    mixer.setTrackName(1, "Kick")
+
+    assert state.render(state.diff(surface.SurfaceState())) == sent()
+
+def test_apply_only_sends_the_differences(sent):
+    mixer.enableStateCache()
+
+    state = mixer.getSurfaceState()
+    state.set("NAME", 0, "Kick")
+    assert mixer.applySurfaceState(state) == 1
+
+    state = mixer.getSurfaceState()
+    state.set("NAME", 0, "Kick")
+    state.set("IS_ARMED", 0, 1)
+    assert mixer.applySurfaceState(state) == 1
+
+    assert sent() == [mixer.buildTrackInfo("NAME", 0, 0, "Kick"), mixer.buildTrackInfo("IS_ARMED", 1, 0)]
+
+def test_applying_a_partial_state_keeps_what_the_mirror_knows(sent):
+    mixer.enableStateCache()
+    mixer.setTrackName(0, "Kick")
+    mixer.setTrackVolGraph(0, 0.5)
+
+    state = surface.SurfaceState()
+    state.set("IS_MUTE", 1, 1)
+    assert mixer.applySurfaceState(state) == 1
+
+    mixer.setTrackName(0, "Kick")
+    mixer.setTrackVolGraph(0, 0.5)
+    assert len(sent()) == 3
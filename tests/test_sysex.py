@@ -0,0 +1,63 @@
+# MIT License
+
+# Copyright (c) 2024 Pablo Peral
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Tests of the wire format of the mixer SysEx messages built by `nihia.mixer.buildTrackInfo`.
+"""
+
+import pytest
+
+import nihia
+from nihia import mixer
+
+def _legacy(info_type: str, value: int, trackID: int, text: str = None) -> bytes:
+    """ Builds a message the way the mixer setters did it before `buildTrackInfo`, as lists of integers. """
+    msg = nihia.SYSEX_HEADER + [mixer.mixerinfo_types.get(info_type), value, trackID]
+    if text is not None:
+        msg += mixer.Str2Bytes(text)
+    return bytes(msg + [247])
+
+@pytest.mark.parametrize("args", [
+    ("NAME", 0, 3, "Insert 12"),
+    ("NAME", 0, 7, "ドラム バス áé \U0001f941"),
+    ("NAME", 0, 0, ""),
+    ("VOLUME", 0, 5, "-3.2 dB"),
+    ("PAN", 0, 1, "Centered"),
+    ("KOMPLETE_INSTANCE", 0, 0, "NIKB01"),
+])
+def test_text_messages_match_the_legacy_frames(args):
+    assert mixer.buildTrackInfo(*args) == _legacy(*args)
+
+@pytest.mark.parametrize("args", [
+    ("EXIST", 1, 0),
+    ("IS_MUTE", 1, 2),
+    ("IS_SOLO", 0, 6),
+    ("SELECTED", 1, 7),
+])
+def test_numeric_messages_match_the_legacy_frames(args):
+    assert mixer.buildTrackInfo(*args) == _legacy(*args)
+
+def test_setters_send_the_legacy_frames(sent):
+    mixer.setTrackName(2, "Bateria acústica")
+    mixer.setTrackMute(4, True)
+
+    assert sent() == [_legacy("NAME", 0, 2, "Bateria acústica"), _legacy("IS_MUTE", 1, 4)]
@@ -0,0 +1,108 @@
+# MIT License
+
+# Copyright (c) 2024 Pablo Peral
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Tests of the scrolling track window of `nihia.window`.
+"""
+
+from nihia import mixer, window
+
+def _window(trackCount: int = 20, calls: list = None) -> window.TrackWindow:
+    def describe(index):
+        if calls is not None:
+            calls.append(index)
+        return {"exist": "GENERIC", "name": "Insert %d" % (index + 1), "vol": "0.0 dB", "pan": "Centered"}
+
+    return window.TrackWindow(trackCount, describe)
+
+def test_scroll_moves_the_window_and_clamps():
+    tracks = _window()
+
+    tracks.scroll(3)
+    assert list(tracks.tracks()) == list(range(3, 11))
+    assert tracks.slotOf(3) == 0
+    assert tracks.slotOf(10) == 7
+    assert tracks.slotOf(2) is None
+    assert tracks.slotOf(11) is None
+
+    tracks.scroll(100)
+    assert tracks.offset == 12
+
+    tracks.scroll(-100)
+    assert tracks.offset == 0
+    assert tracks.scroll(-1) == 0
+
+def test_scroll_bank_and_show():
+    tracks = _window()
+
+    tracks.scrollBank(1)
+    assert tracks.offset == 8
+
+    tracks.show(5)
+    assert tracks.offset == 5
+
+    tracks.show(14)
+    assert tracks.offset == 7
+    assert tracks.show(10) == 0
+
+def test_scroll_sends_only_the_differences_with_the_mirror(sent):
+    mixer.enableStateCache()
+    tracks = _window()
+    tracks.moveTo(1)
+    tracks.moveTo(0)
+    before = len(sent())
+
+    # Every slot gets a new name, and nothing else differs between the tracks
+    assert tracks.scroll(1) == window.TrackWindow.SIZE
+    assert len(sent()) - before == window.TrackWindow.SIZE
+
+def test_short_lists_fill_the_window_with_empty_slots():
+    tracks = _window(trackCount=3)
+
+    assert tracks.moveTo(5) == 0
+    assert tracks.offset == 0
+    assert tracks._descriptor(5) is window._EMPTY
+
+def test_neighbouring_windows_are_prefetched():
+    calls = []
+    tracks = _window(trackCount=40, calls=calls)
+
+    tracks.moveTo(16)
+    assert set(calls) == set(range(8, 32))
+
+    # Scrolling into the prefetched window doesn't describe the tracks again
+    del calls[:]
+    tracks.scroll(4)
+    assert set(calls) == set(range(32, 36))
+
+def test_refresh_describes_again_only_the_given_tracks():
+    calls = []
+    tracks = _window(calls=calls)
+    tracks.moveTo(2)
+
+    del calls[:]
+    tracks.refresh([3, 50])
+    assert calls == [3]
+
+    del calls[:]
+    tracks.refresh()
+    assert calls == list(range(2, 10))
@@ -0,0 +1,152 @@
+# MIT License
+
+# Copyright (c) 2024 Pablo Peral
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Submodule of flmidi-nihia that maps the 8 tracks displayed on the device onto a window that scrolls over a list of tracks of any size, like
+the 125 inserts of FL Studio's mixer.
+"""
+
+from nihia import mixer
+
+###########################################################################################################################################
+# Track window
+###########################################################################################################################################
+
+# Descriptor shown on the slots past the last track
+_EMPTY = {"exist": mixer.track_types["EMPTY"], "name": "", "vol": "", "pan": ""}
+
+class TrackWindow:
+    """ Window of 8 tracks over a longer list of tracks.
+
+    The tracks are described on demand by a function given by the script, which returns the same kind of descriptor `mixer.setBank` takes.
+    Descriptors are cached, and those of the neighbouring windows are prepared in advance so fast scrolling with the 4D
+    encoder doesn't have to wait for FL Studio.
+
+    The device has no way of shifting the tracks it displays, so on every scroll each slot gets the contents of its new track. Everything
+    goes through `mixer.setBank`, so with the device state mirror enabled (`mixer.enableStateCache()`) only the fields that actually differ
+    between the old and the new track of each slot are sent.
+
+    ### Arguments
+     - trackCount (int): Number of tracks in the list.
+     - describe: Function that takes the index of a track and returns its descriptor as taken by `mixer.setBank`.
+     - prefetch (int): Number of windows to prepare at each side of the one being displayed.
+    """
+
+    SIZE = 8
+
+    def __init__(self, trackCount: int, describe, prefetch: int = 1):
+        self.trackCount = trackCount
+        self.describe = describe
+        self.prefetch = prefetch
+        self.offset = 0
+
+        self._cache = {}
+
+    def tracks(self) -> range:
+        """ Returns the indexes of the tracks being displayed, some of them past the end of the list if it's shorter than 8 tracks. """
+        return range(self.offset, self.offset + self.SIZE)
+
+    def slotOf(self, index: int):
+        """ Returns the slot (0-7) a track is being displayed on, or None if it's out of the window. """
+        slot = index - self.offset
+        return slot if 0 <= slot < self.SIZE else None
+
+    def moveTo(self, offset: int) -> int:
+        """ Moves the window so it starts on a given track, sending the tracks that come into view.
+
+        ### Returns
+         - int: Number of messages sent.
+        """
+        offset = max(0, min(offset, self.trackCount - self.SIZE))
+        if offset == self.offset:
+            return 0
+
+        self.offset = offset
+        sent = mixer.setBank([self._descriptor(index) for index in self.tracks()])
+        self._prefetch()
+
+        return sent
+
+    def scroll(self, delta: int) -> int:
+        """ Moves the window a number of tracks forward (positive) or backward (negative).
+
+        ### Returns
+         - int: Number of messages sent.
+        """
+        return self.moveTo(self.offset + delta)
+
+    def scrollBank(self, delta: int) -> int:
+        """ Moves the window a number of whole banks of 8 tracks. """
+        return self.moveTo(self.offset + delta * self.SIZE)
+
+    def show(self, index: int) -> int:
+        """ Moves the window the least needed for a track to be displayed, like when the selection moves out of the window. """
+        if index < self.offset:
+            return self.moveTo(index)
+
+        if index >= self.offset + self.SIZE:
+            return self.moveTo(index - self.SIZE + 1)
+
+        return 0
+
+    def refresh(self, indexes = None) -> int:
+        """ Describes again the tracks being displayed (or the given ones, if they're being displayed) and sends whatever changed.
+        Meant to be called from the OnRefresh function of the script.
+
+        ### Returns
+         - int: Number of messages sent.
+        """
+        if indexes is None:
+            indexes = self.tracks()
+
+        for index in indexes:
+            self._cache.pop(index, None)
+
+        return mixer.setBank([self._descriptor(index) for index in self.tracks()])
+
+    def invalidate(self, index: int = None):
+        """ Forgets the cached descriptor of a track, or of every track if no index is given, for when it changed out of the window. """
+        if index is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(index, None)
+
+    def _descriptor(self, index: int) -> dict:
+        if index >= self.trackCount:
+            return _EMPTY
+
+        descriptor = self._cache.get(index)
+        if descriptor is None:
+            descriptor = self._cache[index] = self.describe(index)
+
+        return descriptor
+
+    def _prefetch(self):
+        """ Prepares the descriptors of the windows around the one being displayed and forgets the ones further away. """
+        first = max(0, self.offset - self.prefetch * self.SIZE)
+        last = min(self.trackCount, self.offset + (self.prefetch + 1) * self.SIZE)
+
+        for index in [index for index in self._cache if not first <= index < last]:
+            del self._cache[index]
+
+        for index in range(first, last):
+            self._descriptor(index)